@@ -1,24 +1,151 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, AsyncIterator, Callable, Hashable, List, Optional
 
-from ..database import get_db
-from ..services.stats_service import StatsService
-from ..schemas import Summary, ModelStats, ModelHistoryPoint
+from ..database import get_read_db
+from ..models import run_timestamp
+from ..services.downsampling import DOWNSAMPLE_METHODS
+from ..services.live_feed import live_feed
+from ..services.response_cache import etag_matches, make_etag, response_cache
+from ..services.stats_service import DEFAULT_STATS_WINDOW, STATS_WINDOWS, StatsService
+from ..schemas import Summary, ModelStats, ModelHistoryPoint, ScanProgress
 
 router = APIRouter()
 
+_SUMMARY = TypeAdapter(Summary)
+_SCAN_PROGRESS = TypeAdapter(Optional[ScanProgress])
+_MODEL_STATS = TypeAdapter(List[ModelStats])
+
+# Comment lines keep idle connections (and proxies in between) open.
+SSE_KEEPALIVE_SECONDS = 15.0
+SSE_RETRY_MS = 5000
+
+
+def _render(adapter: TypeAdapter, data: Any) -> bytes:
+    return adapter.dump_json(adapter.validate_python(data))
+
+
+def _cached_response(
+    request: Request,
+    service: StatsService,
+    key: Hashable,
+    render: Callable[[], bytes],
+) -> Response:
+    # Clients revalidate every time (no-cache) and get a 304 while nothing
+    # was written; otherwise the body is rendered once per data version.
+    cache_key = (key, service.get_data_version())
+    etag = make_etag(cache_key)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    body = response_cache.get(cache_key)
+    if body is None:
+        body = render()
+        response_cache.set(cache_key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get("/summary", response_model=Summary)
-def get_summary(db: Session = Depends(get_db)):
+def get_summary(request: Request, db: Session = Depends(get_read_db)):
+    service = StatsService(db)
+    return _cached_response(
+        request, service, ("summary",), lambda: _render(_SUMMARY, service.get_summary())
+    )
+
+@router.get("/scan/progress", response_model=Optional[ScanProgress])
+def get_scan_progress(request: Request, db: Session = Depends(get_read_db)):
     service = StatsService(db)
-    return service.get_summary()
+    return _cached_response(
+        request,
+        service,
+        ("scan_progress",),
+        lambda: _render(_SCAN_PROGRESS, service.get_scan_progress()),
+    )
 
 @router.get("/models", response_model=List[ModelStats])
-def get_models(db: Session = Depends(get_db)):
+def get_models(
+    request: Request,
+    window: str = DEFAULT_STATS_WINDOW,
+    db: Session = Depends(get_read_db),
+):
+    if window not in STATS_WINDOWS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"window must be one of: {', '.join(STATS_WINDOWS)}",
+        )
     service = StatsService(db)
-    return service.get_models_stats()
+    return _cached_response(
+        request,
+        service,
+        ("models", window),
+        lambda: _render(_MODEL_STATS, service.get_models_stats(window=window)),
+    )
 
 @router.get("/models/{model_id:path}/history", response_model=List[ModelHistoryPoint])
-def get_model_history(model_id: str, db: Session = Depends(get_db)):
+def get_model_history(
+    model_id: str,
+    response: Response,
+    limit: int = Query(50, ge=1, le=1000),
+    before: Optional[int] = Query(None, description="Run id cursor from X-Next-Cursor"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    points: Optional[int] = Query(None, ge=3, le=5000),
+    method: str = "lttb",
+    db: Session = Depends(get_read_db),
+):
+    if method not in DOWNSAMPLE_METHODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"method must be one of: {', '.join(DOWNSAMPLE_METHODS)}",
+        )
     service = StatsService(db)
-    return service.get_model_history(model_id)
+    history, next_cursor = service.get_model_history_page(
+        model_id,
+        limit=limit,
+        before=before,
+        since_ts=run_timestamp(since) if since else None,
+        until_ts=run_timestamp(until) if until else None,
+        points=points,
+        method=method,
+    )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return history
+
+async def _event_stream(request: Request, last_event_id: Optional[int]) -> AsyncIterator[str]:
+    subscription = live_feed.subscribe(last_event_id)
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=SSE_KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield event.encode()
+    finally:
+        live_feed.unsubscribe(subscription)
+
+@router.get("/events")
+async def stream_events(
+    request: Request,
+    last_event_id: Optional[str] = Header(default=None),
+):
+    """Server-Sent Events: run_started, result, run_finished and resync."""
+    try:
+        resume_from = int(last_event_id) if last_event_id else None
+    except ValueError:
+        resume_from = None
+    return StreamingResponse(
+        _event_stream(request, resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,154 @@
+"""Scan throughput against the local OpenRouter simulator.
+
+``run_bench`` fetches the simulator's catalog and probes every model once
+with the chosen engine, timing only the probes. Probe overhead is what a
+single-attempt probe took beyond the time the simulator itself spent on the
+request, i.e. the cost of ``http_client`` and ``healthcheck_service``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from .domain_models import HealthcheckResult, ModelInfo
+from .healthcheck_service import AsyncHealthcheckService, HealthcheckService
+from .http_client import AsyncHttpClient, HttpClient
+from .latency_sketch import LatencySketch
+from .model_catalog_service import ModelCatalogService
+from .openrouter_client import (
+    AsyncOpenRouterClient,
+    OpenRouterClient,
+    OpenRouterClientConfig,
+)
+from .simulator import OpenRouterSimulator
+
+BENCH_ENGINES = ("thread", "async")
+
+
+@dataclass(frozen=True)
+class BenchReport:
+    engine: str
+    probe_mode: str
+    concurrency: int
+    models: int
+    ok: int
+    failed: int
+    requests: int
+    rate_limited: int
+    server_errors: int
+    wall_seconds: float
+    models_per_second: float
+    # Over single-attempt probes only; retries add deliberate back-off.
+    overhead_p50_ms: Optional[float]
+    overhead_p99_ms: Optional[float]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def run_bench(
+    simulator: OpenRouterSimulator,
+    *,
+    engine: str = "thread",
+    probe_mode: str = "standard",
+    concurrency: int = 20,
+    max_retries: int = 2,
+    timeout_seconds: int = 30,
+    prompt: str = "Respond with the exact text: OK",
+) -> BenchReport:
+    if engine not in BENCH_ENGINES:
+        raise ValueError(f"Unknown engine: {engine}")
+    client_config = OpenRouterClientConfig(
+        api_key="simulated", base_url=simulator.base_url, http_referer=None, x_title=None
+    )
+    check_options = {
+        "prompt": prompt,
+        "timeout_seconds": timeout_seconds,
+        "max_retries": max_retries,
+        "concurrency": concurrency,
+        "probe_mode": probe_mode,
+    }
+
+    with HttpClient(pool_size=concurrency) as http_client:
+        client = OpenRouterClient(http_client, client_config)
+        models = ModelCatalogService(client).get_free_models(timeout_seconds)
+        statuses_before = simulator.status_counts()
+        simulator.take_served()
+
+        started = time.perf_counter()
+        if engine == "async":
+            results = asyncio.run(
+                _check_models_async(models, client_config, check_options)
+            )
+        else:
+            results = HealthcheckService(client).check_models(models, **check_options)
+        wall_seconds = time.perf_counter() - started
+
+    served = simulator.take_served()
+    statuses = simulator.status_counts()
+    answered = {
+        status: count - statuses_before.get(status, 0) for status, count in statuses.items()
+    }
+    ok = sum(1 for result in results if result.ok)
+    overhead = _probe_overhead_ms(results, served)
+    return BenchReport(
+        engine=engine,
+        probe_mode=probe_mode,
+        concurrency=concurrency,
+        models=len(results),
+        ok=ok,
+        failed=len(results) - ok,
+        requests=sum(answered.values()),
+        rate_limited=answered.get(429, 0),
+        server_errors=sum(count for status, count in answered.items() if status >= 500),
+        wall_seconds=round(wall_seconds, 3),
+        models_per_second=round(len(results) / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+        overhead_p50_ms=_rounded(overhead.quantile(0.5)),
+        overhead_p99_ms=_rounded(overhead.quantile(0.99)),
+    )
+
+
+def format_bench_report(report: BenchReport) -> List[str]:
+    lines = [
+        f"엔진 {report.engine}, 프로브 {report.probe_mode}, 동시 실행 {report.concurrency}",
+        f"모델 {report.models}개 (성공 {report.ok}, 실패 {report.failed}), "
+        f"요청 {report.requests}회 (429 {report.rate_limited}, 5xx {report.server_errors})",
+        f"소요 시간 {report.wall_seconds:.3f}초, 처리량 {report.models_per_second:.2f} 모델/초",
+    ]
+    if report.overhead_p50_ms is None:
+        lines.append("프로브 오버헤드: 단일 시도로 끝난 프로브가 없음")
+    else:
+        lines.append(
+            f"프로브 오버헤드 p50 {report.overhead_p50_ms:.1f}ms, "
+            f"p99 {report.overhead_p99_ms:.1f}ms"
+        )
+    return lines
+
+
+async def _check_models_async(
+    models: List[ModelInfo],
+    client_config: OpenRouterClientConfig,
+    check_options: Dict[str, Any],
+) -> List[HealthcheckResult]:
+    async with AsyncHttpClient(max_connections=check_options["concurrency"]) as http_client:
+        service = AsyncHealthcheckService(AsyncOpenRouterClient(http_client, client_config))
+        return await service.check_models(models, **check_options)
+
+
+def _probe_overhead_ms(
+    results: List[HealthcheckResult], served: Dict[str, List[float]]
+) -> LatencySketch:
+    sketch = LatencySketch()
+    for result in results:
+        server_seconds = served.get(result.model_id)
+        if result.attempts != 1 or not server_seconds or result.latency_ms is None:
+            continue
+        sketch.add(max(0.0, result.latency_ms - server_seconds[0] * 1000))
+    return sketch
+
+
+def _rounded(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 2)
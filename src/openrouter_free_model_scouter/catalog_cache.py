@@ -0,0 +1,220 @@
+"""Persisted copy of the OpenRouter free-model catalog.
+
+Only the free models are kept, and of each only the fields the scouter
+uses. Together with the response's ``ETag``/``Last-Modified`` they make
+every later ``/models`` request conditional: an unchanged catalog comes back
+as an empty 304 and is read from the database instead. When the catalog
+does change, the added, removed and changed free models are recorded in
+``catalog_changes``. The scheduler probes the added ones right away, and
+the dashboard stops listing the removed ones.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Mapping, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .models import CatalogChange, CatalogState
+from .services.response_cache import response_cache
+
+CHANGE_ADDED = "added"
+CHANGE_REMOVED = "removed"
+CHANGE_CHANGED = "changed"
+
+# catalog_state holds a single row.
+_STATE_ID = 1
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    model_id: str
+    name: str
+    context_length: Optional[int] = None
+    prompt_price: Optional[str] = None
+    completion_price: Optional[str] = None
+
+    @classmethod
+    def from_item(cls, item: Mapping[str, Any]) -> "CatalogEntry":
+        model_id = item["id"]
+        name = item.get("name")
+        context_length = item.get("context_length")
+        pricing = item.get("pricing")
+        if not isinstance(pricing, Mapping):
+            pricing = {}
+        return cls(
+            model_id=model_id,
+            name=name if isinstance(name, str) else model_id,
+            context_length=context_length if isinstance(context_length, int) else None,
+            prompt_price=_price(pricing.get("prompt")),
+            completion_price=_price(pricing.get("completion")),
+        )
+
+    def to_row(self) -> List[Any]:
+        return [
+            self.model_id,
+            self.name,
+            self.context_length,
+            self.prompt_price,
+            self.completion_price,
+        ]
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "CatalogEntry":
+        return cls(*row)
+
+    def to_raw(self) -> Dict[str, Any]:
+        # What ModelInfo.raw carries instead of the full /models item.
+        return {
+            "id": self.model_id,
+            "name": self.name,
+            "context_length": self.context_length,
+            "pricing": {"prompt": self.prompt_price, "completion": self.completion_price},
+        }
+
+
+@dataclass
+class CatalogDiff:
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    # model_id -> {field: [old, new]}
+    changed: Dict[str, Dict[str, List[Any]]] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def diff_catalogs(
+    old: Mapping[str, CatalogEntry], new: Mapping[str, CatalogEntry]
+) -> CatalogDiff:
+    diff = CatalogDiff(
+        added=sorted(set(new) - set(old)),
+        removed=sorted(set(old) - set(new)),
+    )
+    for model_id in sorted(set(old) & set(new)):
+        before, after = asdict(old[model_id]), asdict(new[model_id])
+        fields = {
+            name: [before[name], after[name]]
+            for name in before
+            if before[name] != after[name]
+        }
+        if fields:
+            diff.changed[model_id] = fields
+    return diff
+
+
+class CatalogCache:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _state(self) -> Optional[CatalogState]:
+        return self.db.get(CatalogState, _STATE_ID)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        state = self._state()
+        if state is None:
+            return {}
+        headers = {}
+        if state.etag:
+            headers["If-None-Match"] = state.etag
+        if state.last_modified:
+            headers["If-Modified-Since"] = state.last_modified
+        return headers
+
+    def load(self) -> Optional[List[CatalogEntry]]:
+        state = self._state()
+        if state is None:
+            return None
+        return [CatalogEntry.from_row(row) for row in json.loads(state.payload)]
+
+    def touch(self, now_ts: Optional[float] = None) -> None:
+        """Record that the stored catalog was confirmed unchanged."""
+        state = self._state()
+        if state is None:
+            return
+        state.fetched_ts = int(time.time() if now_ts is None else now_ts)
+        self.db.commit()
+
+    def store(
+        self,
+        entries: List[CatalogEntry],
+        *,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        now_ts: Optional[float] = None,
+    ) -> Optional[CatalogDiff]:
+        """Replace the stored catalog and record how it changed.
+
+        Returns the diff against the previous catalog, or None when there
+        was none to compare with (nothing is recorded then).
+        """
+        now_ts = int(time.time() if now_ts is None else now_ts)
+        previous = self.load()
+        payload = json.dumps([entry.to_row() for entry in entries], separators=(",", ":"))
+
+        state = self._state()
+        if state is None:
+            state = CatalogState(id=_STATE_ID)
+            self.db.add(state)
+        state.etag = etag
+        state.last_modified = last_modified
+        state.fetched_ts = now_ts
+        state.payload = payload
+
+        diff = None
+        if previous is not None:
+            diff = diff_catalogs(
+                {entry.model_id: entry for entry in previous},
+                {entry.model_id: entry for entry in entries},
+            )
+            self.db.add_all(_change_rows(diff, now_ts))
+        self.db.commit()
+        if diff:
+            # Removed models drop out of the cached dashboard responses.
+            response_cache.invalidate()
+        return diff
+
+
+def removed_model_ids(db: Session) -> List[str]:
+    """Models whose latest recorded catalog change is their removal."""
+    latest = (
+        db.query(func.max(CatalogChange.id)).group_by(CatalogChange.model_id).scalar_subquery()
+    )
+    return [
+        model_id
+        for (model_id,) in db.query(CatalogChange.model_id)
+        .filter(CatalogChange.id.in_(latest))
+        .filter(CatalogChange.change == CHANGE_REMOVED)
+    ]
+
+
+def _change_rows(diff: CatalogDiff, now_ts: int) -> List[CatalogChange]:
+    rows = [
+        CatalogChange(detected_ts=now_ts, model_id=model_id, change=CHANGE_ADDED)
+        for model_id in diff.added
+    ]
+    rows += [
+        CatalogChange(detected_ts=now_ts, model_id=model_id, change=CHANGE_REMOVED)
+        for model_id in diff.removed
+    ]
+    rows += [
+        CatalogChange(
+            detected_ts=now_ts,
+            model_id=model_id,
+            change=CHANGE_CHANGED,
+            details=json.dumps(fields),
+        )
+        for model_id, fields in diff.changed.items()
+    ]
+    return rows
+
+
+def _price(value: Any) -> Optional[str]:
+    # OpenRouter sends prices as decimal strings; keep them verbatim.
+    if value is None:
+        return None
+    return str(value)
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .config import AppConfig
+from .domain_models import HealthcheckResult
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+# What a scan does with a model, as decided by its circuit.
+PROBE_FULL = "full"
+PROBE_HALF_OPEN = "half_open"
+PROBE_SKIP = "skip"
+
+# error_category of the result recorded for a model skipped by its circuit.
+CIRCUIT_OPEN_CATEGORY = "circuit_open"
+# Failures that say nothing about the model itself: free-tier throttling and
+# our own connection or timeout trouble. They neither count towards opening
+# a circuit nor reset the count.
+NEUTRAL_FAILURE_CATEGORIES = frozenset({"rate_limited", "network"})
+
+
+@dataclass(frozen=True)
+class BreakerPolicy:
+    # Consecutive failures that open a circuit; 0 disables the breaker.
+    failure_threshold: int
+    base_cooldown_seconds: float
+    max_cooldown_seconds: float
+
+    @classmethod
+    def from_config(cls, config: AppConfig) -> "BreakerPolicy":
+        base = config.breaker_cooldown_minutes * 60
+        return cls(
+            failure_threshold=config.breaker_failure_threshold,
+            base_cooldown_seconds=base,
+            max_cooldown_seconds=max(config.breaker_max_cooldown_hours * 3600, base),
+        )
+
+
+@dataclass(frozen=True)
+class BreakerState:
+    model_id: str
+    state: str = CIRCUIT_CLOSED
+    failures: int = 0
+    cooldown_seconds: float = 0.0
+    # While open: when the next half-open probe may be sent.
+    next_probe_ts: Optional[float] = None
+
+
+class CircuitBreakers:
+    """Per-model circuit breakers consulted and updated during one scan.
+
+    A closed circuit opens after ``failure_threshold`` consecutive failures
+    of the model itself (see ``NEUTRAL_FAILURE_CATEGORIES``). While open,
+    the model is skipped until its cool-down has passed; then it gets one
+    half-open probe without retries. Success closes the circuit.
+    Failure reopens it with the cool-down doubled, up to
+    ``max_cooldown_seconds``. Results come in from worker threads, so every
+    transition happens under a lock.
+    """
+
+    def __init__(
+        self,
+        policy: BreakerPolicy,
+        states: Iterable[BreakerState] = (),
+        *,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._policy = policy
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._states: Dict[str, BreakerState] = {s.model_id: s for s in states}
+        self._changed: Dict[str, BreakerState] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self._policy.failure_threshold > 0
+
+    def state_of(self, model_id: str) -> BreakerState:
+        with self._lock:
+            return self._states.get(model_id) or BreakerState(model_id=model_id)
+
+    def decide(self, model_id: str) -> str:
+        """How to probe ``model_id`` now; an open circuit past its cool-down turns half-open."""
+        if not self.enabled:
+            return PROBE_FULL
+        with self._lock:
+            current = self._states.get(model_id)
+            if current is None or current.state == CIRCUIT_CLOSED:
+                if current is not None and current.failures >= self._policy.failure_threshold:
+                    # Seeded from a failure streak recorded before the breaker existed.
+                    self._set(self._open(current, self._policy.base_cooldown_seconds))
+                    return PROBE_SKIP
+                return PROBE_FULL
+            if current.state == CIRCUIT_OPEN:
+                if current.next_probe_ts is not None and self._clock() < current.next_probe_ts:
+                    return PROBE_SKIP
+                self._set(replace(current, state=CIRCUIT_HALF_OPEN, next_probe_ts=None))
+            return PROBE_HALF_OPEN
+
+    def record(self, result: HealthcheckResult) -> None:
+        if not self.enabled or result.error_category == CIRCUIT_OPEN_CATEGORY:
+            return
+        with self._lock:
+            current = self._states.get(result.model_id) or BreakerState(
+                model_id=result.model_id
+            )
+            if result.ok:
+                if current.state != CIRCUIT_CLOSED or current.failures:
+                    self._set(BreakerState(model_id=result.model_id))
+                return
+            if result.error_category in NEUTRAL_FAILURE_CATEGORIES:
+                # A half-open circuit stays half-open and is probed again.
+                return
+
+            if current.state == CIRCUIT_HALF_OPEN:
+                cooldown = min(
+                    max(current.cooldown_seconds, self._policy.base_cooldown_seconds) * 2,
+                    self._policy.max_cooldown_seconds,
+                )
+                self._set(self._open(current, cooldown, failures=current.failures + 1))
+                return
+
+            failures = current.failures + 1
+            if failures >= self._policy.failure_threshold:
+                self._set(self._open(current, self._policy.base_cooldown_seconds, failures=failures))
+            else:
+                self._set(replace(current, failures=failures))
+
+    def changed(self) -> List[BreakerState]:
+        """States that differ from the ones loaded, to be persisted."""
+        with self._lock:
+            return list(self._changed.values())
+
+    def _open(
+        self, current: BreakerState, cooldown: float, failures: Optional[int] = None
+    ) -> BreakerState:
+        return replace(
+            current,
+            state=CIRCUIT_OPEN,
+            failures=current.failures if failures is None else failures,
+            cooldown_seconds=cooldown,
+            next_probe_ts=self._clock() + cooldown,
+        )
+
+    def _set(self, state: BreakerState) -> None:
+        self._states[state.model_id] = state
+        self._changed[state.model_id] = state
+
+
+def skipped_result(run_id: str, state: BreakerState, timestamp_iso: str) -> HealthcheckResult:
+    """The result recorded for a model whose circuit is open, without a request."""
+    return HealthcheckResult(
+        run_id=run_id,
+        timestamp_iso=timestamp_iso,
+        model_id=state.model_id,
+        ok=False,
+        http_status=None,
+        latency_ms=None,
+        attempts=0,
+        error_category=CIRCUIT_OPEN_CATEGORY,
+        error_message=f"서킷 브레이커 열림: 연속 실패 {state.failures}회",
+        response_preview=None,
+    )
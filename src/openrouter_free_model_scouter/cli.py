@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import json
 import sys
 import time
 from datetime import datetime
@@ -11,10 +12,13 @@ from .config import (
     AppConfig,
     load_simple_dotenv_mapping,
 )
-from .worker.scouter import ScouterWorker
+from .worker.scouter import SCAN_ENGINES, ScouterWorker
+from .healthcheck_service import PROBE_MODES
 from .http_client import HttpClient
-from .openrouter_client import OpenRouterClient, OpenRouterClientConfig
-from .database import SessionLocal, engine, Base
+from .key_pool import format_key_usage
+from .openrouter_client import OpenRouterClient, build_client_config
+from .database import SessionLocal, init_db
+from .models import Run
 
 
 def main() -> None:
@@ -25,6 +29,22 @@ def main() -> None:
         _cmd_serve(args)
         return
 
+    if args.command == "worker":
+        _cmd_worker(args)
+        return
+
+    if args.command == "bench":
+        _cmd_bench(args)
+        return
+
+    if args.command == "generate-history":
+        _cmd_generate_history(args)
+        return
+
+    if args.command == "bench-queries":
+        _cmd_bench_queries(args)
+        return
+
     if args.command != "scan":
         parser.print_help()
         raise SystemExit(2)
@@ -68,26 +88,35 @@ def _cmd_scan(args: argparse.Namespace) -> None:
         print("repeat_interval_minutes는 0 이상이어야 합니다.", file=sys.stderr)
         raise SystemExit(2)
 
+    if config.engine not in SCAN_ENGINES:
+        print(
+            f"engine은 {', '.join(SCAN_ENGINES)} 중 하나여야 합니다: {config.engine}",
+            file=sys.stderr,
+        )
+        raise SystemExit(2)
+
+    if config.probe_mode not in PROBE_MODES:
+        print(
+            f"probe_mode는 {', '.join(PROBE_MODES)} 중 하나여야 합니다: {config.probe_mode}",
+            file=sys.stderr,
+        )
+        raise SystemExit(2)
+
     if not config.api_key:
         print("OPENROUTER_API_KEY 환경변수가 필요합니다.", file=sys.stderr)
         raise SystemExit(2)
 
-    http_client = HttpClient()
+    http_client = HttpClient(pool_size=config.effective_pool_size, http2=config.http2)
     openrouter_client = OpenRouterClient(
         http_client=http_client,
-        config=OpenRouterClientConfig(
-            api_key=config.api_key,
-            base_url=config.base_url,
-            http_referer=config.http_referer,
-            x_title=config.x_title,
-        ),
+        config=build_client_config(config),
     )
 
     total_ok = 0
     total_failed = 0
 
     # Ensure DB tables exist
-    Base.metadata.create_all(bind=engine)
+    init_db()
 
     db = SessionLocal()
 
@@ -98,6 +127,19 @@ def _cmd_scan(args: argparse.Namespace) -> None:
             if iteration_index > 0 and config.repeat_interval_minutes > 0:
                 time.sleep(config.repeat_interval_minutes * 60)
 
+            if config.queue_scans:
+                run_id = worker.enqueue_scan(config)
+                current_iteration = iteration_index + 1
+                if run_id is None:
+                    print(f"[{current_iteration}/{config.repeat_count}] 큐에 넣을 모델이 없습니다")
+                else:
+                    queued = db.query(Run.total_models).filter(Run.id == run_id).scalar()
+                    print(
+                        f"[{current_iteration}/{config.repeat_count}] "
+                        f"Run {run_id}: {queued}개 모델을 작업 큐에 등록(worker가 처리)"
+                    )
+                continue
+
             run_id, results = worker.run_scan(config)
 
             ok_count = sum(1 for item in results if item.ok)
@@ -111,14 +153,185 @@ def _cmd_scan(args: argparse.Namespace) -> None:
             )
             print(f"[{current_iteration}/{config.repeat_count}] 성공: {ok_count}")
             print(f"[{current_iteration}/{config.repeat_count}] 실패: {fail_count}")
+            for usage in worker.last_key_usage:
+                print(f"[{current_iteration}/{config.repeat_count}] API 키 {format_key_usage(usage)}")
             print(f"DB 저장: {config.db_path}")
     finally:
         db.close()
+        http_client.close()
 
-    if config.fail_if_none_ok and total_ok == 0:
+    if config.fail_if_none_ok and total_ok == 0 and not config.queue_scans:
         raise SystemExit(3)
 
 
+def _cmd_worker(args: argparse.Namespace) -> None:
+    project_root = Path.cwd()
+    dotenv_path = Path(args.env_file) if args.env_file else (project_root / ".env")
+    dotenv_mapping = load_simple_dotenv_mapping(dotenv_path)
+
+    config = AppConfig.from_sources(
+        cli_overrides={
+            "concurrency": args.concurrency,
+            "engine": args.engine,
+            "lease_seconds": args.lease_seconds,
+        },
+        env=_merge_env_with_dotenv(dotenv_mapping, _read_env()),
+    )
+
+    if config.engine not in SCAN_ENGINES:
+        print(
+            f"engine은 {', '.join(SCAN_ENGINES)} 중 하나여야 합니다: {config.engine}",
+            file=sys.stderr,
+        )
+        raise SystemExit(2)
+
+    if not config.api_key:
+        print("OPENROUTER_API_KEY 환경변수가 필요합니다.", file=sys.stderr)
+        raise SystemExit(2)
+
+    init_db()
+
+    http_client = HttpClient(pool_size=config.effective_pool_size, http2=config.http2)
+    db = SessionLocal()
+    try:
+        worker = ScouterWorker(
+            db, OpenRouterClient(http_client=http_client, config=build_client_config(config))
+        )
+        print("[WORKER] 작업 큐 대기 중... (Ctrl+C로 종료)")
+        completed = worker.work(
+            config,
+            worker_id=args.worker_id,
+            exit_when_idle=args.drain,
+            poll_seconds=args.poll_seconds,
+        )
+        print(f"[WORKER] 처리한 작업: {completed}")
+        for usage in worker.client.key_pool.take_usage():
+            print(f"[WORKER] API 키 {format_key_usage(usage)}")
+    except KeyboardInterrupt:
+        print("[WORKER] 종료")
+    finally:
+        db.close()
+        http_client.close()
+
+
+def _cmd_bench(args: argparse.Namespace) -> None:
+    from .bench import format_bench_report, run_bench
+    from .simulator import (
+        ModelProfile,
+        OpenRouterSimulator,
+        build_profiles,
+        load_profile_overrides,
+    )
+
+    if args.models < 0 or args.concurrency < 1:
+        print("models는 0 이상, concurrency는 1 이상이어야 합니다.", file=sys.stderr)
+        raise SystemExit(2)
+
+    default = ModelProfile(
+        model_id="",
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        rate_limit_rate=args.rate_limit_rate,
+        server_error_rate=args.server_error_rate,
+        retry_after_seconds=args.retry_after_seconds,
+        trickle_ms=args.trickle_ms,
+    )
+    try:
+        overrides = load_profile_overrides(args.profiles) if args.profiles else []
+        profiles = build_profiles(args.models, default, overrides)
+    except (OSError, ValueError) as error:
+        print(f"모델 프로필을 읽을 수 없습니다: {error}", file=sys.stderr)
+        raise SystemExit(2)
+
+    with OpenRouterSimulator(profiles, seed=args.seed) as simulator:
+        report = run_bench(
+            simulator,
+            engine=args.engine,
+            probe_mode=args.probe_mode,
+            concurrency=args.concurrency,
+            max_retries=args.max_retries,
+            timeout_seconds=args.timeout_seconds,
+        )
+
+    if args.json:
+        print(json.dumps(report.to_dict(), ensure_ascii=False))
+        return
+    for line in format_bench_report(report):
+        print(f"[BENCH] {line}")
+
+
+def _print_progress(done: int, total: int) -> None:
+    print(f"[HISTORY] {done}/{total} 실행 생성", file=sys.stderr)
+
+
+def _cmd_generate_history(args: argparse.Namespace) -> None:
+    from .synthetic_history import generate_history
+
+    if args.models < 1 or args.runs < 1:
+        print("models와 runs는 1 이상이어야 합니다.", file=sys.stderr)
+        raise SystemExit(2)
+
+    try:
+        history = generate_history(
+            Path(args.db_path),
+            models=args.models,
+            runs=args.runs,
+            run_interval_seconds=args.run_interval_minutes * 60,
+            seed=args.seed,
+            progress=_print_progress,
+        )
+    except FileExistsError:
+        print(f"이미 존재하는 파일입니다: {args.db_path}", file=sys.stderr)
+        raise SystemExit(2)
+    print(
+        f"[HISTORY] {args.db_path}: 모델 {history.models}개, 실행 {history.runs}회, "
+        f"healthchecks {history.rows:,}행"
+    )
+
+
+def _cmd_bench_queries(args: argparse.Namespace) -> None:
+    import tempfile
+    from contextlib import nullcontext
+
+    from .query_bench import (
+        bench_existing_database,
+        format_query_report,
+        parse_sizes,
+        run_query_bench,
+    )
+
+    if args.db_path:
+        if not Path(args.db_path).exists():
+            print(f"DB 파일이 없습니다: {args.db_path}", file=sys.stderr)
+            raise SystemExit(2)
+        report = bench_existing_database(Path(args.db_path), repeat=args.repeat)
+    else:
+        try:
+            sizes = parse_sizes(args.sizes)
+        except ValueError as error:
+            print(str(error), file=sys.stderr)
+            raise SystemExit(2)
+        work_dir = (
+            nullcontext(args.work_dir) if args.work_dir else tempfile.TemporaryDirectory()
+        )
+        with work_dir as path:
+            report = run_query_bench(
+                sizes,
+                Path(path),
+                repeat=args.repeat,
+                seed=args.seed,
+                progress=_print_progress,
+            )
+
+    for line in format_query_report(report):
+        print(f"[BENCH] {line}")
+    if args.report:
+        report_path = Path(args.report)
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"[BENCH] 리포트 저장: {report_path}")
+
+
 def _read_env() -> Dict[str, str]:
     import os
 
@@ -143,14 +356,20 @@ def _build_cli_overrides(args: argparse.Namespace) -> Dict[str, Any]:
         "timeout_seconds": args.timeout_seconds,
         "max_retries": args.max_retries,
         "concurrency": args.concurrency,
+        "engine": args.engine,
         "max_models": args.max_models,
         "model_id_contains": args.model_id_contains,
         "request_delay_seconds": args.request_delay_seconds,
+        "rate_limit_per_second": args.rate_limit_per_second,
+        "rate_limit_burst": args.rate_limit_burst,
         "repeat_count": args.repeat_count,
         "repeat_interval_minutes": args.repeat_interval_minutes,
         "prompt": args.prompt,
+        "probe_mode": args.probe_mode,
+        "expected_text": args.expected_text,
         "db_path": args.db_path,
         "fail_if_none_ok": args.fail_if_none_ok,
+        "queue_scans": args.enqueue or None,
     }
 
 
@@ -200,6 +419,12 @@ def _build_parser() -> argparse.ArgumentParser:
     )
 
     scan.add_argument("--concurrency", type=int, default=None, help="동시 실행 수")
+    scan.add_argument(
+        "--engine",
+        choices=SCAN_ENGINES,
+        default=None,
+        help="헬스체크 엔진(thread: 스레드 풀, async: httpx 이벤트 루프. 기본: thread)",
+    )
     scan.add_argument(
         "--max-models", type=int, default=None, help="상위 N개 모델만 체크"
     )
@@ -214,7 +439,21 @@ def _build_parser() -> argparse.ArgumentParser:
         dest="request_delay_seconds",
         type=float,
         default=None,
-        help="요청 지연(초). index * delay 만큼 각 모델 체크 시작을 지연",
+        help="요청 간격(초). --rate-limit-per-second가 없으면 초당 1/delay 요청으로 제한",
+    )
+    scan.add_argument(
+        "--rate-limit-per-second",
+        dest="rate_limit_per_second",
+        type=float,
+        default=None,
+        help="모든 프로브/재시도가 공유하는 초당 요청 수(토큰 버킷, 429 시 자동 감속)",
+    )
+    scan.add_argument(
+        "--rate-limit-burst",
+        dest="rate_limit_burst",
+        type=int,
+        default=None,
+        help="토큰 버킷 버스트 크기(기본: 1)",
     )
     scan.add_argument(
         "--request-delay",
@@ -249,6 +488,19 @@ def _build_parser() -> argparse.ArgumentParser:
         default=None,
         help=argparse.SUPPRESS,
     )
+    scan.add_argument(
+        "--probe-mode",
+        dest="probe_mode",
+        choices=PROBE_MODES,
+        default=None,
+        help="프로브 방식(standard: 전체 응답 대기, stream: SSE로 TTFT 측정 후 조기 종료. 기본: standard)",
+    )
+    scan.add_argument(
+        "--expected-text",
+        dest="expected_text",
+        default=None,
+        help="stream 모드에서 이 문자열이 도착하면 스트림을 닫음(기본: OK)",
+    )
     scan.add_argument(
         "--db-path",
         dest="db_path",
@@ -265,6 +517,185 @@ def _build_parser() -> argparse.ArgumentParser:
     scan.add_argument(
         "--fail-if-none-ok", action="store_true", help="성공 모델이 0개면 exit code 3"
     )
+    scan.add_argument(
+        "--enqueue",
+        action="store_true",
+        help="직접 프로브하지 않고 모델별 작업을 DB 작업 큐에 등록(worker 서브커맨드가 처리)",
+    )
+
+    # ── worker subcommand ──────────────────────────────────────
+    worker = subparsers.add_parser(
+        "worker", help="DB 작업 큐에서 프로브 작업을 받아 처리하는 워커로 참여"
+    )
+    worker.add_argument(
+        "--env-file",
+        default=None,
+        help=".env 파일 경로(기본: ./.env). 존재하면 환경변수로 병합 로드",
+    )
+    worker.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="한 번에 임대(lease)해서 동시에 프로브할 작업 수",
+    )
+    worker.add_argument(
+        "--engine",
+        choices=SCAN_ENGINES,
+        default=None,
+        help="헬스체크 엔진(기본: thread)",
+    )
+    worker.add_argument(
+        "--lease-seconds",
+        dest="lease_seconds",
+        type=float,
+        default=None,
+        help="작업 임대 만료 시간(초). 만료된 작업은 다른 워커가 다시 가져감(기본: 300)",
+    )
+    worker.add_argument(
+        "--poll-seconds",
+        type=float,
+        default=5.0,
+        help="큐가 비었을 때 다시 확인하는 간격(초, 기본: 5)",
+    )
+    worker.add_argument(
+        "--worker-id",
+        default=None,
+        help="워커 식별자(기본: 호스트명:PID)",
+    )
+    worker.add_argument(
+        "--drain",
+        action="store_true",
+        help="큐에 남은 작업이 없으면 종료",
+    )
+
+    # ── bench subcommand ───────────────────────────────────────
+    bench = subparsers.add_parser(
+        "bench", help="로컬 OpenRouter 시뮬레이터를 상대로 헬스체크 처리량을 측정"
+    )
+    bench.add_argument("--models", type=int, default=200, help="시뮬레이션할 모델 수(기본: 200)")
+    bench.add_argument("--concurrency", type=int, default=20, help="동시 실행 수(기본: 20)")
+    bench.add_argument(
+        "--engine", choices=SCAN_ENGINES, default="thread", help="헬스체크 엔진(기본: thread)"
+    )
+    bench.add_argument(
+        "--probe-mode",
+        dest="probe_mode",
+        choices=PROBE_MODES,
+        default="standard",
+        help="프로브 방식(기본: standard)",
+    )
+    bench.add_argument(
+        "--max-retries", dest="max_retries", type=int, default=2, help="재시도 횟수(기본: 2)"
+    )
+    bench.add_argument(
+        "--timeout-seconds",
+        dest="timeout_seconds",
+        type=int,
+        default=30,
+        help="요청 타임아웃(초, 기본: 30)",
+    )
+    bench.add_argument(
+        "--latency-ms",
+        dest="latency_ms",
+        type=float,
+        default=200.0,
+        help="모델 응답 지연의 중앙값(ms, 기본: 200)",
+    )
+    bench.add_argument(
+        "--latency-sigma",
+        dest="latency_sigma",
+        type=float,
+        default=0.3,
+        help="응답 지연 로그정규분포의 sigma(0이면 고정 지연, 기본: 0.3)",
+    )
+    bench.add_argument(
+        "--rate-limit-rate",
+        dest="rate_limit_rate",
+        type=float,
+        default=0.0,
+        help="429로 응답할 비율(0~1, 기본: 0)",
+    )
+    bench.add_argument(
+        "--server-error-rate",
+        dest="server_error_rate",
+        type=float,
+        default=0.0,
+        help="503으로 응답할 비율(0~1, 기본: 0)",
+    )
+    bench.add_argument(
+        "--retry-after-seconds",
+        dest="retry_after_seconds",
+        type=float,
+        default=None,
+        help="429/503 응답에 붙일 Retry-After(초, 기본: 없음)",
+    )
+    bench.add_argument(
+        "--trickle-ms",
+        dest="trickle_ms",
+        type=float,
+        default=0.0,
+        help="응답 본문(스트림 이벤트)을 나눠 보낼 때 조각 사이 간격(ms, 기본: 0)",
+    )
+    bench.add_argument(
+        "--profiles",
+        default=None,
+        help="모델별 프로필 JSON 파일(model_id와 바꿀 필드를 담은 객체의 리스트)",
+    )
+    bench.add_argument("--seed", type=int, default=None, help="시뮬레이터 난수 시드")
+    bench.add_argument(
+        "--json", action="store_true", help="결과를 JSON 한 줄로 출력"
+    )
+
+    # ── generate-history subcommand ────────────────────────────
+    generate_history = subparsers.add_parser(
+        "generate-history", help="벤치마크용 합성 스캔 기록으로 새 SQLite DB를 채움"
+    )
+    generate_history.add_argument(
+        "--db-path", dest="db_path", required=True, help="새로 만들 SQLite DB 파일 경로"
+    )
+    generate_history.add_argument(
+        "--models", type=int, default=300, help="모델 수(기본: 300)"
+    )
+    generate_history.add_argument(
+        "--runs", type=int, default=50000, help="스캔 실행 수(기본: 50000)"
+    )
+    generate_history.add_argument(
+        "--run-interval-minutes",
+        dest="run_interval_minutes",
+        type=int,
+        default=15,
+        help="실행 간격(분, 기본: 15). 마지막 실행이 현재 시각",
+    )
+    generate_history.add_argument("--seed", type=int, default=0, help="난수 시드(기본: 0)")
+
+    # ── bench-queries subcommand ───────────────────────────────
+    bench_queries = subparsers.add_parser(
+        "bench-queries", help="합성 기록 위에서 통계 쿼리와 /api 응답 시간·메모리를 측정"
+    )
+    bench_queries.add_argument(
+        "--sizes",
+        default="300x1000,300x10000",
+        help="모델수x실행수 목록(쉼표 구분, 기본: 300x1000,300x10000)",
+    )
+    bench_queries.add_argument(
+        "--db-path",
+        dest="db_path",
+        default=None,
+        help="생성 대신 이 DB를 측정(예: generate-history 결과나 운영 DB 사본)",
+    )
+    bench_queries.add_argument(
+        "--work-dir",
+        dest="work_dir",
+        default=None,
+        help="생성한 DB를 보관할 디렉토리. 같은 크기·시드의 DB가 있으면 재사용(기본: 임시 디렉토리)",
+    )
+    bench_queries.add_argument(
+        "--repeat", type=int, default=5, help="쿼리별 측정 반복 횟수(기본: 5)"
+    )
+    bench_queries.add_argument("--seed", type=int, default=0, help="난수 시드(기본: 0)")
+    bench_queries.add_argument(
+        "--report", default=None, help="JSON 리포트를 저장할 경로"
+    )
 
     # ── serve subcommand ───────────────────────────────────────
     serve = subparsers.add_parser(
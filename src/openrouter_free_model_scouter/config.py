@@ -85,20 +85,47 @@ def _parse_csv_string_list(value: Any) -> List[str]:
 
 @dataclass(frozen=True)
 class AppConfig:
+    # The first key of ``api_keys``.
     api_key: str
+    api_keys: List[str]
+    key_cooldown_seconds: float
     base_url: str
     http_referer: Optional[str]
     x_title: Optional[str]
     timeout_seconds: int
     max_retries: int
+    max_retry_after_seconds: float
     concurrency: int
+    engine: str
+    pool_size: Optional[int]
+    http2: bool
     max_models: Optional[int]
     model_id_contains: List[str]
     request_delay_seconds: float
+    rate_limit_per_second: Optional[float]
+    rate_limit_burst: int
+    rate_limit_max_per_second: Optional[float]
     repeat_count: int
     repeat_interval_minutes: float
     interval_hours: float
+    schedule: str
+    min_probe_interval_minutes: float
+    max_probe_interval_hours: float
+    schedule_tick_minutes: float
+    model_probes_per_hour: int
+    request_budget_per_hour: int
+    catalog_refresh_minutes: float
+    breaker_failure_threshold: int
+    breaker_cooldown_minutes: float
+    breaker_max_cooldown_hours: float
+    queue_scans: bool
+    lease_seconds: float
+    raw_retention_days: float
+    hourly_retention_days: float
+    retention_interval_hours: float
     prompt: str
+    probe_mode: str
+    expected_text: str
     db_path: Path
     fail_if_none_ok: bool
     web_host: str
@@ -121,7 +148,13 @@ class AppConfig:
                 return _parse_scalar(env[env_key])
             return default
 
-        api_key = resolve("api_key", "OPENROUTER_API_KEY", "")
+        # A comma-separated pool of keys; see key_pool.ApiKeyPool.
+        api_keys = _parse_csv_string_list(resolve("api_key", "OPENROUTER_API_KEY", None))
+        key_cooldown_seconds = float(
+            resolve(
+                "key_cooldown_seconds", "OPENROUTER_SCOUT_KEY_COOLDOWN_SECONDS", 60.0
+            )
+        )
         base_url = resolve(
             "base_url",
             "OPENROUTER_BASE_URL",
@@ -135,7 +168,20 @@ class AppConfig:
             resolve("timeout_seconds", "OPENROUTER_SCOUT_TIMEOUT_SECONDS", 20)
         )
         max_retries = int(resolve("max_retries", "OPENROUTER_SCOUT_MAX_RETRIES", 2))
+        max_retry_after_seconds = float(
+            resolve(
+                "max_retry_after_seconds",
+                "OPENROUTER_SCOUT_MAX_RETRY_AFTER_SECONDS",
+                60.0,
+            )
+        )
         concurrency = int(resolve("concurrency", "OPENROUTER_SCOUT_CONCURRENCY", 2))
+        engine = str(resolve("engine", "OPENROUTER_SCOUT_ENGINE", "thread")).lower()
+
+        pool_size = resolve("pool_size", "OPENROUTER_SCOUT_POOL_SIZE", None)
+        if pool_size is not None:
+            pool_size = int(pool_size)
+        http2 = bool(resolve("http2", "OPENROUTER_SCOUT_HTTP2", True))
 
         max_models = resolve("max_models", "OPENROUTER_SCOUT_MAX_MODELS", None)
         if max_models is not None:
@@ -155,6 +201,28 @@ class AppConfig:
             )
         )
 
+        # The rate limiter replaces the old "index * delay" stagger; without an
+        # explicit rate, the legacy delay is read as one request per delay.
+        rate_limit_per_second = resolve(
+            "rate_limit_per_second", "OPENROUTER_SCOUT_RATE_LIMIT_PER_SECOND", None
+        )
+        if rate_limit_per_second is not None:
+            rate_limit_per_second = float(rate_limit_per_second)
+        elif request_delay_seconds > 0:
+            rate_limit_per_second = 1.0 / request_delay_seconds
+
+        rate_limit_burst = int(
+            resolve("rate_limit_burst", "OPENROUTER_SCOUT_RATE_LIMIT_BURST", 1)
+        )
+
+        rate_limit_max_per_second = resolve(
+            "rate_limit_max_per_second",
+            "OPENROUTER_SCOUT_RATE_LIMIT_MAX_PER_SECOND",
+            None,
+        )
+        if rate_limit_max_per_second is not None:
+            rate_limit_max_per_second = float(rate_limit_max_per_second)
+
         repeat_count = int(resolve("repeat_count", "OPENROUTER_SCOUT_REPEAT_COUNT", 1))
         repeat_interval_minutes = float(
             resolve(
@@ -172,12 +240,114 @@ class AppConfig:
             )
         )
 
+        # "adaptive" probes each model on its own interval; see
+        # worker.adaptive_scheduler. 0 budgets mean no limit.
+        schedule = str(resolve("schedule", "OPENROUTER_SCOUT_SCHEDULE", "fixed")).lower()
+        min_probe_interval_minutes = float(
+            resolve(
+                "min_probe_interval_minutes",
+                "OPENROUTER_SCOUT_MIN_PROBE_INTERVAL_MINUTES",
+                15.0,
+            )
+        )
+        max_probe_interval_hours = float(
+            resolve(
+                "max_probe_interval_hours",
+                "OPENROUTER_SCOUT_MAX_PROBE_INTERVAL_HOURS",
+                6.0,
+            )
+        )
+        schedule_tick_minutes = float(
+            resolve(
+                "schedule_tick_minutes", "OPENROUTER_SCOUT_SCHEDULE_TICK_MINUTES", 5.0
+            )
+        )
+        model_probes_per_hour = int(
+            resolve(
+                "model_probes_per_hour", "OPENROUTER_SCOUT_MODEL_PROBES_PER_HOUR", 4
+            )
+        )
+        request_budget_per_hour = int(
+            resolve(
+                "request_budget_per_hour",
+                "OPENROUTER_SCOUT_REQUEST_BUDGET_PER_HOUR",
+                0,
+            )
+        )
+
+        # 0 turns off the catalog checks between fixed-interval scans.
+        catalog_refresh_minutes = float(
+            resolve(
+                "catalog_refresh_minutes",
+                "OPENROUTER_SCOUT_CATALOG_REFRESH_MINUTES",
+                15.0,
+            )
+        )
+
+        # See circuit_breaker.CircuitBreakers; a threshold of 0 turns it off.
+        breaker_failure_threshold = int(
+            resolve(
+                "breaker_failure_threshold",
+                "OPENROUTER_SCOUT_BREAKER_FAILURE_THRESHOLD",
+                5,
+            )
+        )
+        breaker_cooldown_minutes = float(
+            resolve(
+                "breaker_cooldown_minutes",
+                "OPENROUTER_SCOUT_BREAKER_COOLDOWN_MINUTES",
+                30.0,
+            )
+        )
+        breaker_max_cooldown_hours = float(
+            resolve(
+                "breaker_max_cooldown_hours",
+                "OPENROUTER_SCOUT_BREAKER_MAX_COOLDOWN_HOURS",
+                24.0,
+            )
+        )
+
+        # Queued scans are probed by `scouter worker` processes; see
+        # worker.job_queue.
+        queue_scans = bool(resolve("queue_scans", "OPENROUTER_SCOUT_QUEUE_SCANS", False))
+        lease_seconds = float(
+            resolve("lease_seconds", "OPENROUTER_SCOUT_LEASE_SECONDS", 300.0)
+        )
+
+        # 0 keeps the data forever; daily rollups are always kept.
+        raw_retention_days = float(
+            resolve(
+                "raw_retention_days", "OPENROUTER_SCOUT_RAW_RETENTION_DAYS", 90.0
+            )
+        )
+        hourly_retention_days = float(
+            resolve(
+                "hourly_retention_days",
+                "OPENROUTER_SCOUT_HOURLY_RETENTION_DAYS",
+                180.0,
+            )
+        )
+        retention_interval_hours = float(
+            resolve(
+                "retention_interval_hours",
+                "OPENROUTER_SCOUT_RETENTION_INTERVAL_HOURS",
+                24.0,
+            )
+        )
+
         prompt = str(
             resolve(
                 "prompt", "OPENROUTER_SCOUT_PROMPT", "Respond with the exact text: OK"
             )
         )
 
+        probe_mode = str(
+            resolve("probe_mode", "OPENROUTER_SCOUT_PROBE_MODE", "standard")
+        ).lower()
+        expected_text = str(
+            resolve("expected_text", "OPENROUTER_SCOUT_EXPECTED_TEXT", "OK")
+        )
+
         db_path_value = resolve(
             "db_path",
             "OPENROUTER_SCOUT_DB_PATH",
@@ -193,22 +363,55 @@ class AppConfig:
         web_port = int(resolve("web_port", "OPENROUTER_SCOUT_WEB_PORT", 8000))
 
         return AppConfig(
-            api_key=str(api_key),
+            api_key=api_keys[0] if api_keys else "",
+            api_keys=api_keys,
+            key_cooldown_seconds=key_cooldown_seconds,
             base_url=str(base_url).rstrip("/"),
             http_referer=str(http_referer) if http_referer else None,
             x_title=str(x_title) if x_title else None,
             timeout_seconds=timeout_seconds,
             max_retries=max_retries,
+            max_retry_after_seconds=max_retry_after_seconds,
             concurrency=concurrency,
+            engine=engine,
+            pool_size=pool_size,
+            http2=http2,
             max_models=max_models,
             model_id_contains=model_id_contains,
             request_delay_seconds=request_delay_seconds,
+            rate_limit_per_second=rate_limit_per_second,
+            rate_limit_burst=rate_limit_burst,
+            rate_limit_max_per_second=rate_limit_max_per_second,
             repeat_count=repeat_count,
             repeat_interval_minutes=repeat_interval_minutes,
             interval_hours=interval_hours,
+            schedule=schedule,
+            min_probe_interval_minutes=min_probe_interval_minutes,
+            max_probe_interval_hours=max_probe_interval_hours,
+            schedule_tick_minutes=schedule_tick_minutes,
+            model_probes_per_hour=model_probes_per_hour,
+            request_budget_per_hour=request_budget_per_hour,
+            catalog_refresh_minutes=catalog_refresh_minutes,
+            breaker_failure_threshold=breaker_failure_threshold,
+            breaker_cooldown_minutes=breaker_cooldown_minutes,
+            breaker_max_cooldown_hours=breaker_max_cooldown_hours,
+            queue_scans=queue_scans,
+            lease_seconds=lease_seconds,
+            raw_retention_days=raw_retention_days,
+            hourly_retention_days=hourly_retention_days,
+            retention_interval_hours=retention_interval_hours,
             prompt=prompt,
+            probe_mode=probe_mode,
+            expected_text=expected_text,
             db_path=db_path,
             fail_if_none_ok=fail_if_none_ok,
             web_host=web_host,
             web_port=web_port,
         )
+
+    @property
+    def effective_pool_size(self) -> int:
+        # Keep-alive connections to openrouter.ai; default to one per in-flight probe.
+        if self.pool_size is not None:
+            return max(1, self.pool_size)
+        return max(1, self.concurrency)
@@ -1,25 +1,86 @@
-from sqlalchemy import create_engine
+from functools import partial
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 
+from .migrations import upgrade_schema
+
 DB_PATH = os.environ.get("OPENROUTER_SCOUT_DB_PATH", "results/scouter.db")
 # Ensure directory exists
 os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
 
 SQLALCHEMY_DATABASE_URL = f"sqlite:///{DB_PATH}"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# How long a connection waits on a lock before raising "database is locked".
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("OPENROUTER_SCOUT_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.environ.get("OPENROUTER_SCOUT_SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KIB = int(os.environ.get("OPENROUTER_SCOUT_SQLITE_CACHE_SIZE_KIB", "65536"))
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record, read_only=False):
+    cursor = dbapi_connection.cursor()
+    try:
+        if not read_only:
+            # Only takes effect on a new file; lets the retention job give
+            # deleted pages back with incremental_vacuum (see retention.py).
+            cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            # WAL lets readers keep reading their snapshot while a scan writes;
+            # the mode is stored in the file, so readers inherit it.
+            cursor.execute("PRAGMA journal_mode=WAL")
+        # NORMAL is durable across application crashes in WAL mode and skips
+        # the fsync on every commit.
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        # Negative values are KiB rather than pages.
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KIB}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+def create_sqlite_engine(url, *, read_only=False, pool_size=5):
+    """Engine with the scouter's SQLite pragmas applied to every new connection."""
+    sqlite_engine = create_engine(
+        url,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+        },
+        pool_size=pool_size,
+        max_overflow=pool_size,
+    )
+    event.listen(
+        sqlite_engine, "connect", partial(_set_sqlite_pragmas, read_only=read_only)
+    )
+    return sqlite_engine
+
+
+# Scans and init_db write through ``engine``; API requests only ever read, on
+# their own pool, so a long scan never queues dashboard requests behind it.
+engine = create_sqlite_engine(SQLALCHEMY_DATABASE_URL)
+read_engine = create_sqlite_engine(SQLALCHEMY_DATABASE_URL, read_only=True, pool_size=10)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
 
-def init_db():
+def init_db(bind=None):
     from . import models  # Ensure models are imported before creating tables
 
-    Base.metadata.create_all(bind=engine)
+    bind = bind if bind is not None else engine
+    # Existing files are upgraded in place by the versioned migrations;
+    # create_all only covers tables no migration knows about.
+    raw_connection = bind.raw_connection()
+    try:
+        upgrade_schema(raw_connection)
+    finally:
+        raw_connection.close()
+    Base.metadata.create_all(bind=bind)
 
 
 def get_db():
@@ -28,3 +89,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -31,3 +31,19 @@ class HealthcheckResult:
     error_category: Optional[str]
     error_message: Optional[str]
     response_preview: Optional[str]
+    # Populated by the streaming probe mode only; all relative to the start of
+    # the successful attempt.
+    ttfb_ms: Optional[int] = None
+    ttft_ms: Optional[int] = None
+    total_ms: Optional[int] = None
+    tokens_per_second: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class StreamedCompletion:
+    response: HttpResponse
+    content: str
+    ttfb_ms: Optional[int]
+    ttft_ms: Optional[int]
+    total_ms: int
+    completion_tokens: int
@@ -1,15 +1,40 @@
 from __future__ import annotations
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from datetime import datetime, timezone
+import heapq
+import itertools
 import time
-from typing import List, Optional
+from typing import Callable, Deque, Dict, List, Optional, Tuple, Union
 from uuid import uuid4
 
-from .domain_models import HealthcheckResult, ModelInfo
-from .http_client import sleep_with_backoff
-from .openrouter_client import OpenRouterClient
+from .circuit_breaker import (
+    PROBE_HALF_OPEN,
+    PROBE_SKIP,
+    CircuitBreakers,
+    skipped_result,
+)
+from .domain_models import (
+    HealthcheckResult,
+    HttpResponse,
+    ModelInfo,
+    StreamedCompletion,
+)
+from .http_client import decorrelated_jitter_delay, server_retry_delay
+from .openrouter_client import AsyncOpenRouterClient, OpenRouterClient
+from .rate_limiter import TokenBucketRateLimiter
+
+DEFAULT_MAX_RETRY_AFTER_SECONDS = 60.0
+
+# "standard" waits for the whole completion; "stream" reads it as SSE and
+# records time-to-first-token, closing the stream once ``expected_text`` shows.
+PROBE_MODES = ("standard", "stream")
+DEFAULT_EXPECTED_TEXT = "OK"
+
+ResultCallback = Callable[[HealthcheckResult], None]
 
 
 @dataclass(frozen=True)
@@ -20,170 +45,226 @@ class HealthcheckSummary:
     failed: int
 
 
-class HealthcheckService:
-    def __init__(self, openrouter_client: OpenRouterClient) -> None:
-        self._openrouter_client = openrouter_client
+@dataclass(frozen=True)
+class _AttemptOutcome:
+    http_status: Optional[int]
+    error_category: Optional[str]
+    error_message: Optional[str]
+    retryable: bool
 
-    def check_models(
+    @property
+    def ok(self) -> bool:
+        return self.error_category is None
+
+
+@dataclass(frozen=True)
+class _ProbeSettings:
+    run_id: str
+    prompt: str
+    timeout_seconds: int
+    max_retries: int
+    max_retry_after_seconds: float
+    rate_limiter: Optional[TokenBucketRateLimiter]
+    probe_mode: str = "standard"
+    expected_text: str = DEFAULT_EXPECTED_TEXT
+    breakers: Optional[CircuitBreakers] = None
+
+    @property
+    def streaming(self) -> bool:
+        return self.probe_mode == "stream"
+
+
+@dataclass
+class _ProbeState:
+    model_id: str
+    start_time: float = 0.0
+    attempts: int = 0
+    previous_delay: float = 0.0
+    # Half-open circuit probes get a single attempt.
+    max_retries: Optional[int] = None
+
+
+class _HealthcheckServiceBase:
+    """Response classification, retry planning and result building shared by both engines."""
+
+    def __init__(
         self,
-        models: List[ModelInfo],
         *,
-        prompt: str,
-        timeout_seconds: int,
-        max_retries: int,
-        concurrency: int,
-        request_delay_seconds: float,
-    ) -> List[HealthcheckResult]:
-        run_id = str(uuid4())
-
-        def task(index: int, model: ModelInfo) -> HealthcheckResult:
-            if request_delay_seconds > 0:
-                time.sleep(request_delay_seconds * index)
-            return self._check_single_model(
-                run_id=run_id,
-                model_id=model.model_id,
-                prompt=prompt,
-                timeout_seconds=timeout_seconds,
-                max_retries=max_retries,
+        retry_base_seconds: float = 0.5,
+        retry_max_seconds: float = 8.0,
+    ) -> None:
+        self._retry_base_seconds = retry_base_seconds
+        self._retry_max_seconds = retry_max_seconds
+
+    def _admit(
+        self,
+        models: List[ModelInfo],
+        settings: _ProbeSettings,
+        on_result: Optional[ResultCallback],
+    ) -> Tuple[List[_ProbeState], List[HealthcheckResult]]:
+        """Probe states for the models to check, and results for the skipped ones."""
+        states: List[_ProbeState] = []
+        skipped: List[HealthcheckResult] = []
+        for model in models:
+            decision = (
+                settings.breakers.decide(model.model_id)
+                if settings.breakers is not None
+                else None
+            )
+            if decision == PROBE_SKIP:
+                result = skipped_result(
+                    settings.run_id, settings.breakers.state_of(model.model_id), _now_iso()
+                )
+                skipped.append(result)
+                if on_result is not None:
+                    on_result(result)
+            elif decision == PROBE_HALF_OPEN:
+                states.append(_ProbeState(model_id=model.model_id, max_retries=0))
+            else:
+                states.append(_ProbeState(model_id=model.model_id))
+        return states, skipped
+
+    def _resolve_attempt(
+        self,
+        state: _ProbeState,
+        settings: _ProbeSettings,
+        response: Optional[HttpResponse],
+        failure_message: Optional[str],
+        stream: Optional[StreamedCompletion] = None,
+    ) -> Union[HealthcheckResult, float]:
+        """Turn one attempt into a final result, or the delay before the next one."""
+        step = self._next_step(state, settings, response, failure_message, stream)
+        if settings.breakers is not None and isinstance(step, HealthcheckResult):
+            settings.breakers.record(step)
+        return step
+
+    def _next_step(
+        self,
+        state: _ProbeState,
+        settings: _ProbeSettings,
+        response: Optional[HttpResponse],
+        failure_message: Optional[str],
+        stream: Optional[StreamedCompletion] = None,
+    ) -> Union[HealthcheckResult, float]:
+        state.attempts += 1
+        if settings.rate_limiter is not None and response is not None:
+            settings.rate_limiter.on_response(response.status_code, response.headers)
+
+        outcome = self._evaluate_attempt(response, failure_message)
+
+        if outcome.ok and response is not None:
+            return self._build_success_result(
+                run_id=settings.run_id,
+                model_id=state.model_id,
+                attempts=state.attempts,
+                start_time=state.start_time,
+                response=response,
+                stream=stream,
             )
 
-        results: List[HealthcheckResult] = []
-        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
-            futures = [
-                executor.submit(task, index, model)
-                for index, model in enumerate(models)
-            ]
-            for future in as_completed(futures):
-                results.append(future.result())
+        max_retries = settings.max_retries if state.max_retries is None else state.max_retries
+        if outcome.retryable and state.attempts <= max_retries:
+            delay = self._plan_retry(state, settings, response)
+            if delay is not None:
+                return delay
 
-        results.sort(key=lambda item: item.model_id)
-        return results
+        return self._build_failure_result(
+            run_id=settings.run_id,
+            model_id=state.model_id,
+            attempts=state.attempts,
+            start_time=state.start_time,
+            http_status=outcome.http_status,
+            error_category=outcome.error_category or "unexpected",
+            error_message=outcome.error_message or "알 수 없는 오류",
+        )
 
-    def _check_single_model(
+    def _plan_retry(
         self,
-        *,
-        run_id: str,
-        model_id: str,
-        prompt: str,
-        timeout_seconds: int,
-        max_retries: int,
-    ) -> HealthcheckResult:
-        last_error_category: Optional[str] = None
-        last_error_message: Optional[str] = None
-        last_status: Optional[int] = None
+        state: _ProbeState,
+        settings: _ProbeSettings,
+        response: Optional[HttpResponse],
+    ) -> Optional[float]:
+        requested = None
+        if response is not None:
+            requested = server_retry_delay(response.status_code, response.headers)
+
+        if requested is not None:
+            # A wait longer than we are willing to park (e.g. a daily quota
+            # reset) will not succeed within this scan; give up right away.
+            if requested > settings.max_retry_after_seconds:
+                return None
+            delay = requested
+        else:
+            delay = decorrelated_jitter_delay(
+                state.previous_delay,
+                base_seconds=self._retry_base_seconds,
+                max_seconds=self._retry_max_seconds,
+            )
 
-        start_time = time.monotonic()
+        state.previous_delay = delay
+        return delay
 
-        for attempt in range(0, max_retries + 1):
-            response, failure_message = self._openrouter_client.chat_completion(
-                model_id=model_id,
-                prompt=prompt,
-                timeout_seconds=timeout_seconds,
-            )
+    def _evaluate_attempt(
+        self,
+        response: Optional[HttpResponse],
+        failure_message: Optional[str],
+    ) -> _AttemptOutcome:
+        if failure_message is not None:
+            return _AttemptOutcome(None, "network", failure_message, True)
 
-            if failure_message is not None:
-                last_error_category = "network"
-                last_error_message = failure_message
-                if attempt < max_retries:
-                    sleep_with_backoff(attempt)
-                    continue
-                return self._build_failure_result(
-                    run_id=run_id,
-                    model_id=model_id,
-                    attempts=attempt + 1,
-                    start_time=start_time,
-                    http_status=None,
-                    error_category=last_error_category,
-                    error_message=last_error_message,
-                )
+        if response is None:
+            return _AttemptOutcome(None, "unexpected", "응답이 비어있음", True)
 
-            if response is None:
-                last_error_category = "unexpected"
-                last_error_message = "응답이 비어있음"
-                if attempt < max_retries:
-                    sleep_with_backoff(attempt)
-                    continue
-                return self._build_failure_result(
-                    run_id=run_id,
-                    model_id=model_id,
-                    attempts=attempt + 1,
-                    start_time=start_time,
-                    http_status=None,
-                    error_category=last_error_category,
-                    error_message=last_error_message,
-                )
+        status_code = response.status_code
 
-            last_status = response.status_code
+        if status_code == 429:
+            return _AttemptOutcome(
+                status_code, "rate_limited", self._extract_error_message(response), True
+            )
 
-            if response.status_code == 429:
-                last_error_category = "rate_limited"
-                last_error_message = self._extract_error_message(response)
-                if attempt < max_retries:
-                    sleep_with_backoff(attempt)
-                    continue
-                return self._build_failure_result(
-                    run_id=run_id,
-                    model_id=model_id,
-                    attempts=attempt + 1,
-                    start_time=start_time,
-                    http_status=last_status,
-                    error_category=last_error_category,
-                    error_message=last_error_message,
-                )
+        if status_code >= 500:
+            return _AttemptOutcome(
+                status_code, "server_error", self._extract_error_message(response), True
+            )
 
-            if response.status_code >= 500:
-                last_error_category = "server_error"
-                last_error_message = self._extract_error_message(response)
-                if attempt < max_retries:
-                    sleep_with_backoff(attempt)
-                    continue
-                return self._build_failure_result(
-                    run_id=run_id,
-                    model_id=model_id,
-                    attempts=attempt + 1,
-                    start_time=start_time,
-                    http_status=last_status,
-                    error_category=last_error_category,
-                    error_message=last_error_message,
-                )
+        if status_code >= 400:
+            return _AttemptOutcome(
+                status_code, "client_error", self._extract_error_message(response), False
+            )
 
-            if response.status_code >= 400:
-                last_error_category = "client_error"
-                last_error_message = self._extract_error_message(response)
-                return self._build_failure_result(
-                    run_id=run_id,
-                    model_id=model_id,
-                    attempts=attempt + 1,
-                    start_time=start_time,
-                    http_status=last_status,
-                    error_category=last_error_category,
-                    error_message=last_error_message,
-                )
+        return _AttemptOutcome(status_code, None, None, False)
 
+    def _build_success_result(
+        self,
+        *,
+        run_id: str,
+        model_id: str,
+        attempts: int,
+        start_time: float,
+        response: HttpResponse,
+        stream: Optional[StreamedCompletion] = None,
+    ) -> HealthcheckResult:
+        latency_ms = int((time.monotonic() - start_time) * 1000)
+        if stream is None:
             content_preview = self._extract_content_preview(response)
-            latency_ms = int((time.monotonic() - start_time) * 1000)
-
-            return HealthcheckResult(
-                run_id=run_id,
-                timestamp_iso=_now_iso(),
-                model_id=model_id,
-                ok=True,
-                http_status=response.status_code,
-                latency_ms=latency_ms,
-                attempts=attempt + 1,
-                error_category=None,
-                error_message=None,
-                response_preview=content_preview,
-            )
+        else:
+            content_preview = _trim_preview(stream.content)
 
-        return self._build_failure_result(
+        return HealthcheckResult(
             run_id=run_id,
+            timestamp_iso=_now_iso(),
             model_id=model_id,
-            attempts=max_retries + 1,
-            start_time=start_time,
-            http_status=last_status,
-            error_category=last_error_category or "unexpected",
-            error_message=last_error_message or "알 수 없는 오류",
+            ok=True,
+            http_status=response.status_code,
+            latency_ms=latency_ms,
+            attempts=attempts,
+            error_category=None,
+            error_message=None,
+            response_preview=content_preview,
+            ttfb_ms=stream.ttfb_ms if stream else None,
+            ttft_ms=stream.ttft_ms if stream else None,
+            total_ms=stream.total_ms if stream else None,
+            tokens_per_second=_tokens_per_second(stream) if stream else None,
         )
 
     def _extract_content_preview(self, response) -> Optional[str]:
@@ -206,10 +287,7 @@ class HealthcheckService:
         if not isinstance(content, str):
             return None
 
-        stripped = content.strip()
-        if len(stripped) > 160:
-            return stripped[:160]
-        return stripped
+        return _trim_preview(content)
 
     def _extract_error_message(self, response) -> str:
         if response.json_body is None:
@@ -249,5 +327,287 @@ class HealthcheckService:
         )
 
 
+class HealthcheckService(_HealthcheckServiceBase):
+    """Probes models on a thread pool, one request per task.
+
+    Each pool task performs a single attempt. Retries and rate-limiter waits
+    are parked on a timer heap owned by the calling thread, so a model waiting
+    for ``Retry-After`` does not keep a worker thread asleep while other
+    models are still queued. ``on_result`` is called from that same calling
+    thread as each model finishes, so it may safely use the caller's session.
+    """
+
+    def __init__(
+        self,
+        openrouter_client: OpenRouterClient,
+        *,
+        retry_base_seconds: float = 0.5,
+        retry_max_seconds: float = 8.0,
+    ) -> None:
+        super().__init__(
+            retry_base_seconds=retry_base_seconds, retry_max_seconds=retry_max_seconds
+        )
+        self._openrouter_client = openrouter_client
+
+    def check_models(
+        self,
+        models: List[ModelInfo],
+        *,
+        prompt: str,
+        timeout_seconds: int,
+        max_retries: int,
+        concurrency: int,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        max_retry_after_seconds: float = DEFAULT_MAX_RETRY_AFTER_SECONDS,
+        probe_mode: str = "standard",
+        expected_text: str = DEFAULT_EXPECTED_TEXT,
+        on_result: Optional[ResultCallback] = None,
+        breakers: Optional[CircuitBreakers] = None,
+    ) -> List[HealthcheckResult]:
+        settings = _build_settings(
+            prompt=prompt,
+            timeout_seconds=timeout_seconds,
+            max_retries=max_retries,
+            max_retry_after_seconds=max_retry_after_seconds,
+            rate_limiter=rate_limiter,
+            probe_mode=probe_mode,
+            expected_text=expected_text,
+            breakers=breakers,
+        )
+        max_in_flight = max(1, concurrency)
+
+        states, results = self._admit(models, settings, on_result)
+        fresh: Deque[_ProbeState] = deque(states)
+        # Retries waiting out their back-off, and states holding a rate-limit
+        # token until it comes due. The latter already count towards
+        # ``max_in_flight`` and are started as soon as their token is due,
+        # whatever else is running.
+        parked: List[Tuple[float, int, _ProbeState]] = []
+        token_waits: List[Tuple[float, int, _ProbeState]] = []
+        sequence = itertools.count()
+        in_flight: Dict[Future, _ProbeState] = {}
+
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            while fresh or parked or token_waits or in_flight:
+                now = time.monotonic()
+
+                while token_waits and token_waits[0][0] <= now:
+                    state = heapq.heappop(token_waits)[2]
+                    in_flight[executor.submit(self._run_attempt, state, settings)] = state
+
+                while len(in_flight) + len(token_waits) < max_in_flight:
+                    if parked and parked[0][0] <= now:
+                        state = heapq.heappop(parked)[2]
+                    elif fresh:
+                        state = fresh.popleft()
+                    else:
+                        break
+
+                    if rate_limiter is not None:
+                        token_wait = rate_limiter.reserve()
+                        if token_wait > 0:
+                            heapq.heappush(
+                                token_waits, (now + token_wait, next(sequence), state)
+                            )
+                            continue
+
+                    in_flight[executor.submit(self._run_attempt, state, settings)] = state
+
+                due = [token_waits[0][0]] if token_waits else []
+                if parked and len(in_flight) + len(token_waits) < max_in_flight:
+                    due.append(parked[0][0])
+                timeout = max(0.0, min(due) - time.monotonic()) if due else None
+
+                if not in_flight:
+                    if timeout:
+                        time.sleep(timeout)
+                    continue
+
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    state = in_flight.pop(future)
+                    step = future.result()
+                    if isinstance(step, HealthcheckResult):
+                        results.append(step)
+                        if on_result is not None:
+                            on_result(step)
+                    else:
+                        heapq.heappush(
+                            parked, (time.monotonic() + step, next(sequence), state)
+                        )
+
+        results.sort(key=lambda item: item.model_id)
+        return results
+
+    def _run_attempt(
+        self, state: _ProbeState, settings: _ProbeSettings
+    ) -> Union[HealthcheckResult, float]:
+        if state.attempts == 0:
+            state.start_time = time.monotonic()
+        if settings.streaming:
+            stream, failure_message = self._openrouter_client.chat_completion_stream(
+                model_id=state.model_id,
+                prompt=settings.prompt,
+                timeout_seconds=settings.timeout_seconds,
+                stop_text=settings.expected_text,
+            )
+            response = stream.response if stream is not None else None
+            return self._resolve_attempt(
+                state, settings, response, failure_message, stream
+            )
+        response, failure_message = self._openrouter_client.chat_completion(
+            model_id=state.model_id,
+            prompt=settings.prompt,
+            timeout_seconds=settings.timeout_seconds,
+        )
+        return self._resolve_attempt(state, settings, response, failure_message)
+
+
+class AsyncHealthcheckService(_HealthcheckServiceBase):
+    """Probes every model as a coroutine on a single event loop.
+
+    ``concurrency`` bounds in-flight requests with a semaphore instead of a
+    thread pool, so it can be raised to the size of the whole catalog. A
+    probe only holds the semaphore while its request is on the wire.
+    ``on_result`` runs on the event loop as each model finishes.
+    """
+
+    def __init__(
+        self,
+        openrouter_client: AsyncOpenRouterClient,
+        *,
+        retry_base_seconds: float = 0.5,
+        retry_max_seconds: float = 8.0,
+    ) -> None:
+        super().__init__(
+            retry_base_seconds=retry_base_seconds, retry_max_seconds=retry_max_seconds
+        )
+        self._openrouter_client = openrouter_client
+
+    async def check_models(
+        self,
+        models: List[ModelInfo],
+        *,
+        prompt: str,
+        timeout_seconds: int,
+        max_retries: int,
+        concurrency: int,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        max_retry_after_seconds: float = DEFAULT_MAX_RETRY_AFTER_SECONDS,
+        probe_mode: str = "standard",
+        expected_text: str = DEFAULT_EXPECTED_TEXT,
+        on_result: Optional[ResultCallback] = None,
+        breakers: Optional[CircuitBreakers] = None,
+    ) -> List[HealthcheckResult]:
+        settings = _build_settings(
+            prompt=prompt,
+            timeout_seconds=timeout_seconds,
+            max_retries=max_retries,
+            max_retry_after_seconds=max_retry_after_seconds,
+            rate_limiter=rate_limiter,
+            probe_mode=probe_mode,
+            expected_text=expected_text,
+            breakers=breakers,
+        )
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        states, results = self._admit(models, settings, on_result)
+        results += await asyncio.gather(
+            *(
+                self._check_single_model(state, settings, semaphore, on_result)
+                for state in states
+            )
+        )
+        results.sort(key=lambda item: item.model_id)
+        return results
+
+    async def _check_single_model(
+        self,
+        state: _ProbeState,
+        settings: _ProbeSettings,
+        semaphore: asyncio.Semaphore,
+        on_result: Optional[ResultCallback] = None,
+    ) -> HealthcheckResult:
+        while True:
+            # Wait for a token before taking a slot so throttled probes do not
+            # hold one of the ``concurrency`` in-flight slots.
+            if settings.rate_limiter is not None:
+                await settings.rate_limiter.acquire_async()
+            stream: Optional[StreamedCompletion] = None
+            async with semaphore:
+                if state.attempts == 0:
+                    state.start_time = time.monotonic()
+                if settings.streaming:
+                    stream, failure_message = (
+                        await self._openrouter_client.chat_completion_stream(
+                            model_id=state.model_id,
+                            prompt=settings.prompt,
+                            timeout_seconds=settings.timeout_seconds,
+                            stop_text=settings.expected_text,
+                        )
+                    )
+                    response = stream.response if stream is not None else None
+                else:
+                    response, failure_message = (
+                        await self._openrouter_client.chat_completion(
+                            model_id=state.model_id,
+                            prompt=settings.prompt,
+                            timeout_seconds=settings.timeout_seconds,
+                        )
+                    )
+
+            step = self._resolve_attempt(
+                state, settings, response, failure_message, stream
+            )
+            if isinstance(step, HealthcheckResult):
+                if on_result is not None:
+                    on_result(step)
+                return step
+            await asyncio.sleep(step)
+
+
+def _build_settings(
+    *,
+    prompt: str,
+    timeout_seconds: int,
+    max_retries: int,
+    max_retry_after_seconds: float,
+    rate_limiter: Optional[TokenBucketRateLimiter],
+    probe_mode: str,
+    expected_text: str,
+    breakers: Optional[CircuitBreakers] = None,
+) -> _ProbeSettings:
+    if probe_mode not in PROBE_MODES:
+        raise ValueError(f"Unknown probe mode: {probe_mode}")
+    return _ProbeSettings(
+        run_id=str(uuid4()),
+        prompt=prompt,
+        timeout_seconds=timeout_seconds,
+        max_retries=max_retries,
+        max_retry_after_seconds=max_retry_after_seconds,
+        rate_limiter=rate_limiter,
+        probe_mode=probe_mode,
+        expected_text=expected_text,
+        breakers=breakers,
+    )
+
+
+def _trim_preview(content: str) -> str:
+    stripped = content.strip()
+    if len(stripped) > 160:
+        return stripped[:160]
+    return stripped
+
+
+def _tokens_per_second(stream: StreamedCompletion) -> Optional[float]:
+    # Decode throughput after the first token; undefined for a single token.
+    if stream.ttft_ms is None or stream.completion_tokens < 2:
+        return None
+    generation_ms = stream.total_ms - stream.ttft_ms
+    if generation_ms <= 0:
+        return None
+    return round((stream.completion_tokens - 1) * 1000 / generation_ms, 2)
+
+
 def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat(timespec="seconds")
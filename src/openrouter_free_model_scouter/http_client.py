@@ -1,15 +1,22 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+import importlib.util
 import json
-import socket
+import random
 import time
-from typing import Any, Dict, Mapping, Optional, Tuple
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import httpx
 
 from .domain_models import HttpResponse
 
+DEFAULT_POOL_SIZE = 10
+
+_RANDOM = random.Random()
+
 
 @dataclass(frozen=True)
 class HttpRequestFailure:
@@ -19,6 +26,36 @@ class HttpRequestFailure:
 
 
 class HttpClient:
+    """Blocking client backed by a shared, keep-alive httpx connection pool.
+
+    Every request made through one instance reuses the same pool, so a scan
+    pays the TCP/TLS handshake once per connection instead of once per probe.
+    The underlying httpx.Client is thread-safe and can be shared by the
+    healthcheck thread pool.
+    """
+
+    def __init__(
+        self,
+        *,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        http2: bool = True,
+        transport: Optional[httpx.BaseTransport] = None,
+    ) -> None:
+        self._client = httpx.Client(
+            limits=_build_limits(pool_size),
+            http2=http2 and http2_available(),
+            transport=transport,
+        )
+
+    def __enter__(self) -> "HttpClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._client.close()
+
     def request_json(
         self,
         method: str,
@@ -27,81 +64,283 @@ class HttpClient:
         payload: Optional[Mapping[str, Any]],
         timeout_seconds: int,
     ) -> Tuple[Optional[HttpResponse], Optional[HttpRequestFailure]]:
-        body_bytes = None
-        if payload is not None:
-            body_bytes = json.dumps(payload).encode("utf-8")
-
-        request_headers: Dict[str, str] = {
-            "Accept": "application/json",
-            **dict(headers),
-        }
-        if body_bytes is not None:
-            request_headers.setdefault("Content-Type", "application/json")
-
-        request = Request(
-            url=url, data=body_bytes, headers=request_headers, method=method.upper()
+        try:
+            response = self._client.request(
+                method.upper(),
+                url,
+                headers=_build_request_headers(headers),
+                json=payload,
+                timeout=timeout_seconds,
+            )
+        except Exception as error:  # noqa: BLE001
+            return None, _failure_from_exception(error)
+
+        return _to_http_response(response), None
+
+    def stream_lines(
+        self,
+        method: str,
+        url: str,
+        headers: Mapping[str, str],
+        payload: Optional[Mapping[str, Any]],
+        timeout_seconds: int,
+        on_line: Callable[[str], bool],
+    ) -> Tuple[Optional[HttpResponse], Optional[HttpRequestFailure]]:
+        """Feed a successful response body to ``on_line`` as it arrives.
+
+        Reading stops, and the stream is closed, as soon as ``on_line``
+        returns True. Error responses are read in full and returned the same
+        way ``request_json`` returns them.
+        """
+        try:
+            with self._client.stream(
+                method.upper(),
+                url,
+                headers=_build_request_headers(headers, accept="text/event-stream"),
+                json=payload,
+                timeout=timeout_seconds,
+            ) as response:
+                if response.status_code >= 400:
+                    response.read()
+                    return _to_http_response(response), None
+                for line in response.iter_lines():
+                    if on_line(line):
+                        break
+                return _to_stream_response(response), None
+        except Exception as error:  # noqa: BLE001
+            return None, _failure_from_exception(error)
+
+
+class AsyncHttpClient:
+    """Async counterpart of HttpClient backed by a shared httpx.AsyncClient pool.
+
+    Use it as an ``async with`` block so the pool is closed on the same loop.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections: int = 100,
+        http2: bool = True,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self._client = httpx.AsyncClient(
+            limits=_build_limits(max_connections),
+            http2=http2 and http2_available(),
+            transport=transport,
         )
 
+    async def __aenter__(self) -> "AsyncHttpClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def request_json(
+        self,
+        method: str,
+        url: str,
+        headers: Mapping[str, str],
+        payload: Optional[Mapping[str, Any]],
+        timeout_seconds: int,
+    ) -> Tuple[Optional[HttpResponse], Optional[HttpRequestFailure]]:
         try:
-            with urlopen(request, timeout=timeout_seconds) as response:
-                response_body = response.read()
-                response_text = response_body.decode("utf-8", errors="replace")
-
-                json_body = None
-                try:
-                    parsed = json.loads(response_text)
-                    if isinstance(parsed, dict):
-                        json_body = parsed
-                except json.JSONDecodeError:
-                    json_body = None
-
-                headers_mapping = {k: v for k, v in response.headers.items()}
-                return (
-                    HttpResponse(
-                        status_code=int(response.status),
-                        headers=headers_mapping,
-                        body_text=response_text,
-                        json_body=json_body,
-                    ),
-                    None,
-                )
-
-        except HTTPError as error:
-            response_body = error.read()
-            response_text = response_body.decode("utf-8", errors="replace")
-
-            json_body = None
-            try:
-                parsed = json.loads(response_text)
-                if isinstance(parsed, dict):
-                    json_body = parsed
-            except json.JSONDecodeError:
-                json_body = None
-
-            headers_mapping = (
-                {k: v for k, v in error.headers.items()} if error.headers else {}
+            response = await self._client.request(
+                method.upper(),
+                url,
+                headers=_build_request_headers(headers),
+                json=payload,
+                timeout=timeout_seconds,
             )
-            response = HttpResponse(
-                status_code=int(error.code),
-                headers=headers_mapping,
-                body_text=response_text,
-                json_body=json_body,
-            )
-            return response, None
+        except Exception as error:  # noqa: BLE001
+            return None, _failure_from_exception(error)
 
-        except (URLError, socket.timeout) as error:
-            return None, HttpRequestFailure(
-                error_category="network", message=str(error), status_code=None
-            )
+        return _to_http_response(response), None
 
+    async def stream_lines(
+        self,
+        method: str,
+        url: str,
+        headers: Mapping[str, str],
+        payload: Optional[Mapping[str, Any]],
+        timeout_seconds: int,
+        on_line: Callable[[str], bool],
+    ) -> Tuple[Optional[HttpResponse], Optional[HttpRequestFailure]]:
+        try:
+            async with self._client.stream(
+                method.upper(),
+                url,
+                headers=_build_request_headers(headers, accept="text/event-stream"),
+                json=payload,
+                timeout=timeout_seconds,
+            ) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    return _to_http_response(response), None
+                async for line in response.aiter_lines():
+                    if on_line(line):
+                        break
+                return _to_stream_response(response), None
         except Exception as error:  # noqa: BLE001
-            return None, HttpRequestFailure(
-                error_category="unexpected", message=str(error), status_code=None
-            )
+            return None, _failure_from_exception(error)
+
+
+def http2_available() -> bool:
+    # httpx only negotiates HTTP/2 when the optional ``h2`` package is installed.
+    return importlib.util.find_spec("h2") is not None
+
+
+def _build_limits(pool_size: int) -> httpx.Limits:
+    size = max(1, pool_size)
+    return httpx.Limits(max_connections=size, max_keepalive_connections=size)
+
+
+def _build_request_headers(
+    headers: Mapping[str, str], accept: str = "application/json"
+) -> Dict[str, str]:
+    return {
+        "Accept": accept,
+        **dict(headers),
+    }
+
+
+def _to_http_response(response: httpx.Response) -> HttpResponse:
+    response_text = response.content.decode("utf-8", errors="replace")
+    return HttpResponse(
+        status_code=response.status_code,
+        headers={k: v for k, v in response.headers.items()},
+        body_text=response_text,
+        json_body=_parse_json_object(response_text),
+    )
+
+
+def _to_stream_response(response: httpx.Response) -> HttpResponse:
+    # The body was handed to the caller line by line and is not kept here.
+    return HttpResponse(
+        status_code=response.status_code,
+        headers={k: v for k, v in response.headers.items()},
+        body_text="",
+        json_body=None,
+    )
+
+
+def _failure_from_exception(error: Exception) -> HttpRequestFailure:
+    if isinstance(error, (httpx.TimeoutException, httpx.TransportError)):
+        return HttpRequestFailure(
+            error_category="network",
+            message=str(error) or type(error).__name__,
+            status_code=None,
+        )
+    return HttpRequestFailure(
+        error_category="unexpected", message=str(error), status_code=None
+    )
+
+
+def _parse_json_object(text: str) -> Optional[Dict[str, Any]]:
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    if isinstance(parsed, dict):
+        return parsed
+    return None
+
+
+def get_header(headers: Mapping[str, str], name: str) -> Optional[str]:
+    value = headers.get(name)
+    if value is not None:
+        return value
+    lowered = name.lower()
+    for key, item in headers.items():
+        if key.lower() == lowered:
+            return item
+    return None
+
+
+def get_header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    return _parse_float(get_header(headers, name))
+
+
+def parse_rate_limit_reset(
+    headers: Mapping[str, str], *, now: Optional[float] = None
+) -> Optional[float]:
+    """Seconds until the rate-limit window in ``X-RateLimit-Reset`` resets.
+
+    OpenRouter sends an epoch timestamp in milliseconds; epoch seconds and a
+    plain delta in seconds are accepted as well.
+    """
+    value = get_header_float(headers, "X-RateLimit-Reset")
+    if value is None:
+        return None
+
+    current = time.time() if now is None else now
+    if value > 1e12:
+        return max(0.0, value / 1000.0 - current)
+    if value > 1e9:
+        return max(0.0, value - current)
+    return max(0.0, value)
+
+
+def parse_retry_after(
+    headers: Mapping[str, str], *, now: Optional[float] = None
+) -> Optional[float]:
+    """Seconds requested by a ``Retry-After`` header (delta-seconds or HTTP-date)."""
+    value = get_header(headers, "Retry-After")
+    if value is None:
+        return None
+
+    seconds = _parse_float(value.strip())
+    if seconds is not None:
+        return max(0.0, seconds)
+
+    try:
+        retry_at = parsedate_to_datetime(value.strip())
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    current = time.time() if now is None else now
+    return max(0.0, retry_at.timestamp() - current)
+
+
+def server_retry_delay(
+    status_code: Optional[int],
+    headers: Mapping[str, str],
+    *,
+    now: Optional[float] = None,
+) -> Optional[float]:
+    """How long the server asked us to wait before retrying, if it said so.
+
+    ``Retry-After`` wins; ``X-RateLimit-Reset`` describes the rate-limit
+    window and is only meaningful when the request was actually throttled.
+    """
+    delay = parse_retry_after(headers, now=now)
+    if delay is None and status_code == 429:
+        delay = parse_rate_limit_reset(headers, now=now)
+    return delay
+
+
+def decorrelated_jitter_delay(
+    previous_delay: float,
+    base_seconds: float = 0.5,
+    max_seconds: float = 8.0,
+    *,
+    rng: random.Random = _RANDOM,
+) -> float:
+    # "Decorrelated jitter": grows roughly x3 per retry but never synchronises
+    # retries from different models the way fixed exponential backoff does.
+    upper = max(base_seconds, previous_delay * 3)
+    return min(max_seconds, rng.uniform(base_seconds, upper))
 
 
-def sleep_with_backoff(
-    attempt_index: int, base_seconds: float = 0.5, max_seconds: float = 8.0
-) -> None:
-    delay = min(max_seconds, base_seconds * (2**attempt_index))
-    time.sleep(delay)
+def _parse_float(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
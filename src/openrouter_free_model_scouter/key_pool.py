@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Collection, Dict, List, Mapping, Optional, Sequence
+
+from .http_client import get_header_float, parse_rate_limit_reset, server_retry_delay
+
+DEFAULT_KEY_COOLDOWN_SECONDS = 60.0
+
+
+@dataclass(frozen=True)
+class KeyUsage:
+    """What one API key did since the last report."""
+
+    label: str
+    requests: int = 0
+    ok: int = 0
+    rate_limited: int = 0
+    errors: int = 0
+    # Last X-RateLimit-Remaining OpenRouter reported for the key, if any.
+    remaining: Optional[float] = None
+    # Epoch seconds until which the key is benched, if it still is.
+    cooling_until: Optional[float] = None
+
+
+@dataclass
+class _KeyState:
+    key: str
+    usage: KeyUsage
+    # Requests left in the key's rate-limit window, as last reported and
+    # counted down since; None until OpenRouter reports it.
+    tokens: Optional[float] = None
+    cooling_until: float = 0.0
+
+
+class ApiKeyPool:
+    """Spreads requests over several OpenRouter API keys.
+
+    Each key keeps its own account of the requests left in its rate-limit
+    window (``X-RateLimit-Remaining``, counted down as requests go out). A
+    request takes the available key with the most requests left, the least
+    used one on a tie, so keys are used round-robin until OpenRouter reports
+    otherwise. A key answered with 429 is benched for the ``Retry-After`` or
+    rate-limit reset OpenRouter sends, or ``cooldown_seconds`` without one;
+    a key whose window is exhausted is benched until the window resets.
+    Requests come from worker threads and coroutines alike, so every update
+    happens under a lock and nothing inside it blocks.
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[str],
+        *,
+        cooldown_seconds: float = DEFAULT_KEY_COOLDOWN_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        unique = list(dict.fromkeys(key for key in keys if key))
+        if not unique:
+            raise ValueError("ApiKeyPool needs at least one API key")
+        self._cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._states: Dict[str, _KeyState] = {
+            key: _KeyState(key=key, usage=KeyUsage(label=mask_key(key))) for key in unique
+        }
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def acquire(self, exclude: Collection[str] = ()) -> str:
+        """The key to send the next request with.
+
+        Keys in ``exclude`` are passed over while any other key is left.
+        When every key is benched, the one that comes back first is used;
+        its 429 is then handled by the caller's usual retry.
+        """
+        with self._lock:
+            now = self._clock()
+            candidates = [s for s in self._states.values() if s.key not in exclude]
+            if not candidates:
+                candidates = list(self._states.values())
+            available = [s for s in candidates if s.cooling_until <= now]
+            if available:
+                state = max(
+                    available,
+                    key=lambda s: (
+                        float("inf") if s.tokens is None else s.tokens,
+                        -s.usage.requests,
+                    ),
+                )
+            else:
+                state = min(candidates, key=lambda s: s.cooling_until)
+
+            state.usage = replace(state.usage, requests=state.usage.requests + 1)
+            if state.tokens is not None:
+                state.tokens -= 1
+            return state.key
+
+    def has_available(self, exclude: Collection[str] = ()) -> bool:
+        """Whether a key outside ``exclude`` can take a request right now."""
+        with self._lock:
+            now = self._clock()
+            return any(
+                s.cooling_until <= now
+                for s in self._states.values()
+                if s.key not in exclude
+            )
+
+    def release(
+        self,
+        key: str,
+        status_code: Optional[int],
+        headers: Mapping[str, str],
+    ) -> None:
+        """Account for the response to a request sent with ``key``.
+
+        ``status_code`` is None when the request failed before a response.
+        """
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                return
+            now = self._clock()
+            usage = state.usage
+
+            remaining = get_header_float(headers, "X-RateLimit-Remaining")
+            if remaining is not None:
+                state.tokens = remaining
+                usage = replace(usage, remaining=remaining)
+
+            if status_code == 429:
+                cooldown = server_retry_delay(status_code, headers, now=now)
+                if cooldown is None or cooldown <= 0:
+                    cooldown = self._cooldown_seconds
+                state.cooling_until = max(state.cooling_until, now + cooldown)
+                state.tokens = 0.0
+                usage = replace(usage, rate_limited=usage.rate_limited + 1)
+            elif status_code is not None and status_code < 400:
+                usage = replace(usage, ok=usage.ok + 1)
+                if remaining is not None and remaining < 1:
+                    reset_in = parse_rate_limit_reset(headers, now=now)
+                    if reset_in:
+                        state.cooling_until = max(state.cooling_until, now + reset_in)
+            else:
+                usage = replace(usage, errors=usage.errors + 1)
+
+            state.usage = usage
+
+    def take_usage(self) -> List[KeyUsage]:
+        """Per-key usage since the last call, which starts a new report."""
+        with self._lock:
+            now = self._clock()
+            report = []
+            for state in self._states.values():
+                report.append(
+                    replace(
+                        state.usage,
+                        cooling_until=(
+                            state.cooling_until if state.cooling_until > now else None
+                        ),
+                    )
+                )
+                state.usage = KeyUsage(label=state.usage.label, remaining=state.usage.remaining)
+            return report
+
+
+def mask_key(key: str) -> str:
+    # Enough to tell keys apart in logs without printing them.
+    if len(key) <= 8:
+        return "…" + key[-2:]
+    return f"{key[:6]}…{key[-4:]}"
+
+
+def format_key_usage(usage: KeyUsage, now: Optional[float] = None) -> str:
+    line = (
+        f"{usage.label}: 요청 {usage.requests}, 성공 {usage.ok}, "
+        f"429 {usage.rate_limited}, 오류 {usage.errors}"
+    )
+    if usage.remaining is not None:
+        line += f", 남은 요청 {usage.remaining:g}"
+    if usage.cooling_until is not None:
+        now = time.time() if now is None else now
+        line += f", 쿨다운 {max(0, int(usage.cooling_until - now))}초"
+    return line
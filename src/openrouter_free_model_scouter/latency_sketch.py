@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import math
+from typing import Dict, Iterable, Optional
+
+# Every value is kept within 1% of its true size.
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+
+class LatencySketch:
+    """DDSketch-style latency histogram with logarithmically sized buckets.
+
+    Bucket ``k`` holds values in ``(gamma**(k-1), gamma**k]``, so two sketches
+    built with the same accuracy merge by adding their bucket counts. That is
+    what lets hourly and daily rollups be combined into any larger window.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY) -> None:
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + sum(self.bins.values())
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value <= 0:
+            self.zero_count += count
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.bins[key] = self.bins.get(key, 0) + count
+
+    def add_all(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "LatencySketch") -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        self.zero_count += other.zero_count
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile ``q`` (0..1), within the relative accuracy; None if empty."""
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be between 0 and 1: {q}")
+        total = self.count
+        if total == 0:
+            return None
+
+        rank = q * (total - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                # The midpoint (in relative terms) of (gamma**(k-1), gamma**k].
+                return 2 * self._gamma**key / (self._gamma + 1)
+        return 2 * self._gamma ** max(self.bins) / (self._gamma + 1)
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "a": self.relative_accuracy,
+                "z": self.zero_count,
+                "b": {str(key): count for key, count in sorted(self.bins.items())},
+            },
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_json(cls, payload: Optional[str]) -> "LatencySketch":
+        if not payload:
+            return cls()
+        data = json.loads(payload)
+        sketch = cls(relative_accuracy=data.get("a", DEFAULT_RELATIVE_ACCURACY))
+        sketch.zero_count = int(data.get("z", 0))
+        sketch.bins = {int(key): int(count) for key, count in data.get("b", {}).items()}
+        return sketch
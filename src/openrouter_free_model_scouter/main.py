@@ -4,9 +4,12 @@ from contextlib import asynccontextmanager
 from apscheduler.schedulers.background import BackgroundScheduler
 import os
 import logging
+import threading
 from .api.endpoints import router as api_router
 from .config import AppConfig, load_simple_dotenv_mapping
-from .database import get_db, SessionLocal, init_db
+from .database import engine, get_db, SessionLocal, init_db
+from .retention import apply_retention
+from .worker.adaptive_scheduler import AdaptiveScheduler, SchedulePolicy
 from .worker.scouter import ScouterWorker
 from .openrouter_client import OpenRouterClient
 
@@ -14,7 +17,29 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def run_scheduled_scan():
+# What a scheduled scan probes: the whole catalog, the models the adaptive
+# scheduler says are due, or only models new to the catalog.
+SCAN_ALL = "all"
+SCAN_DUE = "due"
+SCAN_NEW = "new"
+
+# Scans share the runs table (a new run marks any unfinished one partial),
+# so scheduled scans never overlap: a full or due scan waits its turn, a
+# new-models scan is skipped since the running one covers it.
+_scan_lock = threading.Lock()
+
+
+def run_scheduled_scan(scope: str = SCAN_ALL):
+    if not _scan_lock.acquire(blocking=scope != SCAN_NEW):
+        logger.info("A scan is already running; skipping the %s scan.", scope)
+        return
+    try:
+        _run_scan(scope)
+    finally:
+        _scan_lock.release()
+
+
+def _run_scan(scope: str):
     logger.info("Starting scheduled OpenRouter model scan...")
     # Load config from env
     from dotenv import load_dotenv
@@ -26,31 +51,81 @@ def run_scheduled_scan():
         logger.error("No OPENROUTER_API_KEY found. Skipping scan.")
         return
 
-    # Import HttpClient and OpenRouterClientConfig
-    from .openrouter_client import OpenRouterClient, OpenRouterClientConfig
+    # Import HttpClient and the client config builder
+    from .openrouter_client import OpenRouterClient, build_client_config
     from .http_client import HttpClient
 
     db = SessionLocal()
+    http_client = HttpClient(pool_size=config.effective_pool_size, http2=config.http2)
     try:
-        http_client = HttpClient()
-        client_config = OpenRouterClientConfig(
-            api_key=config.api_key,
-            base_url=config.base_url,
-            http_referer=config.http_referer,
-            x_title=config.x_title,
-        )
+        client_config = build_client_config(config)
         client = OpenRouterClient(http_client=http_client, config=client_config)
         worker = ScouterWorker(db, client)
-        run_id, results = worker.run_scan(config)
+        select_models = None
+        if scope == SCAN_NEW:
+            select_models = worker.select_added_models
+        elif scope == SCAN_DUE:
+            scheduler = AdaptiveScheduler(db, SchedulePolicy.from_config(config))
+            select_models = scheduler.select
+
+        if config.queue_scans:
+            # `scouter worker` processes probe the queued jobs.
+            run_id = worker.enqueue_scan(config, select_models=select_models)
+            if run_id is None:
+                logger.info("No model needs a probe right now.")
+            else:
+                logger.info(f"Queued the scan as Run ID {run_id} for the workers.")
+            return
+
+        run_id, results = worker.run_scan(config, select_models=select_models)
+        if run_id is None:
+            logger.info("No model needs a probe right now.")
+            return
 
         success_count = sum(1 for r in results if r.ok)
         logger.info(
             f"Scan completed (Run ID: {run_id}). Checked {len(results)} models, {success_count} OK."
         )
+        for usage in worker.last_key_usage:
+            logger.info(
+                "API key %s: %d requests, %d OK, %d rate limited, %d errors",
+                usage.label,
+                usage.requests,
+                usage.ok,
+                usage.rate_limited,
+                usage.errors,
+            )
     except Exception as e:
         logger.error(f"Error during scheduled scan: {e}")
     finally:
         db.close()
+        http_client.close()
+
+
+def run_retention():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    config = AppConfig.from_sources(cli_overrides={}, env=os.environ)
+
+    raw_connection = engine.raw_connection()
+    try:
+        report = apply_retention(
+            raw_connection,
+            raw_retention_days=config.raw_retention_days,
+            hourly_retention_days=config.hourly_retention_days,
+        )
+        logger.info(
+            "Retention: deleted %d checks, %d runs, %d hourly rollups; vacuumed %d pages",
+            report.deleted_checks,
+            report.deleted_runs,
+            report.deleted_hourly_rollups,
+            report.vacuumed_pages,
+        )
+    except Exception as e:
+        logger.error(f"Error during retention job: {e}")
+    finally:
+        raw_connection.close()
 
 
 @asynccontextmanager
@@ -67,13 +142,44 @@ async def lifespan(app: FastAPI):
     # Initialize Scheduler
     scheduler = BackgroundScheduler()
 
-    # Run immediately on startup
-    scheduler.add_job(run_scheduled_scan, trigger='date')
-
-    # Schedule periodic run
-    interval_hours = config.interval_hours
-    logger.info(f"Scheduling automatic scans every {interval_hours} hours.")
-    scheduler.add_job(run_scheduled_scan, 'interval', hours=interval_hours)
+    if config.schedule == "adaptive":
+        # Each tick probes only the models whose own interval has elapsed;
+        # the first one covers every model without history.
+        tick_minutes = config.schedule_tick_minutes
+        logger.info(f"Scheduling adaptive scans, checking for due models every {tick_minutes} minutes.")
+        scheduler.add_job(run_scheduled_scan, trigger='date', args=[SCAN_DUE])
+        scheduler.add_job(
+            run_scheduled_scan, 'interval', minutes=tick_minutes, args=[SCAN_DUE]
+        )
+    else:
+        # Run immediately on startup
+        scheduler.add_job(run_scheduled_scan, trigger='date')
+
+        # Schedule periodic run
+        interval_hours = config.interval_hours
+        logger.info(f"Scheduling automatic scans every {interval_hours} hours.")
+        scheduler.add_job(run_scheduled_scan, 'interval', hours=interval_hours)
+
+        # Between full scans, a conditional /models request (a 304 while
+        # nothing changed) picks up new models and probes just those.
+        if config.catalog_refresh_minutes > 0:
+            scheduler.add_job(
+                run_scheduled_scan,
+                'interval',
+                minutes=config.catalog_refresh_minutes,
+                args=[SCAN_NEW],
+            )
+
+    # Prune and compact the database in the background.
+    logger.info(
+        "Retention: raw %s days, hourly rollups %s days, every %s hours.",
+        config.raw_retention_days,
+        config.hourly_retention_days,
+        config.retention_interval_hours,
+    )
+    scheduler.add_job(
+        run_retention, 'interval', hours=config.retention_interval_hours
+    )
 
     scheduler.start()
     yield
@@ -0,0 +1,331 @@
+"""Versioned schema migrations for the scouter SQLite database.
+
+Both the SQLAlchemy side (``database.init_db``) and the plain sqlite3
+``SqliteTimelineRepository`` upgrade a database through ``upgrade_schema``,
+so a file written by either one can be opened by the other. The applied
+version is kept in ``PRAGMA user_version``.
+
+Every step must be idempotent: SQLite runs DDL outside the surrounding
+transaction, so a step interrupted halfway is simply run again. Steps never
+call into the live write paths (``rollups`` and friends): what a shipped
+migration writes must not change when that code does.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, List, Set
+
+from .latency_sketch import LatencySketch
+
+Migration = Callable[[Any], None]
+
+
+def _existing_columns(cursor: Any, table: str) -> Set[str]:
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+
+def _add_columns(cursor: Any, table: str, columns: List[str]) -> None:
+    existing = _existing_columns(cursor, table)
+    for column in columns:
+        name = column.split()[0]
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column}")
+
+
+def _create_base_tables(cursor: Any) -> None:
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_datetime TEXT NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS healthchecks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id INTEGER NOT NULL,
+            model_id TEXT NOT NULL,
+            ok BOOLEAN NOT NULL,
+            http_status INTEGER,
+            error_category TEXT,
+            latency_ms INTEGER,
+            FOREIGN KEY(run_id) REFERENCES runs(id)
+        )
+    """)
+
+
+def _add_stream_timing_columns(cursor: Any) -> None:
+    _add_columns(
+        cursor,
+        "healthchecks",
+        [
+            "ttfb_ms INTEGER",
+            "ttft_ms INTEGER",
+            "total_ms INTEGER",
+            "tokens_per_second FLOAT",
+        ],
+    )
+
+
+def _add_run_status_columns(cursor: Any) -> None:
+    _add_columns(
+        cursor,
+        "runs",
+        ["status VARCHAR", "finished_at VARCHAR", "total_models INTEGER"],
+    )
+
+
+def _add_lookup_indexes(cursor: Any) -> None:
+    # Per-model history walks (model_id, run_id); per-run lookups use run_id.
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_healthchecks_model_id_run_id "
+        "ON healthchecks (model_id, run_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_healthchecks_run_id ON healthchecks (run_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_runs_run_datetime ON runs (run_datetime)"
+    )
+
+
+def _add_run_timestamp(cursor: Any) -> None:
+    _add_columns(cursor, "runs", ["run_ts INTEGER"])
+    # run_datetime was written from datetime.now(), i.e. local time.
+    cursor.execute(
+        "UPDATE runs SET run_ts = CAST(strftime('%s', run_datetime, 'utc') AS INTEGER) "
+        "WHERE run_ts IS NULL"
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_runs_run_ts ON runs (run_ts)")
+
+
+# Rollup tables and bucket widths as of migration 6.
+_V6_ROLLUP_TABLES = (("model_rollups_hourly", 60 * 60), ("model_rollups_daily", 24 * 60 * 60))
+_V6_SKETCH_ACCURACY = 0.01
+
+
+def _add_rollup_tables(cursor: Any) -> None:
+    for table, _ in _V6_ROLLUP_TABLES:
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                model_id VARCHAR NOT NULL,
+                bucket_ts INTEGER NOT NULL,
+                check_count INTEGER NOT NULL,
+                ok_count INTEGER NOT NULL,
+                latency_count INTEGER NOT NULL,
+                latency_sum INTEGER NOT NULL,
+                latency_min INTEGER,
+                latency_max INTEGER,
+                latency_sketch TEXT,
+                PRIMARY KEY (model_id, bucket_ts)
+            )
+        """)
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_bucket_ts ON {table} (bucket_ts)"
+        )
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS model_status (
+            model_id VARCHAR NOT NULL PRIMARY KEY,
+            last_run_id INTEGER NOT NULL,
+            last_run_ts INTEGER,
+            last_ok BOOLEAN NOT NULL,
+            last_http_status INTEGER,
+            consecutive_failures INTEGER NOT NULL
+        )
+    """)
+    _backfill_rollups(cursor)
+
+
+def _backfill_rollups(cursor: Any) -> None:
+    # Build the rollups and model_status from the existing history, one
+    # model at a time so memory stays bounded by the longest model history.
+    for table, _ in _V6_ROLLUP_TABLES:
+        cursor.execute(f"DELETE FROM {table}")
+    cursor.execute("DELETE FROM model_status")
+
+    cursor.execute("SELECT DISTINCT model_id FROM healthchecks")
+    for (model_id,) in cursor.fetchall():
+        cursor.execute(
+            "SELECT h.run_id, r.run_ts, h.ok, h.http_status, h.latency_ms "
+            "FROM healthchecks h JOIN runs r ON r.id = h.run_id "
+            "WHERE h.model_id = ? AND r.run_ts IS NOT NULL ORDER BY h.run_id, h.id",
+            (model_id,),
+        )
+        checks = cursor.fetchall()
+        if not checks:
+            continue
+
+        for table, width in _V6_ROLLUP_TABLES:
+            # bucket_ts -> [check_count, ok_count, latency_count, latency_sum,
+            # latency_min, latency_max, sketch]; latency covers ok checks only.
+            buckets = {}
+            for _, run_ts, ok, _, latency_ms in checks:
+                bucket = buckets.setdefault(
+                    run_ts - run_ts % width,
+                    [0, 0, 0, 0, None, None, LatencySketch(_V6_SKETCH_ACCURACY)],
+                )
+                bucket[0] += 1
+                if not ok:
+                    continue
+                bucket[1] += 1
+                if latency_ms is None:
+                    continue
+                bucket[2] += 1
+                bucket[3] += latency_ms
+                bucket[4] = latency_ms if bucket[4] is None else min(bucket[4], latency_ms)
+                bucket[5] = latency_ms if bucket[5] is None else max(bucket[5], latency_ms)
+                bucket[6].add(latency_ms)
+            cursor.executemany(
+                f"INSERT INTO {table} (model_id, bucket_ts, check_count, ok_count, "
+                "latency_count, latency_sum, latency_min, latency_max, latency_sketch) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (model_id, bucket_ts, *bucket[:6], bucket[6].to_json())
+                    for bucket_ts, bucket in buckets.items()
+                ],
+            )
+
+        # The first check of each run counts towards the failure streak.
+        last = None
+        failures = 0
+        for run_id, run_ts, ok, http_status, _ in checks:
+            if last is not None and last[0] >= run_id:
+                continue
+            failures = 0 if ok else failures + 1
+            last = (run_id, run_ts, bool(ok), http_status)
+        cursor.execute(
+            "INSERT INTO model_status (model_id, last_run_id, last_run_ts, last_ok, "
+            "last_http_status, consecutive_failures) VALUES (?, ?, ?, ?, ?, ?)",
+            (model_id, *last, failures),
+        )
+
+
+def _add_success_streak(cursor: Any) -> None:
+    # The adaptive scheduler backs off on models that keep passing.
+    _add_columns(
+        cursor,
+        "model_status",
+        ["consecutive_successes INTEGER NOT NULL DEFAULT 0"],
+    )
+    # Passing runs since the model's last failure, up to its latest check.
+    cursor.execute("""
+        UPDATE model_status SET consecutive_successes = (
+            SELECT COUNT(DISTINCT h.run_id)
+            FROM healthchecks h JOIN runs r ON r.id = h.run_id
+            WHERE h.model_id = model_status.model_id
+              AND r.run_ts IS NOT NULL
+              AND h.run_id <= model_status.last_run_id
+              AND h.run_id > COALESCE((
+                  SELECT MAX(f.run_id)
+                  FROM healthchecks f JOIN runs fr ON fr.id = f.run_id
+                  WHERE f.model_id = model_status.model_id
+                    AND fr.run_ts IS NOT NULL
+                    AND NOT f.ok
+                    AND f.run_id <= model_status.last_run_id
+              ), 0)
+        )
+        WHERE last_ok
+    """)
+
+
+def _add_catalog_tables(cursor: Any) -> None:
+    # Keep in sync with models.CatalogState / models.CatalogChange.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS catalog_state (
+            id INTEGER NOT NULL PRIMARY KEY,
+            etag VARCHAR,
+            last_modified VARCHAR,
+            fetched_ts INTEGER NOT NULL,
+            payload TEXT NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS catalog_changes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            detected_ts INTEGER NOT NULL,
+            model_id VARCHAR NOT NULL,
+            change VARCHAR NOT NULL,
+            details TEXT
+        )
+    """)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_catalog_changes_model_id ON catalog_changes (model_id)"
+    )
+
+
+def _add_circuit_breakers(cursor: Any) -> None:
+    # Keep in sync with models.CircuitBreakerState.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS circuit_breakers (
+            model_id VARCHAR NOT NULL PRIMARY KEY,
+            state VARCHAR NOT NULL,
+            failures INTEGER NOT NULL,
+            cooldown_seconds FLOAT NOT NULL,
+            next_probe_ts FLOAT
+        )
+    """)
+
+
+def _add_probe_jobs(cursor: Any) -> None:
+    # Keep in sync with models.ProbeJob.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS probe_jobs (
+            id INTEGER NOT NULL PRIMARY KEY,
+            run_id INTEGER NOT NULL REFERENCES runs (id),
+            model_id VARCHAR NOT NULL,
+            status VARCHAR NOT NULL,
+            leases INTEGER NOT NULL,
+            worker_id VARCHAR,
+            lease_token VARCHAR,
+            lease_expires_ts FLOAT,
+            finished_ts FLOAT
+        )
+    """)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_probe_jobs_run_id ON probe_jobs (run_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_probe_jobs_status_lease_expires_ts "
+        "ON probe_jobs (status, lease_expires_ts)"
+    )
+
+
+# Append only; the position in this list is the schema version it produces.
+MIGRATIONS: List[Migration] = [
+    _create_base_tables,
+    _add_stream_timing_columns,
+    _add_run_status_columns,
+    _add_lookup_indexes,
+    _add_run_timestamp,
+    _add_rollup_tables,
+    _add_success_streak,
+    _add_catalog_tables,
+    _add_circuit_breakers,
+    _add_probe_jobs,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(connection: Any) -> int:
+    cursor = connection.cursor()
+    try:
+        cursor.execute("PRAGMA user_version")
+        return int(cursor.fetchone()[0])
+    finally:
+        cursor.close()
+
+
+def upgrade_schema(connection: Any) -> int:
+    """Apply pending migrations to a DB-API connection; returns the new version."""
+    version = get_schema_version(connection)
+    cursor = connection.cursor()
+    try:
+        for target, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            migration(cursor)
+            cursor.execute(f"PRAGMA user_version = {target}")
+            connection.commit()
+            version = target
+    finally:
+        cursor.close()
+    return version
@@ -2,13 +2,23 @@ from __future__ import annotations
 
 from typing import Any, List, Mapping, Optional
 
-from .domain_models import ModelInfo
+from .catalog_cache import CatalogCache, CatalogDiff, CatalogEntry
+from .domain_models import HttpResponse, ModelInfo
+from .http_client import get_header
 from .openrouter_client import OpenRouterClient
 
 
 class ModelCatalogService:
-    def __init__(self, openrouter_client: OpenRouterClient) -> None:
+    def __init__(
+        self,
+        openrouter_client: OpenRouterClient,
+        cache: Optional[CatalogCache] = None,
+    ) -> None:
         self._openrouter_client = openrouter_client
+        self._cache = cache
+        # How the catalog changed on the last get_free_models call; None
+        # without a cache or before there was a stored catalog to compare.
+        self.last_diff: Optional[CatalogDiff] = None
 
     def get_free_models(
         self,
@@ -16,14 +26,53 @@ class ModelCatalogService:
         *,
         model_id_contains: Optional[List[str]] = None,
     ) -> List[ModelInfo]:
+        self.last_diff = None
+        headers = self._cache.conditional_headers() if self._cache is not None else {}
         response, failure_message = self._openrouter_client.list_models(
-            timeout_seconds=timeout_seconds
+            timeout_seconds=timeout_seconds, headers=headers
         )
         if failure_message is not None:
             raise RuntimeError(f"OpenRouter 모델 목록 조회 실패: {failure_message}")
         if response is None:
             raise RuntimeError("OpenRouter 모델 목록 조회 실패: 응답이 비어있음")
-        if response.status_code >= 400:
+
+        entries = None
+        if response.status_code == 304 and self._cache is not None:
+            entries = self._cache.load()
+            if entries is not None:
+                self._cache.touch()
+                self.last_diff = CatalogDiff()
+        if entries is None:
+            entries = self._parse_free_models(response)
+            if self._cache is not None:
+                self.last_diff = self._cache.store(
+                    entries,
+                    etag=get_header(response.headers, "ETag"),
+                    last_modified=get_header(response.headers, "Last-Modified"),
+                )
+
+        normalized_contains: List[str] = []
+        if model_id_contains:
+            normalized_contains = [
+                item.strip().lower() for item in model_id_contains if item.strip()
+            ]
+
+        result: List[ModelInfo] = []
+        for entry in entries:
+            if normalized_contains:
+                lowered_model_id = entry.model_id.lower()
+                if not any(token in lowered_model_id for token in normalized_contains):
+                    continue
+
+            result.append(
+                ModelInfo(model_id=entry.model_id, name=entry.name, raw=entry.to_raw())
+            )
+
+        result.sort(key=lambda model: model.model_id)
+        return result
+
+    def _parse_free_models(self, response: HttpResponse) -> List[CatalogEntry]:
+        if response.status_code >= 400 or response.status_code == 304:
             raise RuntimeError(
                 f"OpenRouter 모델 목록 조회 실패: HTTP {response.status_code} {response.body_text}"
             )
@@ -36,13 +85,7 @@ class ModelCatalogService:
                 "OpenRouter 모델 목록 조회 실패: data 필드가 리스트가 아님"
             )
 
-        normalized_contains: List[str] = []
-        if model_id_contains:
-            normalized_contains = [
-                item.strip().lower() for item in model_id_contains if item.strip()
-            ]
-
-        result: List[ModelInfo] = []
+        entries: List[CatalogEntry] = []
         for item in data:
             if not isinstance(item, dict):
                 continue
@@ -54,16 +97,5 @@ class ModelCatalogService:
             if not model_id.endswith(":free"):
                 continue
 
-            if normalized_contains:
-                lowered_model_id = model_id.lower()
-                if not any(token in lowered_model_id for token in normalized_contains):
-                    continue
-
-            name = item.get("name")
-            if not isinstance(name, str):
-                name = model_id
-
-            result.append(ModelInfo(model_id=model_id, name=name, raw=item))
-
-        result.sort(key=lambda model: model.model_id)
-        return result
+            entries.append(CatalogEntry.from_item(item))
+        return entries
@@ -1,7 +1,25 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, Float, ForeignKey, Index, Text, event
+from sqlalchemy.orm import Session, relationship
 from datetime import datetime
 from .database import Base
+from .rollups import DAILY_TABLE, HOURLY_TABLE, apply_checks
+
+RUN_STARTED = "started"
+RUN_FINISHED = "finished"
+RUN_PARTIAL = "partial"
+
+RUN_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def run_timestamp(run_datetime: datetime) -> int:
+    return int(run_datetime.timestamp())
+
+
+def _default_run_ts(context) -> int:
+    # Rows that only set run_datetime (older callers, tests) still get a
+    # timestamp that agrees with it.
+    value = context.get_current_parameters()["run_datetime"]
+    return run_timestamp(datetime.strptime(value, RUN_DATETIME_FORMAT))
 
 class Run(Base):
     __tablename__ = "runs"
@@ -9,12 +27,24 @@ class Run(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     # Storing datetime as string to match existing schema: TEXT NOT NULL
     # Format: YYYY-MM-DD HH:MM:SS
-    run_datetime = Column(String, nullable=False)
+    run_datetime = Column(String, nullable=False, index=True)
+    # Epoch seconds of run_datetime; all time-window queries filter on this.
+    run_ts = Column(Integer, nullable=True, index=True, default=_default_run_ts)
+    # started -> finished, or partial when the scan died midway. NULL marks
+    # runs written before scans were persisted incrementally (all complete).
+    status = Column(String, nullable=True)
+    finished_at = Column(String, nullable=True)
+    total_models = Column(Integer, nullable=True)
 
     healthchecks = relationship("HealthCheck", back_populates="run")
 
 class HealthCheck(Base):
     __tablename__ = "healthchecks"
+    # Keep in sync with migrations._add_lookup_indexes.
+    __table_args__ = (
+        Index("ix_healthchecks_model_id_run_id", "model_id", "run_id"),
+        Index("ix_healthchecks_run_id", "run_id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     run_id = Column(Integer, ForeignKey("runs.id"), nullable=False)
@@ -23,5 +53,139 @@ class HealthCheck(Base):
     http_status = Column(Integer, nullable=True)
     error_category = Column(String, nullable=True)
     latency_ms = Column(Integer, nullable=True)
+    # Streaming probe timings; NULL for checks made in standard mode.
+    ttfb_ms = Column(Integer, nullable=True)
+    ttft_ms = Column(Integer, nullable=True)
+    total_ms = Column(Integer, nullable=True)
+    tokens_per_second = Column(Float, nullable=True)
 
     run = relationship("Run", back_populates="healthchecks")
+
+
+class _RollupColumns:
+    # Keep in sync with migrations._add_rollup_tables.
+    model_id = Column(String, primary_key=True)
+    bucket_ts = Column(Integer, primary_key=True, index=True)
+    check_count = Column(Integer, nullable=False)
+    ok_count = Column(Integer, nullable=False)
+    latency_count = Column(Integer, nullable=False)
+    latency_sum = Column(Integer, nullable=False)
+    latency_min = Column(Integer, nullable=True)
+    latency_max = Column(Integer, nullable=True)
+    latency_sketch = Column(Text, nullable=True)
+
+
+class HourlyRollup(_RollupColumns, Base):
+    __tablename__ = HOURLY_TABLE
+
+
+class DailyRollup(_RollupColumns, Base):
+    __tablename__ = DAILY_TABLE
+
+
+class ModelStatus(Base):
+    """Latest check and current failure/success streak per model, kept by rollups.apply_checks."""
+
+    __tablename__ = "model_status"
+
+    model_id = Column(String, primary_key=True)
+    last_run_id = Column(Integer, nullable=False)
+    last_run_ts = Column(Integer, nullable=True)
+    last_ok = Column(Boolean, nullable=False)
+    last_http_status = Column(Integer, nullable=True)
+    consecutive_failures = Column(Integer, nullable=False)
+    consecutive_successes = Column(Integer, nullable=False, default=0)
+
+
+class CircuitBreakerState(Base):
+    """Persisted circuit_breaker.BreakerState of a model; no row means closed."""
+
+    __tablename__ = "circuit_breakers"
+
+    model_id = Column(String, primary_key=True)
+    state = Column(String, nullable=False)
+    failures = Column(Integer, nullable=False)
+    cooldown_seconds = Column(Float, nullable=False)
+    next_probe_ts = Column(Float, nullable=True)
+
+
+JOB_PENDING = "pending"
+JOB_LEASED = "leased"
+JOB_DONE = "done"
+# Leased and lost too many times; see worker.job_queue.MAX_LEASES.
+JOB_ABANDONED = "abandoned"
+
+
+class ProbeJob(Base):
+    """One model to probe for a queued run; see worker.job_queue."""
+
+    __tablename__ = "probe_jobs"
+    # Keep in sync with migrations._add_probe_jobs.
+    __table_args__ = (
+        Index("ix_probe_jobs_status_lease_expires_ts", "status", "lease_expires_ts"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(Integer, ForeignKey("runs.id"), nullable=False, index=True)
+    model_id = Column(String, nullable=False)
+    status = Column(String, nullable=False, default=JOB_PENDING)
+    # How many times the job was handed to a worker.
+    leases = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String, nullable=True)
+    # Identifies the current lease, so a worker whose lease expired and was
+    # taken over cannot complete the job a second time.
+    lease_token = Column(String, nullable=True)
+    lease_expires_ts = Column(Float, nullable=True)
+    finished_ts = Column(Float, nullable=True)
+
+
+class CatalogState(Base):
+    """The last /models response, reduced to the free models; a single row."""
+
+    __tablename__ = "catalog_state"
+
+    id = Column(Integer, primary_key=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    fetched_ts = Column(Integer, nullable=False)
+    # JSON list of catalog_cache.CatalogEntry rows.
+    payload = Column(Text, nullable=False)
+
+
+class CatalogChange(Base):
+    """A free model that appeared in, left or changed in the catalog."""
+
+    __tablename__ = "catalog_changes"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    detected_ts = Column(Integer, nullable=False)
+    model_id = Column(String, nullable=False, index=True)
+    # added, removed or changed
+    change = Column(String, nullable=False)
+    # JSON of the fields that changed, as {field: [old, new]}.
+    details = Column(Text, nullable=True)
+
+
+@event.listens_for(Session, "after_flush")
+def _roll_up_flushed_checks(session, flush_context):
+    # HealthCheck rows added through the ORM update the rollups in the same
+    # transaction; bulk writers call apply_checks themselves.
+    by_run = {}
+    for obj in session.new:
+        if isinstance(obj, HealthCheck):
+            by_run.setdefault(obj.run_id, []).append(
+                (obj.model_id, obj.ok, obj.http_status, obj.latency_ms)
+            )
+    if not by_run:
+        return
+
+    cursor = session.connection().connection.cursor()
+    try:
+        for run_id, checks in sorted(by_run.items()):
+            cursor.execute("SELECT run_ts FROM runs WHERE id = ?", (run_id,))
+            row = cursor.fetchone()
+            if row is None or row[0] is None:
+                continue
+            apply_checks(cursor, run_id, row[0], checks)
+    finally:
+        cursor.close()
@@ -1,10 +1,25 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Mapping, Optional, Tuple
+import json
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
 
-from .domain_models import HttpResponse
-from .http_client import HttpClient
+from .config import AppConfig
+from .domain_models import HttpResponse, StreamedCompletion
+from .http_client import AsyncHttpClient, HttpClient, HttpRequestFailure
+from .key_pool import DEFAULT_KEY_COOLDOWN_SECONDS, ApiKeyPool
+
+_SendResult = Tuple[Optional[HttpResponse], Optional[HttpRequestFailure]]
 
 
 @dataclass(frozen=True)
@@ -13,34 +28,74 @@ class OpenRouterClientConfig:
     base_url: str
     http_referer: Optional[str]
     x_title: Optional[str]
+    # More keys to spread requests over; ``api_key`` is always part of the pool.
+    api_keys: Tuple[str, ...] = ()
+    key_cooldown_seconds: float = DEFAULT_KEY_COOLDOWN_SECONDS
+
+    @property
+    def keys(self) -> List[str]:
+        return list(dict.fromkeys([self.api_key, *self.api_keys]))
+
+
+def build_client_config(config: AppConfig) -> OpenRouterClientConfig:
+    return OpenRouterClientConfig(
+        api_key=config.api_key,
+        base_url=config.base_url,
+        http_referer=config.http_referer,
+        x_title=config.x_title,
+        api_keys=tuple(config.api_keys),
+        key_cooldown_seconds=config.key_cooldown_seconds,
+    )
+
+
+def build_key_pool(config: OpenRouterClientConfig) -> ApiKeyPool:
+    return ApiKeyPool(config.keys, cooldown_seconds=config.key_cooldown_seconds)
 
 
 class OpenRouterClient:
-    def __init__(self, http_client: HttpClient, config: OpenRouterClientConfig) -> None:
+    def __init__(
+        self,
+        http_client: HttpClient,
+        config: OpenRouterClientConfig,
+        key_pool: Optional[ApiKeyPool] = None,
+    ) -> None:
         self._http_client = http_client
         self._config = config
+        self._key_pool = key_pool or build_key_pool(config)
+
+    @property
+    def config(self) -> OpenRouterClientConfig:
+        return self._config
+
+    @property
+    def key_pool(self) -> ApiKeyPool:
+        return self._key_pool
 
-    def _build_headers(self) -> Dict[str, str]:
-        headers: Dict[str, str] = {
-            "Authorization": f"Bearer {self._config.api_key}",
-            "User-Agent": "openrouter-free-model-scouter/0.1.0",
-        }
-        if self._config.http_referer:
-            headers["HTTP-Referer"] = self._config.http_referer
-        if self._config.x_title:
-            headers["X-Title"] = self._config.x_title
-        return headers
+    def _send(self, send: Callable[[Dict[str, str]], _SendResult]) -> _SendResult:
+        # A 429 benches the key; the request goes straight out again with
+        # another key while one is available, so only a pool-wide throttle
+        # reaches the caller's retry and rate limiter.
+        tried: List[str] = []
+        while True:
+            key = self._key_pool.acquire(exclude=tried)
+            tried.append(key)
+            response, failure = send(_build_headers(self._config, key))
+            if not _reroute(self._key_pool, key, response, tried):
+                return response, failure
 
     def list_models(
-        self, timeout_seconds: int
+        self, timeout_seconds: int, headers: Optional[Mapping[str, str]] = None
     ) -> Tuple[Optional[HttpResponse], Optional[str]]:
+        # ``headers`` carries the conditional-request validators, if any.
         url = f"{self._config.base_url}/models"
-        response, failure = self._http_client.request_json(
-            method="GET",
-            url=url,
-            headers=self._build_headers(),
-            payload=None,
-            timeout_seconds=timeout_seconds,
+        response, failure = self._send(
+            lambda key_headers: self._http_client.request_json(
+                method="GET",
+                url=url,
+                headers={**key_headers, **(headers or {})},
+                payload=None,
+                timeout_seconds=timeout_seconds,
+            )
         )
         if failure is not None:
             return None, failure.message
@@ -53,21 +108,253 @@ class OpenRouterClient:
         timeout_seconds: int,
     ) -> Tuple[Optional[HttpResponse], Optional[str]]:
         url = f"{self._config.base_url}/chat/completions"
-        payload: Mapping[str, Any] = {
-            "model": model_id,
-            "messages": [{"role": "user", "content": prompt}],
-            "max_tokens": 32,
-            "temperature": 0,
-            "stream": False,
-        }
-
-        response, failure = self._http_client.request_json(
-            method="POST",
-            url=url,
-            headers=self._build_headers(),
-            payload=payload,
-            timeout_seconds=timeout_seconds,
+        response, failure = self._send(
+            lambda headers: self._http_client.request_json(
+                method="POST",
+                url=url,
+                headers=headers,
+                payload=_build_chat_payload(model_id, prompt),
+                timeout_seconds=timeout_seconds,
+            )
         )
         if failure is not None:
             return None, failure.message
         return response, None
+
+    def chat_completion_stream(
+        self,
+        model_id: str,
+        prompt: str,
+        timeout_seconds: int,
+        stop_text: str,
+    ) -> Tuple[Optional[StreamedCompletion], Optional[str]]:
+        url = f"{self._config.base_url}/chat/completions"
+        readers: List[_ChatStreamReader] = []
+
+        def send(headers: Dict[str, str]) -> _SendResult:
+            # A fresh reader per key, so timings start at the last attempt.
+            readers.append(_ChatStreamReader(stop_text=stop_text))
+            return self._http_client.stream_lines(
+                method="POST",
+                url=url,
+                headers=headers,
+                payload=_build_chat_payload(model_id, prompt, stream=True),
+                timeout_seconds=timeout_seconds,
+                on_line=readers[-1].feed,
+            )
+
+        response, failure = self._send(send)
+        if failure is not None:
+            return None, failure.message
+        if response is None:
+            return None, None
+        return readers[-1].finish(response), None
+
+
+class AsyncOpenRouterClient:
+    def __init__(
+        self,
+        http_client: AsyncHttpClient,
+        config: OpenRouterClientConfig,
+        key_pool: Optional[ApiKeyPool] = None,
+    ) -> None:
+        self._http_client = http_client
+        self._config = config
+        self._key_pool = key_pool or build_key_pool(config)
+
+    @property
+    def config(self) -> OpenRouterClientConfig:
+        return self._config
+
+    @property
+    def key_pool(self) -> ApiKeyPool:
+        return self._key_pool
+
+    async def _send(
+        self, send: Callable[[Dict[str, str]], Awaitable[_SendResult]]
+    ) -> _SendResult:
+        tried: List[str] = []
+        while True:
+            key = self._key_pool.acquire(exclude=tried)
+            tried.append(key)
+            response, failure = await send(_build_headers(self._config, key))
+            if not _reroute(self._key_pool, key, response, tried):
+                return response, failure
+
+    async def chat_completion(
+        self,
+        model_id: str,
+        prompt: str,
+        timeout_seconds: int,
+    ) -> Tuple[Optional[HttpResponse], Optional[str]]:
+        url = f"{self._config.base_url}/chat/completions"
+        response, failure = await self._send(
+            lambda headers: self._http_client.request_json(
+                method="POST",
+                url=url,
+                headers=headers,
+                payload=_build_chat_payload(model_id, prompt),
+                timeout_seconds=timeout_seconds,
+            )
+        )
+        if failure is not None:
+            return None, failure.message
+        return response, None
+
+    async def chat_completion_stream(
+        self,
+        model_id: str,
+        prompt: str,
+        timeout_seconds: int,
+        stop_text: str,
+    ) -> Tuple[Optional[StreamedCompletion], Optional[str]]:
+        url = f"{self._config.base_url}/chat/completions"
+        readers: List[_ChatStreamReader] = []
+
+        def send(headers: Dict[str, str]) -> Awaitable[_SendResult]:
+            readers.append(_ChatStreamReader(stop_text=stop_text))
+            return self._http_client.stream_lines(
+                method="POST",
+                url=url,
+                headers=headers,
+                payload=_build_chat_payload(model_id, prompt, stream=True),
+                timeout_seconds=timeout_seconds,
+                on_line=readers[-1].feed,
+            )
+
+        response, failure = await self._send(send)
+        if failure is not None:
+            return None, failure.message
+        if response is None:
+            return None, None
+        return readers[-1].finish(response), None
+
+
+class _ChatStreamReader:
+    """Incremental parser for OpenRouter's SSE chat completion stream.
+
+    Records when the first byte and the first content token arrive, and asks
+    the HTTP layer to close the stream once ``stop_text`` has been seen.
+    """
+
+    def __init__(self, stop_text: str) -> None:
+        self._stop_text = stop_text
+        self._started_at = time.monotonic()
+        self._first_byte_at: Optional[float] = None
+        self._first_token_at: Optional[float] = None
+        self._content_parts: List[str] = []
+        self._token_count = 0
+        self._usage_tokens: Optional[int] = None
+        self._error: Optional[Dict[str, Any]] = None
+
+    def feed(self, line: str) -> bool:
+        now = time.monotonic()
+        if self._first_byte_at is None:
+            self._first_byte_at = now
+
+        # Blank separators, ": OPENROUTER PROCESSING" comments and other
+        # SSE fields carry no completion data.
+        if not line.startswith("data:"):
+            return False
+
+        data = line[len("data:") :].strip()
+        if data == "[DONE]":
+            return True
+
+        try:
+            event = json.loads(data)
+        except json.JSONDecodeError:
+            return False
+        if not isinstance(event, dict):
+            return False
+
+        error = event.get("error")
+        if isinstance(error, dict):
+            self._error = error
+            return True
+
+        usage = event.get("usage")
+        if isinstance(usage, dict) and isinstance(usage.get("completion_tokens"), int):
+            self._usage_tokens = usage["completion_tokens"]
+
+        choices = event.get("choices")
+        if isinstance(choices, list):
+            for choice in choices:
+                delta = choice.get("delta") if isinstance(choice, dict) else None
+                content = delta.get("content") if isinstance(delta, dict) else None
+                if isinstance(content, str) and content:
+                    if self._first_token_at is None:
+                        self._first_token_at = now
+                    self._content_parts.append(content)
+                    self._token_count += 1
+
+        if self._stop_text and self._stop_text in "".join(self._content_parts):
+            return True
+        return False
+
+    def finish(self, response: HttpResponse) -> StreamedCompletion:
+        finished_at = time.monotonic()
+
+        if self._error is not None:
+            # Errors sent after a 200 status line are surfaced as if they had
+            # been an HTTP error, so the usual classification applies.
+            code = self._error.get("code")
+            status_code = code if isinstance(code, int) and code >= 400 else 502
+            response = HttpResponse(
+                status_code=status_code,
+                headers=response.headers,
+                body_text=json.dumps({"error": self._error}),
+                json_body={"error": self._error},
+            )
+
+        return StreamedCompletion(
+            response=response,
+            content="".join(self._content_parts),
+            ttfb_ms=self._elapsed_ms(self._first_byte_at),
+            ttft_ms=self._elapsed_ms(self._first_token_at),
+            total_ms=self._elapsed_ms(finished_at) or 0,
+            completion_tokens=self._usage_tokens or self._token_count,
+        )
+
+    def _elapsed_ms(self, at: Optional[float]) -> Optional[int]:
+        if at is None:
+            return None
+        return int((at - self._started_at) * 1000)
+
+
+def _reroute(
+    key_pool: ApiKeyPool,
+    key: str,
+    response: Optional[HttpResponse],
+    tried: List[str],
+) -> bool:
+    """Account for a response and say whether to resend it with another key."""
+    if response is None:
+        key_pool.release(key, None, {})
+        return False
+    key_pool.release(key, response.status_code, response.headers)
+    return response.status_code == 429 and key_pool.has_available(exclude=tried)
+
+
+def _build_headers(config: OpenRouterClientConfig, api_key: str) -> Dict[str, str]:
+    headers: Dict[str, str] = {
+        "Authorization": f"Bearer {api_key}",
+        "User-Agent": "openrouter-free-model-scouter/0.1.0",
+    }
+    if config.http_referer:
+        headers["HTTP-Referer"] = config.http_referer
+    if config.x_title:
+        headers["X-Title"] = config.x_title
+    return headers
+
+
+def _build_chat_payload(
+    model_id: str, prompt: str, stream: bool = False
+) -> Mapping[str, Any]:
+    return {
+        "model": model_id,
+        "messages": [{"role": "user", "content": prompt}],
+        "max_tokens": 32,
+        "temperature": 0,
+        "stream": stream,
+    }
@@ -0,0 +1,281 @@
+"""Timings and peak memory of the dashboard queries over synthetic history.
+
+For every size, ``run_query_bench`` generates a history database with
+``synthetic_history`` and runs each case in ``QUERY_CASES``: the
+``StatsService`` queries, the legacy ``SqliteTimelineRepository`` reads and
+the ``/api`` endpoints they back (with the response cache off, so every
+request queries). Each case runs once untimed to warm the page cache, then
+``repeat`` timed times, then once more under tracemalloc for its peak
+Python heap. The report is a plain dict, written as JSON by the CLI, so
+two runs can be compared number by number.
+"""
+
+from __future__ import annotations
+
+import platform
+import sqlite3
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, sessionmaker
+
+from .database import create_sqlite_engine, get_read_db
+from .models import HealthCheck, Run
+from .rollups import DAY_SECONDS
+from .services.response_cache import ResponseCache
+from .services.stats_service import StatsService
+from .sqlite_repository import SqliteTimelineRepository
+from .synthetic_history import ProgressCallback, generate_history
+
+REPORT_VERSION = 1
+DEFAULT_REPEAT = 5
+# Points a downsampled history request asks for, as the dashboard chart does.
+HISTORY_POINTS = 500
+TIMELINE_RUNS = 96
+
+
+@dataclass(frozen=True)
+class _Target:
+    path: Path
+    db: Session
+    client: Any
+    model_id: str
+    latest_ts: int
+
+
+@dataclass(frozen=True)
+class QueryTiming:
+    name: str
+    repeat: int
+    median_ms: float
+    min_ms: float
+    max_ms: float
+    # Peak of Python allocations during one call; SQLite's own page cache
+    # is not included.
+    peak_kib: float
+    # Rows, models or points the call returned, to spot a case gone empty.
+    result_size: int
+
+
+def _since(target: _Target, seconds: int) -> int:
+    return target.latest_ts - seconds
+
+
+QUERY_CASES: Sequence[Tuple[str, Callable[[_Target], Any]]] = (
+    ("stats.get_summary", lambda t: StatsService(t.db).get_summary()),
+    ("stats.get_models_stats[24h]", lambda t: StatsService(t.db).get_models_stats("24h")),
+    ("stats.get_models_stats[7d]", lambda t: StatsService(t.db).get_models_stats("7d")),
+    ("stats.get_models_stats[30d]", lambda t: StatsService(t.db).get_models_stats("30d")),
+    (
+        "stats.get_model_history[limit=50]",
+        lambda t: StatsService(t.db).get_model_history(t.model_id, limit=50),
+    ),
+    (
+        f"stats.get_model_history[30d,points={HISTORY_POINTS}]",
+        lambda t: StatsService(t.db).get_model_history(
+            t.model_id, since_ts=_since(t, 30 * DAY_SECONDS), points=HISTORY_POINTS
+        ),
+    ),
+    (
+        f"timeline.read_timeline[last_n_runs={TIMELINE_RUNS}]",
+        lambda t: SqliteTimelineRepository().read_timeline(t.path, last_n_runs=TIMELINE_RUNS)[1],
+    ),
+    (
+        "timeline.read_timeline[since=7d]",
+        lambda t: SqliteTimelineRepository().read_timeline(
+            t.path,
+            since=datetime.fromtimestamp(_since(t, 7 * DAY_SECONDS)),
+        )[1],
+    ),
+    ("api./api/summary", lambda t: _get(t, "/api/summary")),
+    ("api./api/models", lambda t: _get(t, "/api/models")),
+    ("api./api/models?window=30d", lambda t: _get(t, "/api/models?window=30d")),
+    (
+        f"api./api/models/{{id}}/history?points={HISTORY_POINTS}",
+        lambda t: _get(t, f"/api/models/{t.model_id}/history?points={HISTORY_POINTS}"),
+    ),
+)
+
+
+def parse_sizes(value: str) -> List[Tuple[int, int]]:
+    """``"300x1000,300x10000"`` -> ``[(300, 1000), (300, 10000)]`` (models x runs)."""
+    sizes = []
+    for item in value.split(","):
+        models, sep, runs = item.strip().lower().partition("x")
+        if not sep or not models.isdigit() or not runs.isdigit():
+            raise ValueError(f"Size must look like 300x1000 (models x runs): {item!r}")
+        if int(models) < 1 or int(runs) < 1:
+            raise ValueError(f"Size must be at least 1x1: {item!r}")
+        sizes.append((int(models), int(runs)))
+    return sizes
+
+
+def run_query_bench(
+    sizes: Sequence[Tuple[int, int]],
+    work_dir: Path,
+    *,
+    repeat: int = DEFAULT_REPEAT,
+    seed: int = 0,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """Generate one database per (models, runs) size in ``work_dir`` and time every case."""
+    results = []
+    for models, runs in sizes:
+        path = Path(work_dir) / f"history-{models}x{runs}-seed{seed}.db"
+        started = time.perf_counter()
+        if path.exists():
+            generate_seconds = None
+        else:
+            generate_history(path, models=models, runs=runs, seed=seed, progress=progress)
+            generate_seconds = round(time.perf_counter() - started, 2)
+        entry = bench_database(path, repeat=repeat)
+        entry["generate_seconds"] = generate_seconds
+        results.append(entry)
+    return _report(results, repeat)
+
+
+def bench_existing_database(path: Path, *, repeat: int = DEFAULT_REPEAT) -> Dict[str, Any]:
+    """The same report for a database that already exists, e.g. a production copy."""
+    return _report([bench_database(Path(path), repeat=repeat)], repeat)
+
+
+def bench_database(path: Path, *, repeat: int = DEFAULT_REPEAT) -> Dict[str, Any]:
+    with _target(path) as target:
+        models = target.db.query(func.count(func.distinct(HealthCheck.model_id))).scalar()
+        runs = target.db.query(func.count(Run.id)).scalar()
+        rows = target.db.query(func.count(HealthCheck.id)).scalar()
+        timings = [asdict(_time_case(name, case, target, repeat)) for name, case in QUERY_CASES]
+    return {
+        "database": str(path),
+        "models": models,
+        "runs": runs,
+        "rows": rows,
+        "db_bytes": path.stat().st_size,
+        "queries": timings,
+    }
+
+
+def format_query_report(report: Dict[str, Any]) -> List[str]:
+    lines = []
+    for size in report["sizes"]:
+        lines.append(
+            f"모델 {size['models']}개 × 실행 {size['runs']}회 "
+            f"(healthchecks {size['rows']:,}행, {size['db_bytes'] / 1024 / 1024:.1f} MiB)"
+        )
+        for timing in size["queries"]:
+            lines.append(
+                f"  {timing['name']}: 중앙값 {timing['median_ms']:.1f}ms "
+                f"(최소 {timing['min_ms']:.1f}, 최대 {timing['max_ms']:.1f}), "
+                f"최대 메모리 {timing['peak_kib']:,.0f} KiB"
+            )
+    return lines
+
+
+def _report(sizes: List[Dict[str, Any]], repeat: int) -> Dict[str, Any]:
+    return {
+        "version": REPORT_VERSION,
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "repeat": repeat,
+        "sizes": sizes,
+    }
+
+
+def _time_case(
+    name: str, case: Callable[[_Target], Any], target: _Target, repeat: int
+) -> QueryTiming:
+    result = case(target)
+    target.db.rollback()
+
+    samples = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        case(target)
+        samples.append((time.perf_counter() - started) * 1000)
+        # Drop the identity map so every call reads afresh.
+        target.db.rollback()
+        target.db.expunge_all()
+
+    tracemalloc.start()
+    try:
+        case(target)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        target.db.rollback()
+        target.db.expunge_all()
+
+    return QueryTiming(
+        name=name,
+        repeat=len(samples),
+        median_ms=round(statistics.median(samples), 3),
+        min_ms=round(min(samples), 3),
+        max_ms=round(max(samples), 3),
+        peak_kib=round(peak / 1024, 1),
+        result_size=_size_of(result),
+    )
+
+
+def _size_of(result: Any) -> int:
+    if isinstance(result, (list, dict)):
+        return len(result)
+    return 1 if result is not None else 0
+
+
+def _get(target: _Target, path: str) -> Any:
+    response = target.client.get(path)
+    response.raise_for_status()
+    return response.json()
+
+
+@contextmanager
+def _target(path: Path) -> Iterator[_Target]:
+    from fastapi.testclient import TestClient
+
+    from .api import endpoints
+    from .main import app
+
+    engine = create_sqlite_engine(f"sqlite:///{path}", read_only=True)
+    ReadSession = sessionmaker(bind=engine)
+
+    def read_db():
+        db = ReadSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    saved_cache = endpoints.response_cache
+    app.dependency_overrides[get_read_db] = read_db
+    endpoints.response_cache = ResponseCache(max_entries=0)
+    db = ReadSession()
+    try:
+        latest_ts = db.query(func.max(Run.run_ts)).scalar() or int(time.time())
+        # The model with the most checks: a long history to page through.
+        model_id = (
+            db.query(HealthCheck.model_id)
+            .group_by(HealthCheck.model_id)
+            .order_by(func.count(HealthCheck.id).desc(), HealthCheck.model_id)
+            .limit(1)
+            .scalar()
+        )
+        yield _Target(
+            path=path,
+            db=db,
+            client=TestClient(app),
+            model_id=model_id or "",
+            latest_ts=latest_ts,
+        )
+    finally:
+        db.close()
+        endpoints.response_cache = saved_cache
+        app.dependency_overrides.pop(get_read_db, None)
+        engine.dispose()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Callable, Mapping, Optional
+
+from .config import AppConfig
+from .http_client import get_header_float, parse_rate_limit_reset
+
+
+class TokenBucketRateLimiter:
+    """Token bucket shared by every probe and retry of a scan.
+
+    Callers reserve a token and then wait outside the lock, so the bucket
+    works the same from worker threads and from coroutines. The refill rate
+    adapts to the server: it is halved when OpenRouter answers 429 or reports
+    that the current rate-limit window is nearly exhausted, and it creeps back
+    up (up to ``max_rate_per_second``) while requests keep succeeding.
+
+    With a pool of API keys, ``windows`` is the number of keys: every
+    response then describes one key's window out of several, so the
+    advertised headroom is scaled up and an exhausted window is left to the
+    key pool to route around instead of pausing every request.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: int = 1,
+        *,
+        max_rate_per_second: Optional[float] = None,
+        min_rate_per_second: float = 0.1,
+        windows: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ) -> None:
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be positive")
+
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._lock = threading.Lock()
+        self._windows = max(1, windows)
+
+        self._burst = float(max(1, burst))
+        self._min_rate = min(min_rate_per_second, rate_per_second)
+        self._max_rate = max(rate_per_second, max_rate_per_second or rate_per_second)
+        self._rate = float(rate_per_second)
+
+        self._tokens = self._burst
+        self._updated_at = clock()
+        self._paused_until = 0.0
+        self._last_decrease_at = float("-inf")
+
+    @property
+    def rate_per_second(self) -> float:
+        with self._lock:
+            return self._rate
+
+    def reserve(self) -> float:
+        """Take one token and return how many seconds to wait before sending."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= 1.0
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self._rate
+            return max(wait, self._paused_until - now)
+
+    def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def on_response(self, status_code: Optional[int], headers: Mapping[str, str]) -> None:
+        """Adapt the refill rate to a response from OpenRouter."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+
+            remaining = get_header_float(headers, "X-RateLimit-Remaining")
+            reset_in = parse_rate_limit_reset(headers, now=self._wall_clock())
+
+            ceiling = self._max_rate
+            if remaining is not None and reset_in is not None and reset_in > 0:
+                if remaining >= 1:
+                    ceiling = min(ceiling, remaining * self._windows / reset_in)
+                elif self._windows == 1:
+                    # Window exhausted: nobody sends until it resets.
+                    self._paused_until = max(self._paused_until, now + reset_in)
+
+            if status_code == 429:
+                # One throttling episode usually produces a burst of 429s from
+                # requests already in flight; only back off once per interval.
+                if now - self._last_decrease_at >= 1.0 / self._rate:
+                    self._rate = max(self._min_rate, self._rate / 2)
+                    self._last_decrease_at = now
+                    self._tokens = min(self._tokens, 0.0)
+            elif status_code is not None and status_code < 400:
+                self._rate = self._rate + self._max_rate * 0.05
+
+            self._rate = max(self._min_rate, min(self._rate, ceiling))
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated_at)
+        self._tokens = min(self._burst, self._tokens + elapsed * self._rate)
+        self._updated_at = now
+
+
+def build_rate_limiter(config: AppConfig) -> Optional[TokenBucketRateLimiter]:
+    if config.rate_limit_per_second is None or config.rate_limit_per_second <= 0:
+        return None
+    # The configured rates are per API key; a pool of keys scales them.
+    keys = max(1, len(config.api_keys))
+    max_rate = config.rate_limit_max_per_second
+    return TokenBucketRateLimiter(
+        rate_per_second=config.rate_limit_per_second * keys,
+        burst=config.rate_limit_burst * keys,
+        max_rate_per_second=max_rate * keys if max_rate is not None else None,
+        windows=keys,
+    )
@@ -0,0 +1,180 @@
+"""Retention policy for the scouter database.
+
+Raw ``runs``/``healthchecks`` rows are kept for ``raw_retention_days``,
+hourly rollups for ``hourly_retention_days`` and daily rollups forever, so
+the dashboard's windows keep working from the rollups after the raw rows
+behind them are gone.
+
+Deletes run in small chunks, each in its own short transaction: in WAL mode
+readers never wait for them, and a scan writing at the same time only ever
+waits for one chunk. Freed pages are then handed back to the filesystem with
+``PRAGMA incremental_vacuum``; a file created before incremental auto-vacuum
+was enabled gets one full ``VACUUM`` once enough of it is free space.
+
+Like ``migrations`` and ``rollups``, this works on a plain DB-API connection.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from .rollups import DAY_SECONDS, HOURLY_TABLE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+# The 7d stats window is read from hourly rollups.
+MIN_HOURLY_RETENTION_DAYS = 7
+# Pages released per incremental_vacuum step (4 MiB with 4 KiB pages).
+VACUUM_STEP_PAGES = 1024
+# A legacy (auto_vacuum=NONE) file is rebuilt once this share of it is free.
+FULL_VACUUM_FREE_RATIO = 0.25
+
+_AUTO_VACUUM_INCREMENTAL = 2
+
+
+@dataclass
+class RetentionReport:
+    deleted_checks: int = 0
+    deleted_runs: int = 0
+    deleted_hourly_rollups: int = 0
+    vacuumed_pages: int = 0
+    full_vacuum: bool = False
+
+
+def apply_retention(
+    connection: Any,
+    *,
+    raw_retention_days: float,
+    hourly_retention_days: float,
+    now_ts: Optional[float] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    pause_seconds: float = 0.0,
+) -> RetentionReport:
+    """Delete expired rows chunk by chunk, then release the freed pages.
+
+    A retention of 0 days keeps that data forever. ``pause_seconds`` is slept
+    between chunks to leave the writer lock to a concurrent scan.
+    """
+    now_ts = time.time() if now_ts is None else now_ts
+    report = RetentionReport()
+    cursor = connection.cursor()
+    try:
+        if raw_retention_days > 0:
+            cutoff = int(now_ts - raw_retention_days * DAY_SECONDS)
+            report.deleted_checks, report.deleted_runs = _delete_raw_history(
+                connection, cursor, cutoff, chunk_size, pause_seconds
+            )
+
+        if hourly_retention_days > 0:
+            days = max(hourly_retention_days, MIN_HOURLY_RETENTION_DAYS)
+            cutoff = int(now_ts - days * DAY_SECONDS)
+            report.deleted_hourly_rollups = _delete_in_chunks(
+                connection,
+                cursor,
+                f"DELETE FROM {HOURLY_TABLE} WHERE rowid IN "
+                f"(SELECT rowid FROM {HOURLY_TABLE} WHERE bucket_ts < ? LIMIT ?)",
+                (cutoff,),
+                chunk_size,
+                pause_seconds,
+            )
+
+        _release_free_pages(connection, cursor, report)
+    finally:
+        cursor.close()
+    return report
+
+
+def _delete_raw_history(
+    connection: Any, cursor: Any, cutoff: int, chunk_size: int, pause_seconds: float
+):
+    # Runs are created in time order, so everything up to the newest expired
+    # run goes; its healthchecks and queued probe jobs first, through their
+    # run_id indexes.
+    cursor.execute("SELECT MAX(id) FROM runs WHERE run_ts < ?", (cutoff,))
+    last_expired = cursor.fetchone()[0]
+    if last_expired is None:
+        return 0, 0
+
+    deleted_checks = _delete_in_chunks(
+        connection,
+        cursor,
+        "DELETE FROM healthchecks WHERE id IN "
+        "(SELECT id FROM healthchecks WHERE run_id <= ? LIMIT ?)",
+        (last_expired,),
+        chunk_size,
+        pause_seconds,
+    )
+    _delete_in_chunks(
+        connection,
+        cursor,
+        "DELETE FROM probe_jobs WHERE id IN "
+        "(SELECT id FROM probe_jobs WHERE run_id <= ? LIMIT ?)",
+        (last_expired,),
+        chunk_size,
+        pause_seconds,
+    )
+    deleted_runs = _delete_in_chunks(
+        connection,
+        cursor,
+        "DELETE FROM runs WHERE id IN (SELECT id FROM runs WHERE id <= ? LIMIT ?)",
+        (last_expired,),
+        chunk_size,
+        pause_seconds,
+    )
+    return deleted_checks, deleted_runs
+
+
+def _delete_in_chunks(
+    connection: Any,
+    cursor: Any,
+    statement: str,
+    params: tuple,
+    chunk_size: int,
+    pause_seconds: float,
+) -> int:
+    total = 0
+    while True:
+        cursor.execute(statement, (*params, chunk_size))
+        deleted = cursor.rowcount
+        connection.commit()
+        total += max(deleted, 0)
+        if deleted < chunk_size:
+            return total
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+
+def _pragma(cursor: Any, name: str) -> int:
+    cursor.execute(f"PRAGMA {name}")
+    return int(cursor.fetchone()[0])
+
+
+def _release_free_pages(connection: Any, cursor: Any, report: RetentionReport) -> None:
+    if _pragma(cursor, "auto_vacuum") == _AUTO_VACUUM_INCREMENTAL:
+        free = _pragma(cursor, "freelist_count")
+        while free:
+            cursor.execute(f"PRAGMA incremental_vacuum({min(free, VACUUM_STEP_PAGES)})")
+            cursor.fetchall()
+            connection.commit()
+            remaining = _pragma(cursor, "freelist_count")
+            if remaining >= free:
+                break
+            report.vacuumed_pages += free - remaining
+            free = remaining
+        return
+
+    free = _pragma(cursor, "freelist_count")
+    pages = _pragma(cursor, "page_count")
+    if pages and free / pages >= FULL_VACUUM_FREE_RATIO:
+        # Rebuilding the file also switches it to incremental auto-vacuum,
+        # so this happens at most once per database.
+        logger.info("Running a one-time VACUUM to enable incremental auto-vacuum")
+        connection.commit()
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        cursor.execute("VACUUM")
+        report.vacuumed_pages = free
+        report.full_vacuum = True
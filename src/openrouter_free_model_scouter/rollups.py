@@ -0,0 +1,228 @@
+"""Incrementally maintained per-model rollups of the raw healthcheck history.
+
+Each batch of checks written for a run is folded into one hourly and one
+daily bucket per model, and into ``model_status`` (latest result and current
+failure/success streak), so the dashboard reads a handful of pre-aggregated rows no
+matter how much history the database holds.
+
+Like ``migrations``, these helpers work on a plain DB-API cursor so the ORM
+session, the Core bulk writer and the sqlite3 repository share them.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .latency_sketch import LatencySketch
+
+HOUR_SECONDS = 60 * 60
+DAY_SECONDS = 24 * HOUR_SECONDS
+
+HOURLY_TABLE = "model_rollups_hourly"
+DAILY_TABLE = "model_rollups_daily"
+ROLLUP_TABLES: Tuple[Tuple[str, int], ...] = (
+    (HOURLY_TABLE, HOUR_SECONDS),
+    (DAILY_TABLE, DAY_SECONDS),
+)
+
+# (model_id, ok, http_status, latency_ms)
+CheckRow = Tuple[str, bool, Optional[int], Optional[int]]
+# (run_id, run_ts, checks)
+RunChecks = Tuple[int, int, Sequence[CheckRow]]
+
+_ROLLUP_COLUMNS = (
+    "check_count",
+    "ok_count",
+    "latency_count",
+    "latency_sum",
+    "latency_min",
+    "latency_max",
+    "latency_sketch",
+)
+
+# Stay well below SQLite's bound-parameter limit.
+_IN_CHUNK = 500
+
+
+@dataclass
+class RollupBucket:
+    check_count: int = 0
+    ok_count: int = 0
+    # Latency figures only cover successful checks, like the dashboard always has.
+    latency_count: int = 0
+    latency_sum: int = 0
+    latency_min: Optional[int] = None
+    latency_max: Optional[int] = None
+    sketch: LatencySketch = field(default_factory=LatencySketch)
+
+    def add(self, ok: bool, latency_ms: Optional[int]) -> None:
+        self.check_count += 1
+        if not ok:
+            return
+        self.ok_count += 1
+        if latency_ms is None:
+            return
+        self.latency_count += 1
+        self.latency_sum += latency_ms
+        self.latency_min = latency_ms if self.latency_min is None else min(self.latency_min, latency_ms)
+        self.latency_max = latency_ms if self.latency_max is None else max(self.latency_max, latency_ms)
+        self.sketch.add(latency_ms)
+
+    def merge(self, other: "RollupBucket") -> None:
+        self.check_count += other.check_count
+        self.ok_count += other.ok_count
+        self.latency_count += other.latency_count
+        self.latency_sum += other.latency_sum
+        for value in (other.latency_min, other.latency_max):
+            if value is None:
+                continue
+            self.latency_min = value if self.latency_min is None else min(self.latency_min, value)
+            self.latency_max = value if self.latency_max is None else max(self.latency_max, value)
+        self.sketch.merge(other.sketch)
+
+    def to_row(self) -> Tuple[Any, ...]:
+        return (
+            self.check_count,
+            self.ok_count,
+            self.latency_count,
+            self.latency_sum,
+            self.latency_min,
+            self.latency_max,
+            self.sketch.to_json(),
+        )
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> "RollupBucket":
+        check_count, ok_count, latency_count, latency_sum, latency_min, latency_max, sketch = row
+        return cls(
+            check_count=check_count,
+            ok_count=ok_count,
+            latency_count=latency_count,
+            latency_sum=latency_sum,
+            latency_min=latency_min,
+            latency_max=latency_max,
+            sketch=LatencySketch.from_json(sketch),
+        )
+
+
+def bucket_start(ts: int, width: int) -> int:
+    # Buckets are aligned to the epoch, i.e. to UTC hours and days.
+    return ts - ts % width
+
+
+def apply_checks(cursor: Any, run_id: int, run_ts: int, checks: Sequence[CheckRow]) -> None:
+    """Fold one batch of a run's checks into the rollups and ``model_status``."""
+    apply_runs(cursor, [(run_id, run_ts, checks)])
+
+
+def apply_runs(cursor: Any, runs: Sequence[RunChecks]) -> None:
+    """``apply_checks`` for several runs, oldest first, in one pass.
+
+    Each bucket and ``model_status`` row is read and written once for the
+    whole batch instead of once per run, which is what makes bulk loads fast.
+    """
+    per_bucket: Dict[Tuple[str, int], Dict[str, RollupBucket]] = {}
+    for _, run_ts, checks in runs:
+        for table, width in ROLLUP_TABLES:
+            per_model = per_bucket.setdefault((table, bucket_start(run_ts, width)), {})
+            for model_id, ok, _, latency_ms in checks:
+                bucket = per_model.get(model_id)
+                if bucket is None:
+                    bucket = per_model[model_id] = RollupBucket()
+                bucket.add(bool(ok), latency_ms)
+
+    for (table, bucket_ts), per_model in per_bucket.items():
+        if per_model:
+            _merge_buckets(cursor, table, bucket_ts, per_model)
+    _update_model_status(cursor, runs)
+
+
+def rebuild_rollups(cursor: Any) -> None:
+    """Recompute every rollup from the raw history, oldest run first."""
+    cursor.execute(f"DELETE FROM {HOURLY_TABLE}")
+    cursor.execute(f"DELETE FROM {DAILY_TABLE}")
+    cursor.execute("DELETE FROM model_status")
+
+    cursor.execute("SELECT id, run_ts FROM runs WHERE run_ts IS NOT NULL ORDER BY id")
+    for run_id, run_ts in cursor.fetchall():
+        cursor.execute(
+            "SELECT model_id, ok, http_status, latency_ms FROM healthchecks WHERE run_id = ?",
+            (run_id,),
+        )
+        apply_checks(cursor, run_id, run_ts, cursor.fetchall())
+
+
+def _chunks(items: List[str]) -> Iterable[List[str]]:
+    for start in range(0, len(items), _IN_CHUNK):
+        yield items[start : start + _IN_CHUNK]
+
+
+def _merge_buckets(
+    cursor: Any, table: str, bucket_ts: int, per_model: Dict[str, RollupBucket]
+) -> None:
+    merged: Dict[str, RollupBucket] = {}
+    for chunk in _chunks(list(per_model)):
+        placeholders = ", ".join("?" for _ in chunk)
+        cursor.execute(
+            f"SELECT model_id, {', '.join(_ROLLUP_COLUMNS)} FROM {table} "
+            f"WHERE bucket_ts = ? AND model_id IN ({placeholders})",
+            (bucket_ts, *chunk),
+        )
+        for row in cursor.fetchall():
+            merged[row[0]] = RollupBucket.from_row(row[1:])
+
+    for model_id, delta in per_model.items():
+        merged.setdefault(model_id, RollupBucket()).merge(delta)
+
+    columns = ", ".join(_ROLLUP_COLUMNS)
+    updates = ", ".join(f"{column} = excluded.{column}" for column in _ROLLUP_COLUMNS)
+    cursor.executemany(
+        f"INSERT INTO {table} (model_id, bucket_ts, {columns}) "
+        f"VALUES (?, ?, {', '.join('?' for _ in _ROLLUP_COLUMNS)}) "
+        f"ON CONFLICT (model_id, bucket_ts) DO UPDATE SET {updates}",
+        [(model_id, bucket_ts, *bucket.to_row()) for model_id, bucket in merged.items()],
+    )
+
+
+def _update_model_status(cursor: Any, runs: Sequence[RunChecks]) -> None:
+    model_ids = list(dict.fromkeys(model_id for _, _, checks in runs for model_id, *_ in checks))
+    current: Dict[str, Tuple[int, int, int]] = {}
+    for chunk in _chunks(model_ids):
+        placeholders = ", ".join("?" for _ in chunk)
+        cursor.execute(
+            "SELECT model_id, last_run_id, consecutive_failures, consecutive_successes "
+            f"FROM model_status WHERE model_id IN ({placeholders})",
+            chunk,
+        )
+        for model_id, last_run_id, failures, successes in cursor.fetchall():
+            current[model_id] = (last_run_id, failures, successes)
+
+    rows: Dict[str, Tuple[Any, ...]] = {}
+    for run_id, run_ts, checks in runs:
+        for model_id, ok, http_status, _ in checks:
+            last_run_id, failures, successes = current.get(model_id, (None, 0, 0))
+            if last_run_id is not None and last_run_id >= run_id:
+                # Already counted, or older than what we have.
+                continue
+            if ok:
+                failures, successes = 0, successes + 1
+            else:
+                failures, successes = failures + 1, 0
+            current[model_id] = (run_id, failures, successes)
+            rows[model_id] = (
+                model_id, run_id, run_ts, bool(ok), http_status, failures, successes
+            )
+
+    cursor.executemany(
+        "INSERT INTO model_status "
+        "(model_id, last_run_id, last_run_ts, last_ok, last_http_status, "
+        "consecutive_failures, consecutive_successes) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (model_id) DO UPDATE SET "
+        "last_run_id = excluded.last_run_id, last_run_ts = excluded.last_run_ts, "
+        "last_ok = excluded.last_ok, last_http_status = excluded.last_http_status, "
+        "consecutive_failures = excluded.consecutive_failures, "
+        "consecutive_successes = excluded.consecutive_successes",
+        list(rows.values()),
+    )
@@ -18,6 +18,10 @@ class HealthCheckSchema(BaseModel):
     http_status: Optional[int] = None
     error_category: Optional[str] = None
     latency_ms: Optional[int] = None
+    ttfb_ms: Optional[int] = None
+    ttft_ms: Optional[int] = None
+    total_ms: Optional[int] = None
+    tokens_per_second: Optional[float] = None
 
     class Config:
         from_attributes = True
@@ -25,18 +29,42 @@ class HealthCheckSchema(BaseModel):
 
 class ModelStats(BaseModel):
     model_id: str
+    window: str = "24h"  # look-back window the uptime/latency figures cover
     uptime_24h: float
     avg_latency_24h: Optional[float]
+    # Latency percentiles over the same window, from merged rollup sketches.
+    p50_latency: Optional[float] = None
+    p90_latency: Optional[float] = None
+    p99_latency: Optional[float] = None
     consecutive_failures: int
-    latest_status: str  # e.g., "OK", "FAIL", "429"
+    latest_status: str  # e.g., "OK", "FAIL", "429", "SKIPPED"
+    circuit_state: str = "closed"  # closed, open or half_open
     sparkline_data: List[Optional[int]] = []
 
 
 class ModelHistoryPoint(BaseModel):
+    run_id: Optional[int] = None
     run_datetime: str
+    run_ts: Optional[int] = None
     ok: bool
     latency_ms: Optional[int]
+    ttft_ms: Optional[int] = None
     status_label: str
+    # Only set by the "buckets" downsampling: one point per time slice.
+    latency_min_ms: Optional[int] = None
+    latency_max_ms: Optional[int] = None
+    check_count: Optional[int] = None
+    uptime: Optional[float] = None
+
+
+class ScanProgress(BaseModel):
+    run_id: int
+    run_datetime: str
+    status: str  # "started", "finished" or "partial"
+    finished_at: Optional[str] = None
+    total_models: Optional[int] = None
+    checked_count: int
+    ok_count: int
 
 
 class Summary(BaseModel):
@@ -0,0 +1,116 @@
+"""Reduce a model's history to a requested number of chart points.
+
+``lttb`` keeps real checks (so the ok/failed colouring stays truthful) and
+picks the ones that best preserve the latency curve's shape;
+``buckets`` splits the time range into equal slices and reports the
+min/avg/max latency and uptime of each one.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional, Sequence, TypeVar
+
+DOWNSAMPLE_METHODS = ("lttb", "buckets")
+
+T = TypeVar("T")
+
+
+def lttb(
+    points: Sequence[T],
+    threshold: int,
+    x: Callable[[T], float],
+    y: Callable[[T], float],
+) -> List[T]:
+    """Largest-Triangle-Three-Buckets: keep ``threshold`` of ``points``.
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the point kept
+    before it and the average of the next bucket.
+    """
+    if threshold < 3:
+        raise ValueError("LTTB needs at least 3 points")
+    if threshold >= len(points):
+        return list(points)
+
+    sampled = [points[0]]
+    every = (len(points) - 2) / (threshold - 2)
+    kept = 0
+
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+
+        next_start = end
+        next_end = min(int((i + 2) * every) + 1, len(points))
+        following = points[next_start:next_end] or [points[-1]]
+        avg_x = sum(x(p) for p in following) / len(following)
+        avg_y = sum(y(p) for p in following) / len(following)
+
+        ax, ay = x(points[kept]), y(points[kept])
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (y(points[j]) - ay) - (ax - x(points[j])) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        kept = best
+
+    sampled.append(points[-1])
+    return sampled
+
+
+def bucket_aggregate(
+    points: Sequence[Dict],
+    threshold: int,
+    x: Callable[[Dict], float],
+) -> List[Dict]:
+    """Fold history points into ``threshold`` equal time slices.
+
+    Each slice becomes one point carrying ``check_count``, ``uptime`` and the
+    min/avg/max latency of its successful checks; the status of its newest
+    check is kept as the slice's status.
+    """
+    if not points or threshold >= len(points):
+        return [
+            dict(
+                p,
+                latency_min_ms=p["latency_ms"] if p["ok"] else None,
+                latency_max_ms=p["latency_ms"] if p["ok"] else None,
+                check_count=1,
+                uptime=100.0 if p["ok"] else 0.0,
+            )
+            for p in points
+        ]
+
+    first, last = x(points[0]), x(points[-1])
+    width = (last - first) / threshold or 1.0
+
+    slices: List[List[Dict]] = [[] for _ in range(threshold)]
+    for point in points:
+        index = min(int((x(point) - first) / width), threshold - 1)
+        slices[index].append(point)
+
+    aggregated = []
+    for members in slices:
+        if not members:
+            continue
+        latencies = [p["latency_ms"] for p in members if p["ok"] and p["latency_ms"] is not None]
+        ok_count = sum(1 for p in members if p["ok"])
+        newest = members[-1]
+        aggregated.append(
+            dict(
+                newest,
+                run_datetime=members[0]["run_datetime"],
+                ok=ok_count == len(members),
+                latency_ms=_average(latencies),
+                latency_min_ms=min(latencies) if latencies else None,
+                latency_max_ms=max(latencies) if latencies else None,
+                check_count=len(members),
+                uptime=ok_count / len(members) * 100,
+            )
+        )
+    return aggregated
+
+
+def _average(values: List[int]) -> Optional[int]:
+    return round(sum(values) / len(values)) if values else None
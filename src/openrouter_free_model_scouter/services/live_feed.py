@@ -0,0 +1,145 @@
+"""In-process publish/subscribe feed behind ``/api/events``.
+
+The scan pipeline publishes from whatever thread it runs in (the scheduler's
+worker thread, or the thread pool's caller); each SSE client owns an asyncio
+queue that events are handed to on its event loop. Recent events are kept in
+a ring buffer so a reconnecting ``EventSource`` can replay what it missed via
+``Last-Event-ID``; a client that fell further behind, or whose queue
+overflowed, is told to ``resync`` and reloads the full tables instead.
+
+Only scans running in the API process show up here; a CLI scan in another
+process is still picked up by the regular endpoints.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from ..domain_models import HealthcheckResult
+
+EVENT_RUN_STARTED = "run_started"
+EVENT_RESULT = "result"
+EVENT_RUN_FINISHED = "run_finished"
+EVENT_RESYNC = "resync"
+
+DEFAULT_HISTORY_SIZE = 2000
+DEFAULT_QUEUE_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class FeedEvent:
+    id: int
+    type: str
+    data: Dict[str, Any]
+
+    def encode(self) -> str:
+        payload = json.dumps(self.data, separators=(",", ":"))
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int) -> None:
+        self.loop = loop
+        self.queue: "asyncio.Queue[FeedEvent]" = asyncio.Queue(maxsize=maxsize)
+
+    def deliver(self, event: FeedEvent) -> None:
+        # Runs on the subscriber's loop.
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(FeedEvent(event.id, EVENT_RESYNC, {}))
+            return
+        self.queue.put_nowait(event)
+
+
+class LiveFeed:
+    def __init__(
+        self,
+        history_size: int = DEFAULT_HISTORY_SIZE,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._history: Deque[FeedEvent] = deque(maxlen=history_size)
+        self._subscribers: Set[Subscription] = set()
+        self._queue_size = queue_size
+
+    @property
+    def last_event_id(self) -> int:
+        with self._lock:
+            return self._history[-1].id if self._history else 0
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> FeedEvent:
+        with self._lock:
+            event = FeedEvent(next(self._ids), event_type, data)
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.deliver, event)
+            except RuntimeError:
+                # The client's loop is gone; it unsubscribes on its way out.
+                pass
+        return event
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscription:
+        """Register a client on the running loop, replaying events after ``last_event_id``."""
+        subscription = Subscription(asyncio.get_running_loop(), self._queue_size)
+        with self._lock:
+            backlog = self._replay(last_event_id)
+            self._subscribers.add(subscription)
+        for event in backlog:
+            subscription.deliver(event)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def _replay(self, last_event_id: Optional[int]) -> List[FeedEvent]:
+        if last_event_id is None:
+            return []
+        newest = self._history[-1].id if self._history else 0
+        oldest = self._history[0].id if self._history else 1
+        if last_event_id > newest or last_event_id + 1 < oldest:
+            # Ids from before a restart, or a gap that fell out of the buffer.
+            return [FeedEvent(newest, EVENT_RESYNC, {})]
+        return [event for event in self._history if event.id > last_event_id]
+
+    # Helpers for the scan pipeline.
+
+    def run_started(self, run_id: int, run_datetime: str, total_models: int) -> None:
+        self.publish(
+            EVENT_RUN_STARTED,
+            {"run_id": run_id, "run_datetime": run_datetime, "total_models": total_models},
+        )
+
+    def result(self, run_id: int, result: HealthcheckResult) -> None:
+        self.publish(
+            EVENT_RESULT,
+            {
+                "run_id": run_id,
+                "model_id": result.model_id,
+                "ok": result.ok,
+                "http_status": result.http_status,
+                "error_category": result.error_category,
+                "latency_ms": result.latency_ms,
+                "ttft_ms": result.ttft_ms,
+            },
+        )
+
+    def run_finished(self, run_id: int, status: str, finished_at: Optional[str]) -> None:
+        self.publish(
+            EVENT_RUN_FINISHED,
+            {"run_id": run_id, "status": status, "finished_at": finished_at},
+        )
+
+
+# Fed by ScouterWorker, read by the /api/events endpoint.
+live_feed = LiveFeed()
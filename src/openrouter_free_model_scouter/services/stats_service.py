@@ -1,8 +1,63 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, or_
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
-from ..models import Run, HealthCheck
+from ..models import (
+    CatalogChange,
+    CircuitBreakerState,
+    DailyRollup,
+    HealthCheck,
+    HourlyRollup,
+    ModelStatus,
+    Run,
+    RUN_STARTED,
+)
+from ..catalog_cache import removed_model_ids
+from ..circuit_breaker import CIRCUIT_CLOSED, CIRCUIT_OPEN, CIRCUIT_OPEN_CATEGORY
+from ..latency_sketch import LatencySketch
+from ..rollups import DAY_SECONDS, HOUR_SECONDS, RollupBucket, bucket_start
+from .downsampling import DOWNSAMPLE_METHODS, bucket_aggregate, lttb
+
+# Look-back windows accepted by get_models_stats, in seconds.
+STATS_WINDOWS = {
+    "1h": 60 * 60,
+    "24h": 24 * 60 * 60,
+    "7d": 7 * 24 * 60 * 60,
+    "30d": 30 * 24 * 60 * 60,
+}
+DEFAULT_STATS_WINDOW = "24h"
+# Rollup table (and bucket width) each window is read from. Windows not
+# listed here are too short for whole buckets and read the raw checks.
+_ROLLUP_FOR_WINDOW = {
+    "24h": (HourlyRollup, HOUR_SECONDS),
+    "7d": (HourlyRollup, HOUR_SECONDS),
+    "30d": (DailyRollup, DAY_SECONDS),
+}
+SPARKLINE_POINTS = 24
+# Most checks a downsampled history request reads in one go.
+MAX_DOWNSAMPLE_ROWS = 20000
+LATENCY_PERCENTILES = {"p50_latency": 0.5, "p90_latency": 0.9, "p99_latency": 0.99}
+# Adaptive scans only probe the models that are due, so a model stays listed
+# while its last check is at most this old relative to the newest run.
+ACTIVE_MODEL_SECONDS = DAY_SECONDS
+
+
+def status_label(
+    ok: bool, http_status: Optional[int], error_category: Optional[str] = None
+) -> str:
+    if ok:
+        return "OK"
+    if error_category == CIRCUIT_OPEN_CATEGORY:
+        return "SKIPPED"
+    if http_status == 429 or error_category == "rate_limited":
+        return "429"
+    if http_status:
+        return f"HTTP {http_status}"
+    return "FAIL"
+
+
+def _point_ts(point: Dict) -> float:
+    return point["run_ts"] or 0
 
 
 class StatsService:
@@ -12,8 +67,59 @@ class StatsService:
     def get_latest_run(self) -> Optional[Run]:
         return self.db.query(Run).order_by(Run.id.desc()).first()
 
-    def get_summary(self) -> Dict:
+    def get_latest_completed_run(self) -> Optional[Run]:
+        # Runs still being scanned only hold the models probed so far.
+        return (
+            self.db.query(Run)
+            .filter(or_(Run.status.is_(None), Run.status != RUN_STARTED))
+            .order_by(Run.id.desc())
+            .first()
+        )
+
+    def get_data_version(self) -> Tuple:
+        """Cheap token that changes whenever results are written, a run ends,
+        the catalog changes (a removed model leaves the dashboard) or
+        retention prunes old checks.
+
+        Every lookup is an index seek, so checking it costs the same however
+        much history is stored; a writer in another process bumps it too.
+        """
+        latest_run = self.db.query(Run.id, Run.status).order_by(Run.id.desc()).first()
+        first_check_id, last_check_id = self.db.query(
+            func.min(HealthCheck.id), func.max(HealthCheck.id)
+        ).one()
+        last_change_id = self.db.query(func.max(CatalogChange.id)).scalar()
+        checks = (first_check_id, last_check_id, last_change_id)
+        if latest_run is None:
+            return (None, None, *checks)
+        return (latest_run.id, latest_run.status, *checks)
+
+    def get_scan_progress(self) -> Optional[Dict]:
         latest_run = self.get_latest_run()
+        if not latest_run:
+            return None
+
+        checked_count, ok_count = (
+            self.db.query(
+                func.count(HealthCheck.id),
+                func.coalesce(func.sum(HealthCheck.ok), 0),
+            )
+            .filter(HealthCheck.run_id == latest_run.id)
+            .one()
+        )
+
+        return {
+            "run_id": latest_run.id,
+            "run_datetime": latest_run.run_datetime,
+            "status": latest_run.status or "finished",
+            "finished_at": latest_run.finished_at,
+            "total_models": latest_run.total_models,
+            "checked_count": checked_count,
+            "ok_count": int(ok_count),
+        }
+
+    def get_summary(self) -> Dict:
+        latest_run = self.get_latest_completed_run() or self.get_latest_run()
         if not latest_run:
             return {
                 "total_models": 0,
@@ -24,13 +130,22 @@ class StatsService:
             }
 
         checks = (
-            self.db.query(HealthCheck).filter(HealthCheck.run_id == latest_run.id).all()
+            self.db.query(HealthCheck.model_id, HealthCheck.ok)
+            .filter(HealthCheck.run_id == latest_run.id)
+            .all()
         )
-        total_models = len(checks)
+        latest_ok = {model_id: bool(ok) for model_id, ok in checks}
+        # Models the run didn't probe (adaptive scans) count with their last
+        # known result.
+        for model_id, ok in self._recently_checked(latest_run, exclude=latest_ok):
+            latest_ok[model_id] = bool(ok)
+        for model_id in removed_model_ids(self.db):
+            latest_ok.pop(model_id, None)
+        total_models = len(latest_ok)
 
         # Simple heuristic for now: OK -> healthy, others -> down
         # Ideally, we should look at history for degraded
-        healthy_count = sum(1 for c in checks if c.ok)
+        healthy_count = sum(1 for ok in latest_ok.values() if ok)
         down_count = total_models - healthy_count
 
         return {
@@ -41,140 +156,283 @@ class StatsService:
             "last_updated": latest_run.run_datetime,
         }
 
-    def get_model_history(self, model_id: str, limit: int = 50) -> List[Dict]:
+    def get_model_history(self, model_id: str, limit: int = 50, **kwargs) -> List[Dict]:
+        return self.get_model_history_page(model_id, limit=limit, **kwargs)[0]
+
+    def get_model_history_page(
+        self,
+        model_id: str,
+        limit: int = 50,
+        before: Optional[int] = None,
+        since_ts: Optional[int] = None,
+        until_ts: Optional[int] = None,
+        points: Optional[int] = None,
+        method: str = "lttb",
+    ) -> Tuple[List[Dict], Optional[int]]:
+        """One page of a model's history, oldest first, and the cursor for the next.
+
+        ``before`` is a run id (exclusive) to page back from. Without
+        ``points`` a page holds the newest ``limit`` checks; with it, every
+        check in the range (at most ``MAX_DOWNSAMPLE_ROWS``) is reduced to
+        about ``points`` chart points by ``method``. The returned cursor is
+        the ``before`` value for the next page, or None on the last one.
+        """
+        if method not in DOWNSAMPLE_METHODS:
+            raise ValueError(f"Unknown downsampling method: {method}")
+
+        low_run_id, high_run_id = self._run_id_range(since_ts, until_ts)
+        if low_run_id is None or high_run_id is None:
+            return [], None
+        if before is not None:
+            high_run_id = min(high_run_id, before - 1)
+
+        fetch = MAX_DOWNSAMPLE_ROWS if points else limit + 1
         query = (
             self.db.query(
+                HealthCheck.run_id,
                 Run.run_datetime,
+                Run.run_ts,
                 HealthCheck.ok,
                 HealthCheck.latency_ms,
+                HealthCheck.ttft_ms,
                 HealthCheck.http_status,
                 HealthCheck.error_category,
             )
-            .join(HealthCheck, Run.id == HealthCheck.run_id)
+            .join(Run, Run.id == HealthCheck.run_id)
             .filter(HealthCheck.model_id == model_id)
-            .order_by(Run.id.desc())
-            .limit(limit)
+            .filter(HealthCheck.run_id.between(low_run_id, high_run_id))
+            # Same order as Run.id, but lets SQLite walk (model_id, run_id).
+            .order_by(HealthCheck.run_id.desc())
+            .limit(fetch)
         )
         results = query.all()
 
-        history = []
-        for run_datetime, ok, latency, http_status, error_category in reversed(results):
-            status_label = "OK"
-            if not ok:
-                if http_status == 429 or error_category == "rate_limited":
-                    status_label = "429"
-                elif http_status:
-                    status_label = f"HTTP {http_status}"
-                else:
-                    status_label = "FAIL"
+        next_cursor = None
+        if points:
+            if len(results) == MAX_DOWNSAMPLE_ROWS:
+                next_cursor = results[-1].run_id
+        elif len(results) > limit:
+            results = results[:limit]
+            next_cursor = results[-1].run_id
 
+        history = []
+        for run_id, run_datetime, run_ts, ok, latency, ttft, http_status, error_category in reversed(results):
             history.append(
                 {
+                    "run_id": run_id,
                     "run_datetime": run_datetime,
+                    "run_ts": run_ts,
                     "ok": ok,
                     "latency_ms": latency,
-                    "status_label": status_label,
+                    "ttft_ms": ttft,
+                    "status_label": status_label(ok, http_status, error_category),
                 }
             )
-        return history
 
-    def get_models_stats(self, lookback_hours: int = 24) -> List[Dict]:
+        if points and len(history) > points:
+            if method == "lttb":
+                history = lttb(history, points, x=_point_ts, y=lambda p: p["latency_ms"] or 0)
+            else:
+                history = bucket_aggregate(history, points, x=_point_ts)
+        return history, next_cursor
+
+    def _run_id_range(
+        self, since_ts: Optional[int], until_ts: Optional[int]
+    ) -> Tuple[Optional[int], Optional[int]]:
+        # Runs are created in time order, so a time range is a run id range
+        # and the history query stays on the (model_id, run_id) index.
+        low = 0
+        high = self.db.query(func.max(Run.id)).scalar()
+        if since_ts is not None:
+            low = self.db.query(func.min(Run.id)).filter(Run.run_ts >= since_ts).scalar()
+        if until_ts is not None:
+            high = self.db.query(func.max(Run.id)).filter(Run.run_ts <= until_ts).scalar()
+        return low, high
+
+    def _recently_checked(self, run: Run, exclude) -> List[Tuple[str, bool]]:
+        # (model_id, last_ok) of the models checked within ACTIVE_MODEL_SECONDS
+        # before ``run``, or skipped since by an open circuit, that are not in
+        # ``exclude``.
+        since = (run.run_ts or 0) - ACTIVE_MODEL_SECONDS
+        open_circuits = self.db.query(CircuitBreakerState.model_id).filter(
+            CircuitBreakerState.state == CIRCUIT_OPEN
+        )
+        return [
+            (model_id, ok)
+            for model_id, ok in self.db.query(ModelStatus.model_id, ModelStatus.last_ok)
+            .filter(
+                or_(
+                    ModelStatus.last_run_ts >= since,
+                    ModelStatus.model_id.in_(open_circuits),
+                )
+            )
+            .filter(ModelStatus.last_run_id <= run.id)
+            if model_id not in exclude
+        ]
+
+    def get_models_stats(self, window: str = DEFAULT_STATS_WINDOW) -> List[Dict]:
+        if window not in STATS_WINDOWS:
+            raise ValueError(f"Unknown stats window: {window}")
+
         # Get all distinct models from the latest run first
         latest_run = self.get_latest_run()
         if not latest_run:
             return []
 
-        latest_checks = {
-            c.model_id: c
-            for c in self.db.query(HealthCheck)
-            .filter(HealthCheck.run_id == latest_run.id)
-            .all()
-        }
-        model_ids = list(latest_checks.keys())
-
-        # For stats, we need history.
-        # Since we don't have easy date parsing in SQLite for complex queries without extensions,
-        # we'll fetch last N runs that cover approximately lookback_hours.
-        # Assuming 1 run per hour, we fetch 24 runs.
-        # But runs can be frequent. Let's just fetch last 100 runs and filter in python if needed,
-        # or just use last 50 runs for stats.
-
-        # Let's fetch the last 100 runs.
-        runs = self.db.query(Run).order_by(Run.id.desc()).limit(100).all()
-        if not runs:
-            return []
+        # While a scan is running, keep listing the models of the last
+        # complete run and fold in whatever the live run has checked so far.
+        reference_run = self.get_latest_completed_run() or latest_run
+        model_ids = [
+            model_id
+            for (model_id,) in self.db.query(HealthCheck.model_id)
+            .filter(HealthCheck.run_id.in_({reference_run.id, latest_run.id}))
+            .distinct()
+        ]
+        model_ids += [
+            model_id
+            for model_id, _ in self._recently_checked(latest_run, exclude=set(model_ids))
+        ]
+        # Models dropped from the catalog leave the list right away.
+        removed = set(removed_model_ids(self.db))
+        model_ids = [model_id for model_id in model_ids if model_id not in removed]
 
-        run_ids = [r.id for r in runs]
-
-        checks = (
-            self.db.query(HealthCheck)
-            .filter(HealthCheck.run_id.in_(run_ids))
-            .filter(HealthCheck.model_id.in_(model_ids))
-            .all()
-        )
-
-        # Group by model
-        model_checks = {mid: [] for mid in model_ids}
-        for c in checks:
-            if c.model_id in model_checks:
-                model_checks[c.model_id].append(c)
+        if window in _ROLLUP_FOR_WINDOW:
+            aggregates, sparklines, sketches = self._window_from_rollups(
+                window, model_ids, latest_run
+            )
+        else:
+            aggregates, sparklines, sketches = self._window_from_checks(
+                window, model_ids, latest_run
+            )
 
-        # Sort checks by run_id desc (latest first)
-        for mid in model_checks:
-            model_checks[mid].sort(key=lambda x: x.run_id, reverse=True)
+        statuses = {
+            status.model_id: status
+            for status in self.db.query(ModelStatus).filter(
+                ModelStatus.model_id.in_(model_ids)
+            )
+        }
 
-        stats = []
-        for mid, m_checks in model_checks.items():
-            if not m_checks:
-                continue
-
-            total_attempts = len(m_checks)
-            success_count = sum(1 for c in m_checks if c.ok)
-            uptime = (
-                (success_count / total_attempts) * 100 if total_attempts > 0 else 0.0
+        circuits = dict(
+            self.db.query(CircuitBreakerState.model_id, CircuitBreakerState.state).filter(
+                CircuitBreakerState.model_id.in_(model_ids)
             )
+        )
 
-            latencies = [
-                c.latency_ms for c in m_checks if c.ok and c.latency_ms is not None
-            ]
-            avg_latency = sum(latencies) / len(latencies) if latencies else None
+        stats = []
+        for mid, total_attempts, success_count, latency_sum, latency_count in aggregates:
+            uptime = (success_count / total_attempts) * 100 if total_attempts else 0.0
+            avg_latency = latency_sum / latency_count if latency_count else None
 
-            # Consecutive failures from latest
+            status = statuses.get(mid)
+            latest_status = "MISS"
             consecutive_failures = 0
-            for c in m_checks:  # already sorted latest first
-                if not c.ok:
-                    consecutive_failures += 1
-                else:
-                    break
-
-            latest_c = latest_checks.get(mid)
-            latest_status = "OK"
-            if latest_c:
-                if not latest_c.ok:
-                    if latest_c.http_status == 429:
-                        latest_status = "429"
-                    elif latest_c.http_status:
-                        latest_status = f"HTTP {latest_c.http_status}"
-                    else:
-                        latest_status = "FAIL"
-            else:
-                latest_status = "MISS"
+            if status is not None:
+                consecutive_failures = status.consecutive_failures
+                latest_status = status_label(status.last_ok, status.last_http_status)
+            circuit_state = circuits.get(mid, CIRCUIT_CLOSED)
+            if circuit_state == CIRCUIT_OPEN:
+                # Its latest checks were skipped, not failed.
+                latest_status = status_label(False, None, CIRCUIT_OPEN_CATEGORY)
 
-            # Generate sparkline data (max 24 points, from oldest to newest)
-            sparkline_points = m_checks[:24]
-            sparkline_data = [
-                c.latency_ms if c.ok else None for c in reversed(sparkline_points)
-            ]
+            sketch = sketches.get(mid)
+            percentiles = {
+                name: sketch.quantile(q) if sketch is not None else None
+                for name, q in LATENCY_PERCENTILES.items()
+            }
 
             stats.append(
                 {
                     "model_id": mid,
+                    "window": window,
                     "uptime_24h": uptime,
                     "avg_latency_24h": avg_latency,
+                    **percentiles,
                     "consecutive_failures": consecutive_failures,
                     "latest_status": latest_status,
-                    "sparkline_data": sparkline_data,
+                    "circuit_state": circuit_state,
+                    "sparkline_data": sparklines.get(mid, []),
                 }
             )
 
         return stats
+
+    def _window_from_rollups(
+        self, window: str, model_ids: List[str], latest_run: Run
+    ) -> Tuple[List[Tuple], Dict[str, List[Optional[int]]], Dict[str, LatencySketch]]:
+        rollup, width = _ROLLUP_FOR_WINDOW[window]
+        # Windows are whole buckets ending with the one that holds the newest
+        # run, so a scouter stopped for a while still shows its last numbers.
+        newest_bucket = bucket_start(latest_run.run_ts or 0, width)
+        first_bucket = newest_bucket - (STATS_WINDOWS[window] // width - 1) * width
+        sparkline_from = max(first_bucket, newest_bucket - (SPARKLINE_POINTS - 1) * width)
+
+        aggregates = (
+            self.db.query(
+                rollup.model_id,
+                func.sum(rollup.check_count),
+                func.sum(rollup.ok_count),
+                func.sum(rollup.latency_sum),
+                func.sum(rollup.latency_count),
+            )
+            .filter(rollup.bucket_ts >= first_bucket)
+            .filter(rollup.model_id.in_(model_ids))
+            .group_by(rollup.model_id)
+            .all()
+        )
+
+        # Sparkline: average latency per bucket for the newest buckets that
+        # saw any check, oldest first; None where every check failed.
+        sparklines: Dict[str, List[Optional[int]]] = {}
+        for model_id, latency_sum, latency_count in (
+            self.db.query(rollup.model_id, rollup.latency_sum, rollup.latency_count)
+            .filter(rollup.bucket_ts >= sparkline_from)
+            .filter(rollup.model_id.in_(model_ids))
+            .order_by(rollup.model_id, rollup.bucket_ts)
+        ):
+            point = round(latency_sum / latency_count) if latency_count else None
+            sparklines.setdefault(model_id, []).append(point)
+
+        # Percentiles: merge the per-bucket sketches over the whole window.
+        sketches: Dict[str, LatencySketch] = {}
+        for model_id, payload in (
+            self.db.query(rollup.model_id, rollup.latency_sketch)
+            .filter(rollup.bucket_ts >= first_bucket)
+            .filter(rollup.model_id.in_(model_ids))
+            .filter(rollup.latency_count > 0)
+        ):
+            bucket_sketch = LatencySketch.from_json(payload)
+            if model_id in sketches:
+                sketches[model_id].merge(bucket_sketch)
+            else:
+                sketches[model_id] = bucket_sketch
+
+        return aggregates, sparklines, sketches
+
+    def _window_from_checks(
+        self, window: str, model_ids: List[str], latest_run: Run
+    ) -> Tuple[List[Tuple], Dict[str, List[Optional[int]]], Dict[str, LatencySketch]]:
+        # The trailing window ending at the newest run, to the second: an
+        # hour of checks is a few runs per model, cheap to read raw.
+        low_run_id, _ = self._run_id_range((latest_run.run_ts or 0) - STATS_WINDOWS[window], None)
+        buckets: Dict[str, RollupBucket] = {}
+        sparklines: Dict[str, List[Optional[int]]] = {}
+        if low_run_id is not None:
+            for model_id, ok, latency in (
+                self.db.query(HealthCheck.model_id, HealthCheck.ok, HealthCheck.latency_ms)
+                .filter(HealthCheck.run_id.between(low_run_id, latest_run.id))
+                .filter(HealthCheck.model_id.in_(model_ids))
+                .order_by(HealthCheck.model_id, HealthCheck.run_id)
+            ):
+                buckets.setdefault(model_id, RollupBucket()).add(bool(ok), latency)
+                # Sparkline: one point per check, None where it failed.
+                sparklines.setdefault(model_id, []).append(latency if ok else None)
+
+        aggregates = [
+            (model_id, b.check_count, b.ok_count, b.latency_sum, b.latency_count)
+            for model_id, b in buckets.items()
+        ]
+        sparklines = {
+            model_id: points[-SPARKLINE_POINTS:] for model_id, points in sparklines.items()
+        }
+        sketches = {model_id: b.sketch for model_id, b in buckets.items() if b.latency_count}
+        return aggregates, sparklines, sketches
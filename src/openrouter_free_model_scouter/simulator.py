@@ -0,0 +1,303 @@
+"""Local stand-in for the parts of the OpenRouter API the scouter talks to.
+
+Serves ``GET /api/v1/models`` and ``POST /api/v1/chat/completions`` (plain
+JSON or SSE) over real HTTP on localhost, so a scan can be measured end to
+end without the real API. Each model answers according to its
+``ModelProfile``: a log-normal latency, a share of 429 and 5xx answers, an
+optional ``Retry-After`` and a body that can be made to trickle in.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, fields, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+API_PREFIX = "/api/v1"
+# Non-streamed bodies are written in this many pieces when trickling.
+TRICKLE_PIECES = 4
+
+
+@dataclass(frozen=True)
+class ModelProfile:
+    model_id: str
+    # Median time before the response starts, in milliseconds.
+    latency_ms: float = 200.0
+    # Sigma of the log-normal latency around the median; 0 is a fixed latency.
+    latency_sigma: float = 0.0
+    rate_limit_rate: float = 0.0
+    server_error_rate: float = 0.0
+    # Sent as Retry-After with 429 and 503 answers; None sends no header.
+    retry_after_seconds: Optional[float] = None
+    # Pause between body pieces (SSE events when streaming).
+    trickle_ms: float = 0.0
+
+
+def build_profiles(
+    count: int,
+    default: ModelProfile,
+    overrides: Iterable[Mapping[str, Any]] = (),
+) -> List[ModelProfile]:
+    """``count`` models shaped like ``default``, plus per-model ``overrides``.
+
+    An override names a ``model_id`` and any profile fields to change; one
+    for a model that is not among the generated ones adds that model.
+    """
+    profiles = {
+        f"simulated/model-{index:04d}:free": replace(
+            default, model_id=f"simulated/model-{index:04d}:free"
+        )
+        for index in range(count)
+    }
+    known = {field.name for field in fields(ModelProfile)}
+    for override in overrides:
+        unknown = set(override) - known
+        if unknown:
+            raise ValueError(f"Unknown model profile fields: {', '.join(sorted(unknown))}")
+        model_id = override.get("model_id")
+        if not isinstance(model_id, str) or not model_id:
+            raise ValueError("Every model profile override needs a model_id")
+        base = profiles.get(model_id, replace(default, model_id=model_id))
+        profiles[model_id] = replace(base, **override)
+    return list(profiles.values())
+
+
+def load_profile_overrides(path: str) -> List[Dict[str, Any]]:
+    """Read a JSON list of per-model overrides for ``build_profiles``."""
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+        raise ValueError(f"{path}: expected a JSON list of model profiles")
+    return data
+
+
+class OpenRouterSimulator:
+    """A threaded HTTP server answering like OpenRouter; use it as a context manager.
+
+    Besides serving, it records how long it spent on each chat completion
+    per model (including the injected latency and trickle), so callers can
+    tell their own overhead apart from the simulated upstream time.
+    """
+
+    def __init__(
+        self,
+        profiles: Sequence[ModelProfile],
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.profiles: Dict[str, ModelProfile] = {p.model_id: p for p in profiles}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._served: Dict[str, List[float]] = {}
+        self._statuses: Counter = Counter()
+        self._server = _SimulatorServer((host, port), _Handler, self)
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "OpenRouterSimulator":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="openrouter-simulator",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def take_served(self) -> Dict[str, List[float]]:
+        """Seconds spent on each completion per model since the last call."""
+        with self._lock:
+            served, self._served = self._served, {}
+            return served
+
+    def status_counts(self) -> Dict[int, int]:
+        """Completion answers by HTTP status since the server started."""
+        with self._lock:
+            return dict(self._statuses)
+
+    def _draw(self, profile: ModelProfile) -> Tuple[int, float]:
+        with self._lock:
+            roll = self._random.random()
+            gauss = self._random.gauss(0.0, 1.0)
+        if roll < profile.rate_limit_rate:
+            status = 429
+        elif roll < profile.rate_limit_rate + profile.server_error_rate:
+            status = 503
+        else:
+            status = 200
+        latency = profile.latency_ms * math.exp(profile.latency_sigma * gauss) / 1000
+        return status, latency
+
+    def _record(self, model_id: str, status: int, seconds: float) -> None:
+        with self._lock:
+            self._served.setdefault(model_id, []).append(seconds)
+            self._statuses[status] += 1
+
+
+class _SimulatorServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # A scan opens up to ``concurrency`` connections at once.
+    request_queue_size = 256
+
+    def __init__(self, address, handler, simulator: OpenRouterSimulator) -> None:
+        super().__init__(address, handler)
+        self.simulator = simulator
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients closing kept-alive or early-closed streams are not errors here.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; with Nagle on, delayed ACKs
+    # would add ~40ms to every response and swamp what is being measured.
+    disable_nagle_algorithm = True
+    server: _SimulatorServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        if self.path != f"{API_PREFIX}/models":
+            self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+            return
+        data = [
+            {
+                "id": model_id,
+                "name": model_id.split("/")[-1],
+                "context_length": 8192,
+                "pricing": {"prompt": "0", "completion": "0"},
+            }
+            for model_id in self.server.simulator.profiles
+        ]
+        self._send_json(200, {"data": data})
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            request = None
+        if self.path != f"{API_PREFIX}/chat/completions" or not isinstance(request, dict):
+            self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+            return
+
+        simulator = self.server.simulator
+        model_id = request.get("model")
+        profile = simulator.profiles.get(model_id)
+        if profile is None:
+            self._send_json(
+                404, {"error": {"code": 404, "message": f"No endpoints found for {model_id}"}}
+            )
+            return
+
+        started = time.monotonic()
+        status, latency = simulator._draw(profile)
+        time.sleep(latency)
+        try:
+            if status != 200:
+                headers = {}
+                if profile.retry_after_seconds is not None:
+                    headers["Retry-After"] = f"{profile.retry_after_seconds:g}"
+                message = "Rate limit exceeded" if status == 429 else "Provider returned error"
+                self._send_json(
+                    status, {"error": {"code": status, "message": message}}, headers
+                )
+            elif request.get("stream"):
+                self._send_stream(model_id, profile)
+            else:
+                self._send_completion(model_id, profile)
+        except (BrokenPipeError, ConnectionResetError):
+            # The stream reader hangs up as soon as it saw the expected text.
+            self.close_connection = True
+        simulator._record(model_id, status, time.monotonic() - started)
+
+    def _send_json(
+        self,
+        status: int,
+        body: Mapping[str, Any],
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_completion(self, model_id: str, profile: ModelProfile) -> None:
+        payload = json.dumps(
+            {
+                "id": "gen-simulated",
+                "model": model_id,
+                "choices": [{"message": {"role": "assistant", "content": "OK"}}],
+                "usage": {"prompt_tokens": 8, "completion_tokens": 1},
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if profile.trickle_ms <= 0:
+            self.wfile.write(payload)
+            return
+        step = math.ceil(len(payload) / TRICKLE_PIECES)
+        for offset in range(0, len(payload), step):
+            if offset:
+                time.sleep(profile.trickle_ms / 1000)
+            self.wfile.write(payload[offset : offset + step])
+            self.wfile.flush()
+
+    def _send_stream(self, model_id: str, profile: ModelProfile) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        events = [": OPENROUTER PROCESSING\n\n"]
+        events += [
+            "data: "
+            + json.dumps({"model": model_id, "choices": [{"delta": {"content": token}}]})
+            + "\n\n"
+            for token in ("O", "K")
+        ]
+        events.append(
+            "data: " + json.dumps({"choices": [], "usage": {"completion_tokens": 2}}) + "\n\n"
+        )
+        events.append("data: [DONE]\n\n")
+        for index, event in enumerate(events):
+            if index and profile.trickle_ms > 0:
+                time.sleep(profile.trickle_ms / 1000)
+            chunk = event.encode("utf-8")
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
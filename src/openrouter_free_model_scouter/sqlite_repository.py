@@ -1,34 +1,32 @@
 from __future__ import annotations
 
 import sqlite3
+from contextlib import closing
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from .domain_models import HealthcheckResult
+from .migrations import upgrade_schema
+from .rollups import apply_checks
+
+
+# Status codes used by ``read_timeline_columns``; any other code from 100 up
+# is the HTTP status of a failed check.
+STATUS_MISS = 0
+STATUS_OK = 1
+STATUS_CATEGORY_BASE = 2
+
+# Rows pulled from the healthchecks cursor per fetchmany().
+DEFAULT_FETCH_SIZE = 5000
+
+# (model_id, ok, http_status, error_category, latency_ms)
+CheckRow = Tuple[Any, ...]
 
 
 class SqliteTimelineRepository:
     def _init_db(self, conn: sqlite3.Connection) -> None:
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS runs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                run_datetime TEXT NOT NULL
-            )
-        """)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS healthchecks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                run_id INTEGER NOT NULL,
-                model_id TEXT NOT NULL,
-                ok BOOLEAN NOT NULL,
-                http_status INTEGER,
-                error_category TEXT,
-                latency_ms INTEGER,
-                FOREIGN KEY(run_id) REFERENCES runs(id)
-            )
-        """)
-        conn.commit()
+        upgrade_schema(conn)
 
     def append_run(
         self,
@@ -39,11 +37,15 @@ class SqliteTimelineRepository:
     ) -> None:
         db_path.parent.mkdir(parents=True, exist_ok=True)
         dt_str = self._format_run_datetime(run_datetime)
+        run_ts = int(run_datetime.timestamp())
 
         with sqlite3.connect(db_path) as conn:
             self._init_db(conn)
             cur = conn.cursor()
-            cur.execute("INSERT INTO runs (run_datetime) VALUES (?)", (dt_str,))
+            cur.execute(
+                "INSERT INTO runs (run_datetime, run_ts) VALUES (?, ?)",
+                (dt_str, run_ts),
+            )
             run_id = cur.lastrowid
 
             insert_data = [
@@ -62,42 +64,66 @@ class SqliteTimelineRepository:
                 (run_id, model_id, ok, http_status, error_category, latency_ms)
                 VALUES (?, ?, ?, ?, ?, ?)
             """, insert_data)
+            apply_checks(
+                cur,
+                run_id,
+                run_ts,
+                [(r[1], r[2], r[3], r[5]) for r in insert_data],
+            )
             conn.commit()
 
-    def read_timeline(self, db_path: Path) -> Tuple[List[str], Dict[str, List[str]]]:
+    def iter_timeline(
+        self,
+        db_path: Path,
+        *,
+        last_n_runs: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        batch_size: int = DEFAULT_FETCH_SIZE,
+    ) -> Iterator[Tuple[str, List[CheckRow]]]:
+        """
+        Yields (run_label, checks) for every run in the window, oldest first,
+        streaming the checks through a cursor ``batch_size`` rows at a time.
+        Each check is (model_id, ok, http_status, error_category, latency_ms).
+        """
+        if not db_path.exists():
+            return
+
+        with closing(sqlite3.connect(db_path)) as conn:
+            self._init_db(conn)
+            runs = self._select_runs(conn, last_n_runs, since, until)
+            for _, run_label, checks in self._iter_run_checks(conn, runs, batch_size):
+                yield run_label, checks
+
+    def read_timeline(
+        self,
+        db_path: Path,
+        last_n_runs: Optional[int] = None,
+        *,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Tuple[List[str], Dict[str, List[str]]]:
         """
         Returns (run_labels, model_statuses) identical to the old CSV format
         so the web frontend doesn't need to change its data structure.
+        Memory is bounded by the selected window of runs, not the history.
         """
         if not db_path.exists():
             return [], {}
 
-        with sqlite3.connect(db_path) as conn:
+        with closing(sqlite3.connect(db_path)) as conn:
             self._init_db(conn)
-            cur = conn.cursor()
-            cur.execute("SELECT id, run_datetime FROM runs ORDER BY id ASC")
-            runs = cur.fetchall()
-
+            runs = self._select_runs(conn, last_n_runs, since, until)
             if not runs:
                 return [], {}
 
-            run_labels = [row[1] for row in runs]
-            run_ids = [row[0] for row in runs]
-            run_index_map = {rid: idx for idx, rid in enumerate(run_ids)}
-
-            cur.execute("SELECT run_id, model_id, ok, http_status, error_category, latency_ms FROM healthchecks")
-            checks = cur.fetchall()
-
             # Group by model_id -> List of length (len(runs)) initialized with ""
             model_statuses: Dict[str, List[str]] = {}
-            for row in checks:
-                run_id, raw_model_id, ok, http_status, error_category, latency_ms = row
-                model_id = str(raw_model_id)
-                if model_id not in model_statuses:
-                    model_statuses[model_id] = [""] * len(runs)
-                
-                idx = run_index_map.get(run_id)
-                if idx is not None:
+            for idx, _, checks in self._iter_run_checks(conn, runs):
+                for raw_model_id, ok, http_status, error_category, latency_ms in checks:
+                    model_id = str(raw_model_id)
+                    if model_id not in model_statuses:
+                        model_statuses[model_id] = [""] * len(runs)
                     model_statuses[model_id][idx] = self._format_status_value(
                         ok=bool(ok),
                         http_status=int(http_status) if http_status else None,
@@ -105,7 +131,133 @@ class SqliteTimelineRepository:
                         latency_ms=int(latency_ms) if latency_ms else None
                     )
 
-            return run_labels, model_statuses
+            return [label for _, label in runs], model_statuses
+
+    def read_timeline_columns(
+        self,
+        db_path: Path,
+        last_n_runs: Optional[int] = None,
+        *,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """
+        Same timeline as ``read_timeline`` in a compact columnar layout: run
+        labels once, then per model one small-int status code and one latency
+        per run (see ``STATUS_MISS`` and friends; latency is -1 when absent).
+        Failures without an HTTP status are coded as ``STATUS_CATEGORY_BASE``
+        plus their index in ``error_categories``.
+        """
+        empty: Dict[str, Any] = {
+            "run_labels": [],
+            "total_runs": 0,
+            "error_categories": [],
+            "model_ids": [],
+            "status_codes": [],
+            "latency_ms": [],
+        }
+        if not db_path.exists():
+            return empty
+
+        categories: Dict[str, int] = {}
+        codes: Dict[str, List[int]] = {}
+        latencies: Dict[str, List[int]] = {}
+        with closing(sqlite3.connect(db_path)) as conn:
+            self._init_db(conn)
+            runs = self._select_runs(conn, last_n_runs, since, until)
+            if not runs:
+                return empty
+            total_runs = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+            for idx, _, checks in self._iter_run_checks(conn, runs):
+                for raw_model_id, ok, http_status, error_category, latency_ms in checks:
+                    model_id = str(raw_model_id)
+                    if model_id not in codes:
+                        codes[model_id] = [STATUS_MISS] * len(runs)
+                        latencies[model_id] = [-1] * len(runs)
+
+                    if ok:
+                        code = STATUS_OK
+                        latencies[model_id][idx] = int(latency_ms) if latency_ms else -1
+                    elif http_status == 429 or error_category == "rate_limited":
+                        code = 429
+                    elif http_status:
+                        code = int(http_status)
+                    else:
+                        label = str(error_category) if error_category else "FAIL"
+                        code = STATUS_CATEGORY_BASE + categories.setdefault(label, len(categories))
+                    codes[model_id][idx] = code
+
+        model_ids = list(codes)
+        return {
+            "run_labels": [label for _, label in runs],
+            "total_runs": total_runs,
+            "error_categories": list(categories),
+            "model_ids": model_ids,
+            "status_codes": [codes[m] for m in model_ids],
+            "latency_ms": [latencies[m] for m in model_ids],
+        }
+
+    def _select_runs(
+        self,
+        conn: sqlite3.Connection,
+        last_n_runs: Optional[int],
+        since: Optional[datetime],
+        until: Optional[datetime],
+    ) -> List[Tuple[int, str]]:
+        clauses = []
+        params: List[Any] = []
+        if since is not None:
+            clauses.append("run_ts >= ?")
+            params.append(int(since.timestamp()))
+        if until is not None:
+            clauses.append("run_ts <= ?")
+            params.append(int(until.timestamp()))
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        # LIMIT -1 means no limit in SQLite.
+        params.append(last_n_runs if last_n_runs is not None else -1)
+        cur = conn.execute(
+            f"SELECT id, run_datetime FROM runs {where}ORDER BY id DESC LIMIT ?", params
+        )
+        return cur.fetchall()[::-1]
+
+    def _iter_run_checks(
+        self,
+        conn: sqlite3.Connection,
+        runs: List[Tuple[int, str]],
+        batch_size: int = DEFAULT_FETCH_SIZE,
+    ) -> Iterator[Tuple[int, str, List[CheckRow]]]:
+        # Yields (index in runs, run_label, checks) for every run, including
+        # runs without checks. Only the window's rows are read, in run order
+        # via ix_healthchecks_run_id, and never more than one batch at once.
+        if not runs:
+            return
+        cur = conn.execute(
+            "SELECT run_id, model_id, ok, http_status, error_category, latency_ms "
+            "FROM healthchecks WHERE run_id BETWEEN ? AND ? ORDER BY run_id",
+            (runs[0][0], runs[-1][0]),
+        )
+        position = {run_id: idx for idx, (run_id, _) in enumerate(runs)}
+        current: List[CheckRow] = []
+        current_idx = 0
+        while True:
+            batch = cur.fetchmany(batch_size)
+            if not batch:
+                break
+            for run_id, *check in batch:
+                idx = position.get(run_id)
+                if idx is None:
+                    # A run outside the time range but inside the id range.
+                    continue
+                while current_idx < idx:
+                    yield current_idx, runs[current_idx][1], current
+                    current = []
+                    current_idx += 1
+                current.append(tuple(check))
+        while current_idx < len(runs):
+            yield current_idx, runs[current_idx][1], current
+            current = []
+            current_idx += 1
 
     def _format_status_value(
         self, ok: bool, http_status: int | None, error_category: str | None, latency_ms: int | None
@@ -1,12 +1,24 @@
 let allModels = [];
+let statsWindow = '24h';
 
 document.addEventListener('DOMContentLoaded', () => {
     fetchSummary();
     fetchModels();
+    fetchScanProgress();
+    connectLiveFeed();
 
     // Search handler
     document.getElementById('searchInput').addEventListener('input', filterModels);
 
+    // Stats window handler
+    document.getElementById('windowSelect').addEventListener('change', (e) => {
+        statsWindow = e.target.value;
+        document.querySelectorAll('.window-label').forEach(el => {
+            el.textContent = statsWindow;
+        });
+        fetchModels();
+    });
+
     // Close modal handlers
     document.getElementById('modal-close').addEventListener('click', closeModal);
     document.getElementById('modal').addEventListener('click', (e) => {
@@ -65,9 +77,133 @@ async function fetchSummary() {
     }
 }
 
+let progressTimer = null;
+
+async function fetchScanProgress() {
+    try {
+        const res = await fetch('/api/scan/progress');
+        const data = await res.json();
+        const el = document.getElementById('scan-progress');
+
+        if (data && data.status === 'started') {
+            const total = data.total_models !== null ? data.total_models : '?';
+            el.textContent = `Scanning: ${data.checked_count}/${total} (${data.ok_count} OK)`;
+            if (!progressTimer && !liveFeedConnected) {
+                progressTimer = setInterval(() => {
+                    fetchScanProgress();
+                    fetchModels();
+                }, 5000);
+            }
+            return;
+        }
+
+        el.textContent = '';
+        if (progressTimer) {
+            // The scan just finished; pick up the final numbers once.
+            clearInterval(progressTimer);
+            progressTimer = null;
+            fetchSummary();
+            fetchModels();
+        }
+    } catch (err) {
+        console.error('Failed to fetch scan progress:', err);
+    }
+}
+
+// Live feed: while connected, scan progress and per-model status arrive as
+// deltas over SSE instead of re-polling the full tables.
+let liveFeedConnected = false;
+let liveRun = null;
+let renderPending = false;
+
+function connectLiveFeed() {
+    if (!window.EventSource) return;
+    const source = new EventSource('/api/events');
+
+    source.addEventListener('open', () => {
+        liveFeedConnected = true;
+        if (progressTimer) {
+            clearInterval(progressTimer);
+            progressTimer = null;
+        }
+    });
+    source.addEventListener('error', () => {
+        // EventSource reconnects by itself and resumes via Last-Event-ID.
+        liveFeedConnected = false;
+    });
+    source.addEventListener('run_started', (e) => {
+        const data = JSON.parse(e.data);
+        liveRun = { run_id: data.run_id, total: data.total_models, checked: 0, ok: 0 };
+        renderLiveProgress();
+    });
+    source.addEventListener('result', (e) => applyResult(JSON.parse(e.data)));
+    source.addEventListener('run_finished', () => {
+        liveRun = null;
+        document.getElementById('scan-progress').textContent = '';
+        fetchSummary();
+        fetchModels();
+    });
+    source.addEventListener('resync', () => {
+        liveRun = null;
+        fetchSummary();
+        fetchModels();
+        fetchScanProgress();
+    });
+}
+
+function statusLabel(ok, httpStatus, errorCategory) {
+    if (ok) return 'OK';
+    if (errorCategory === 'circuit_open') return 'SKIPPED';
+    if (httpStatus === 429 || errorCategory === 'rate_limited') return '429';
+    if (httpStatus) return `HTTP ${httpStatus}`;
+    return 'FAIL';
+}
+
+function renderLiveProgress() {
+    if (!liveRun) return;
+    document.getElementById('scan-progress').textContent =
+        `Scanning: ${liveRun.checked}/${liveRun.total} (${liveRun.ok} OK)`;
+}
+
+function applyResult(result) {
+    if (liveRun && liveRun.run_id === result.run_id) {
+        liveRun.checked += 1;
+        if (result.ok) liveRun.ok += 1;
+        renderLiveProgress();
+    }
+
+    let model = allModels.find(m => m.model_id === result.model_id);
+    if (!model) {
+        model = {
+            model_id: result.model_id,
+            window: statsWindow,
+            uptime_24h: result.ok ? 100 : 0,
+            avg_latency_24h: result.ok ? result.latency_ms : null,
+            p50_latency: null,
+            p90_latency: null,
+            p99_latency: null,
+            consecutive_failures: 0,
+            sparkline_data: [],
+        };
+        allModels.push(model);
+    }
+    model.latest_status = statusLabel(result.ok, result.http_status, result.error_category);
+    model.consecutive_failures = result.ok ? 0 : model.consecutive_failures + 1;
+
+    // Coalesce a burst of results into one re-render.
+    if (!renderPending) {
+        renderPending = true;
+        requestAnimationFrame(() => {
+            renderPending = false;
+            sortModels(allModels);
+            filterModels();
+        });
+    }
+}
+
 async function fetchModels() {
     try {
-        const res = await fetch('/api/models');
+        const res = await fetch(`/api/models?window=${statsWindow}`);
         const data = await res.json();
         allModels = data;
         sortModels(allModels);
@@ -114,7 +250,10 @@ function renderModels(models) {
             </td>
             <td class="px-6 py-4 whitespace-nowrap text-sm ${statusClass}">${statusIcon} <span class="text-xs font-normal text-gray-400">(${model.latest_status})</span></td>
             <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-500 dark:text-gray-300">${model.uptime_24h.toFixed(1)}%</td>
-            <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-500 dark:text-gray-300">${model.avg_latency_24h ? Math.round(model.avg_latency_24h) + ' ms' : '-'}</td>
+            <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-500 dark:text-gray-300">
+                ${model.avg_latency_24h ? Math.round(model.avg_latency_24h) + ' ms' : '-'}
+                ${formatPercentiles(model)}
+            </td>
             <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-500 dark:text-gray-300">${createSparkline(model.sparkline_data)}</td>
             <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-500 dark:text-gray-300">${model.consecutive_failures}</td>
             <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-500 dark:text-gray-300">
@@ -126,6 +265,13 @@ function renderModels(models) {
 }
 
 let chartInstance = null;
+const HISTORY_POINTS = 300;
+const WINDOW_MS = {
+    '1h': 60 * 60 * 1000,
+    '24h': 24 * 60 * 60 * 1000,
+    '7d': 7 * 24 * 60 * 60 * 1000,
+    '30d': 30 * 24 * 60 * 60 * 1000,
+};
 
 // Expose to window for onclick handler
 window.openHistory = async function(modelId) {
@@ -148,9 +294,18 @@ window.openHistory = async function(modelId) {
         // If modelId is "google/gemma", URL becomes "/api/models/google/gemma/history"
         // This is valid path for our router.
 
-        const res = await fetch(`/api/models/${modelId}/history`);
+        // The selected window, downsampled on the server to chart size.
+        const since = new Date(Date.now() - WINDOW_MS[statsWindow]).toISOString();
+        const params = new URLSearchParams({ since, points: HISTORY_POINTS, method: 'lttb' });
+        let res = await fetch(`/api/models/${modelId}/history?${params}`);
         if (!res.ok) throw new Error('Failed to fetch history');
-        const history = await res.json();
+        let history = await res.json();
+        if (history.length === 0) {
+            // Nothing scanned lately; fall back to the most recent checks.
+            res = await fetch(`/api/models/${modelId}/history`);
+            if (!res.ok) throw new Error('Failed to fetch history');
+            history = await res.json();
+        }
 
         renderChart(history);
     } catch (err) {
@@ -263,6 +418,14 @@ function closeModal() {
     }
 }
 
+function formatPercentiles(model) {
+    if (model.p50_latency === null || model.p50_latency === undefined) {
+        return '';
+    }
+    const fmt = (value) => Math.round(value);
+    return `<div class="text-xs text-gray-400" title="p50 / p90 / p99">p50 ${fmt(model.p50_latency)} · p90 ${fmt(model.p90_latency)} · p99 ${fmt(model.p99_latency)}</div>`;
+}
+
 function createSparkline(data) {
     if (!data || data.length === 0) return '-';
     const width = 100;
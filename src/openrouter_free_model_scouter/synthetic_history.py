@@ -0,0 +1,212 @@
+"""Fill a SQLite file with realistic, reproducible scan history.
+
+Every model follows one behaviour for the whole history: ``stable`` models
+almost always answer, ``flaky`` ones fail one probe in five, ``flapping``
+ones alternate between up and down periods, ``outages`` ones are healthy
+apart from recurring multi-hour outages and ``dead`` ones stop answering
+for good partway through. Some models join the catalog late and some leave
+it early. Rows are written with the same rollups a real scan keeps, so the
+dashboard queries see what they would see in production.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from .database import create_sqlite_engine, init_db
+from .models import RUN_DATETIME_FORMAT, RUN_FINISHED
+from .rollups import RunChecks, apply_runs
+
+DEFAULT_RUN_INTERVAL_SECONDS = 15 * 60
+# Share of the catalog showing each behaviour.
+BEHAVIOURS: Sequence[Tuple[str, float]] = (
+    ("stable", 0.5),
+    ("flaky", 0.2),
+    ("flapping", 0.15),
+    ("outages", 0.1),
+    ("dead", 0.05),
+)
+# Share of models that join the catalog late, and that leave it early.
+LATE_JOIN_SHARE = 0.1
+EARLY_LEAVE_SHARE = 0.1
+# Runs written, and rolled up, per transaction.
+COMMIT_EVERY_RUNS = 500
+
+ProgressCallback = Callable[[int, int], None]
+
+
+@dataclass(frozen=True)
+class GeneratedHistory:
+    models: int
+    runs: int
+    rows: int
+
+
+@dataclass(frozen=True)
+class _ModelPlan:
+    model_id: str
+    behaviour: str
+    first_run: int
+    last_run: int
+    median_latency_ms: float
+    # Flapping: runs per up or down phase. Outages: runs between outage starts.
+    period: int
+    # Outages: runs each outage lasts. Dead: the run it dies at.
+    length: int
+    offset: int
+
+
+def generate_history(
+    path: Path,
+    *,
+    models: int = 300,
+    runs: int = 50000,
+    run_interval_seconds: int = DEFAULT_RUN_INTERVAL_SECONDS,
+    end_ts: Optional[int] = None,
+    seed: int = 0,
+    progress: Optional[ProgressCallback] = None,
+) -> GeneratedHistory:
+    """Write ``runs`` finished runs over ``models`` models into a new DB at ``path``.
+
+    The last run is at ``end_ts`` (default: now) and earlier ones are
+    ``run_interval_seconds`` apart. ``progress`` is called with the runs
+    written so far and the total after every commit.
+    """
+    path = Path(path)
+    if path.exists():
+        raise FileExistsError(f"{path} already exists")
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    engine = create_sqlite_engine(f"sqlite:///{path}")
+    try:
+        init_db(engine)
+    finally:
+        engine.dispose()
+
+    rng = random.Random(seed)
+    plans = [_plan_model(rng, index, runs) for index in range(models)]
+    end_ts = int(time.time()) if end_ts is None else end_ts
+    first_ts = end_ts - (runs - 1) * run_interval_seconds
+
+    rows = 0
+    pending: List[RunChecks] = []
+    conn = sqlite3.connect(path)
+    try:
+        # Throwaway data: nothing is lost by skipping fsyncs while filling.
+        conn.execute("PRAGMA synchronous=OFF")
+        cursor = conn.cursor()
+        for run_index in range(runs):
+            run_id = run_index + 1
+            run_ts = first_ts + run_index * run_interval_seconds
+            run_datetime = time.strftime(RUN_DATETIME_FORMAT, time.localtime(run_ts))
+            checks = [
+                _check(rng, plan, run_index)
+                for plan in plans
+                if plan.first_run <= run_index <= plan.last_run
+            ]
+            cursor.execute(
+                "INSERT INTO runs (id, run_datetime, run_ts, status, finished_at, total_models) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, run_datetime, run_ts, RUN_FINISHED, run_datetime, len(checks)),
+            )
+            cursor.executemany(
+                "INSERT INTO healthchecks "
+                "(run_id, model_id, ok, http_status, error_category, latency_ms) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, *check) for check in checks],
+            )
+            pending.append(
+                (
+                    run_id,
+                    run_ts,
+                    [(model_id, ok, status, latency) for model_id, ok, status, _, latency in checks],
+                )
+            )
+            rows += len(checks)
+            if run_id % COMMIT_EVERY_RUNS == 0 or run_id == runs:
+                apply_runs(cursor, pending)
+                pending = []
+                conn.commit()
+                if progress is not None:
+                    progress(run_id, runs)
+    finally:
+        conn.close()
+    return GeneratedHistory(models=models, runs=runs, rows=rows)
+
+
+def _plan_model(rng: random.Random, index: int, runs: int) -> _ModelPlan:
+    roll = rng.random()
+    behaviour = BEHAVIOURS[-1][0]
+    for name, share in BEHAVIOURS:
+        if roll < share:
+            behaviour = name
+            break
+        roll -= share
+
+    first_run, last_run = 0, runs - 1
+    if rng.random() < LATE_JOIN_SHARE:
+        first_run = rng.randrange(runs)
+    if rng.random() < EARLY_LEAVE_SHARE:
+        last_run = rng.randrange(first_run, runs)
+
+    period = length = offset = 0
+    if behaviour == "flapping":
+        # Up and down for one to twelve hours at a time.
+        period = rng.randint(4, 48)
+        offset = rng.randrange(period)
+    elif behaviour == "outages":
+        # A two- to twenty-hour outage every two to twenty days.
+        period = rng.randint(200, 2000)
+        length = rng.randint(8, 80)
+        offset = rng.randrange(period)
+    elif behaviour == "dead":
+        length = rng.randint(first_run, last_run)
+
+    return _ModelPlan(
+        model_id=f"vendor-{index % 25:02d}/model-{index:04d}:free",
+        behaviour=behaviour,
+        first_run=first_run,
+        last_run=last_run,
+        median_latency_ms=rng.uniform(300, 4000),
+        period=period,
+        length=length,
+        offset=offset,
+    )
+
+
+def _check(
+    rng: random.Random, plan: _ModelPlan, run_index: int
+) -> Tuple[str, bool, Optional[int], Optional[str], Optional[int]]:
+    """(model_id, ok, http_status, error_category, latency_ms) of one probe."""
+    behaviour = plan.behaviour
+    if behaviour == "stable":
+        ok = rng.random() < 0.99
+    elif behaviour == "flaky":
+        ok = rng.random() < 0.8
+    elif behaviour == "flapping":
+        up = ((run_index + plan.offset) // plan.period) % 2 == 0
+        ok = rng.random() < (0.97 if up else 0.03)
+    elif behaviour == "outages":
+        ok = (run_index + plan.offset) % plan.period >= plan.length and rng.random() < 0.97
+    elif run_index >= plan.length:
+        return plan.model_id, False, 404, "client_error", int(rng.uniform(80, 300))
+    else:
+        ok = rng.random() < 0.95
+
+    latency_ms = int(plan.median_latency_ms * math.exp(rng.gauss(0.0, 0.4)))
+    if ok:
+        return plan.model_id, True, 200, None, latency_ms
+
+    roll = rng.random()
+    if roll < 0.5:
+        return plan.model_id, False, 429, "rate_limited", int(rng.uniform(80, 400))
+    if roll < 0.85:
+        return plan.model_id, False, rng.choice((500, 502, 503)), "server_error", latency_ms
+    return plan.model_id, False, None, "network", None
+
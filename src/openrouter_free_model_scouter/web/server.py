@@ -1,20 +1,32 @@
 from __future__ import annotations
 
+import importlib.util
 import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from fastapi import BackgroundTasks, FastAPI, Request
+from fastapi import BackgroundTasks, FastAPI, Query, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from ..sqlite_repository import SqliteTimelineRepository
+from ..sqlite_repository import (
+    STATUS_CATEGORY_BASE,
+    STATUS_MISS,
+    STATUS_OK,
+    SqliteTimelineRepository,
+)
 
 _HERE = Path(__file__).parent
 
+STATUS_LAYOUTS = ("rows", "columnar")
+STATUS_ENCODINGS = ("json", "msgpack")
+
 app = FastAPI(title="OpenRouter Free Model Scouter")
+# Timelines compress very well; clients sending Accept-Encoding: gzip get it.
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 templates = Jinja2Templates(directory=str(_HERE / "templates"))
 
 # Mount static files
@@ -26,6 +38,10 @@ app.mount("/static", StaticFiles(directory=str(_static_dir)), name="static")
 _scan_state: Dict[str, Any] = {"running": False, "last_run": None, "error": None}
 
 
+def msgpack_available() -> bool:
+    return importlib.util.find_spec("msgpack") is not None
+
+
 def _get_db_path() -> Path:
     import os
     return Path(os.environ.get("OPENROUTER_SCOUT_DB_PATH", "results/scouter.db"))
@@ -37,32 +53,71 @@ async def index(request: Request):
 
 
 @app.get("/api/status")
-async def api_status():
-    db_path = _get_db_path()
-    if not db_path.exists():
-        return JSONResponse({"run_labels": [], "models": [], "scan_state": _scan_state})
+async def api_status(
+    layout: str = Query("rows", alias="format"),
+    last_n_runs: Optional[int] = Query(None, ge=1),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    encoding: str = "json",
+):
+    if layout not in STATUS_LAYOUTS:
+        return JSONResponse(
+            {"error": f"format must be one of: {', '.join(STATUS_LAYOUTS)}"},
+            status_code=400,
+        )
+    if encoding not in STATUS_ENCODINGS:
+        return JSONResponse(
+            {"error": f"encoding must be one of: {', '.join(STATUS_ENCODINGS)}"},
+            status_code=400,
+        )
+    if encoding == "msgpack" and not msgpack_available():
+        return JSONResponse(
+            {"error": "msgpack encoding needs the optional msgpack package"},
+            status_code=400,
+        )
 
+    db_path = _get_db_path()
+    repo = SqliteTimelineRepository()
     try:
-        repo = SqliteTimelineRepository()
-        run_labels, model_statuses = repo.read_timeline(db_path)
+        window = {"since": since, "until": until}
+        if layout == "columnar":
+            payload = _columnar_status(
+                repo.read_timeline_columns(db_path, last_n_runs, **window)
+            )
+        else:
+            payload = _row_status(*repo.read_timeline(db_path, last_n_runs, **window))
     except Exception as exc:
         return JSONResponse({"error": str(exc), "scan_state": _scan_state}, status_code=500)
 
+    payload["scan_state"] = _scan_state
+    if encoding == "msgpack":
+        import msgpack
+
+        return Response(msgpack.packb(payload), media_type="application/msgpack")
+    return JSONResponse(payload)
+
+
+def _normalize_status(status: str) -> str:
+    if not status:
+        return "MISS"
+    if status.startswith("OK"):
+        return "OK"
+    if status == "429":
+        return "429"
+    return "FAIL"
+
+
+def _status_sort_key(latest: str, ok_rate: float, model_id: str):
+    # First by latest status (OK first), then by ok_rate
+    status_order = {"OK": 0, "429": 1, "MISS": 2}.get(latest, 1)
+    return (status_order, -ok_rate, model_id)
+
+
+def _row_status(run_labels: List[str], model_statuses: Dict[str, List[str]]) -> Dict[str, Any]:
     # Build a list of model objects with their statuses
     models: List[Dict[str, Any]] = []
     for model_id, statuses in model_statuses.items():
-        # normalize
-        normalized = []
-        for s in statuses:
-            if not s:
-                normalized.append("MISS")
-            elif s.startswith("OK"):
-                normalized.append("OK")
-            elif s == "429":
-                normalized.append("429")
-            else:
-                normalized.append("FAIL")
-
+        normalized = [_normalize_status(s) for s in statuses]
         ok_count = normalized.count("OK")
         total = len(normalized)
         models.append({
@@ -73,19 +128,53 @@ async def api_status():
             "latest": statuses[-1] if statuses else "",
         })
 
-    # Sort: first by latest status (OK first), then by ok_rate
-    def sort_key(m):
-        latest = m["normalized"][-1] if m["normalized"] else ""
-        status_order = {"OK": 0, "429": 1, "MISS": 2}.get(latest, 1)
-        return (status_order, -m["ok_rate"], m["model_id"])
-
-    models.sort(key=sort_key)
-
-    return JSONResponse({
-        "run_labels": run_labels,
-        "models": models,
-        "scan_state": _scan_state,
-    })
+    models.sort(
+        key=lambda m: _status_sort_key(
+            m["normalized"][-1] if m["normalized"] else "", m["ok_rate"], m["model_id"]
+        )
+    )
+    return {"run_labels": run_labels, "models": models}
+
+
+def _code_to_normalized(code: int) -> str:
+    if code == STATUS_MISS:
+        return "MISS"
+    if code == STATUS_OK:
+        return "OK"
+    if code == 429:
+        return "429"
+    return "FAIL"
+
+
+def _columnar_status(columns: Dict[str, Any]) -> Dict[str, Any]:
+    ok_rates = [
+        round(codes.count(STATUS_OK) / len(codes), 3) if codes else 0
+        for codes in columns["status_codes"]
+    ]
+    order = sorted(
+        range(len(columns["model_ids"])),
+        key=lambda i: _status_sort_key(
+            _code_to_normalized(columns["status_codes"][i][-1]),
+            ok_rates[i],
+            columns["model_ids"][i],
+        ),
+    )
+    return {
+        "format": "columnar",
+        "status_legend": {
+            "miss": STATUS_MISS,
+            "ok": STATUS_OK,
+            "category_base": STATUS_CATEGORY_BASE,
+            "http_status_from": 100,
+        },
+        "run_labels": columns["run_labels"],
+        "total_runs": columns["total_runs"],
+        "error_categories": columns["error_categories"],
+        "model_ids": [columns["model_ids"][i] for i in order],
+        "ok_rate": [ok_rates[i] for i in order],
+        "status_codes": [columns["status_codes"][i] for i in order],
+        "latency_ms": [columns["latency_ms"][i] for i in order],
+    }
 
 
 @app.post("/api/scan")
@@ -111,7 +200,8 @@ def _run_scan_task():
         from ..healthcheck_service import HealthcheckService
         from ..http_client import HttpClient
         from ..model_catalog_service import ModelCatalogService
-        from ..openrouter_client import OpenRouterClient, OpenRouterClientConfig
+        from ..openrouter_client import OpenRouterClient, build_client_config
+        from ..rate_limiter import build_rate_limiter
 
         project_root = Path.cwd()
         dotenv_path = project_root / ".env"
@@ -123,31 +213,38 @@ def _run_scan_task():
             _scan_state["error"] = "OPENROUTER_API_KEY not set"
             return
 
-        http_client = HttpClient()
+        http_client = HttpClient(
+            pool_size=config.effective_pool_size, http2=config.http2
+        )
         openrouter_client = OpenRouterClient(
             http_client=http_client,
-            config=OpenRouterClientConfig(
-                api_key=config.api_key,
-                base_url=config.base_url,
-                http_referer=config.http_referer,
-                x_title=config.x_title,
-            ),
+            config=build_client_config(config),
         )
 
-        catalog_service = ModelCatalogService(openrouter_client=openrouter_client)
-        models = catalog_service.get_free_models(timeout_seconds=config.timeout_seconds)
-        if config.max_models is not None:
-            models = models[: config.max_models]
-
-        healthcheck_service = HealthcheckService(openrouter_client=openrouter_client)
-        results = healthcheck_service.check_models(
-            models,
-            prompt=config.prompt,
-            timeout_seconds=config.timeout_seconds,
-            max_retries=config.max_retries,
-            concurrency=config.concurrency,
-            request_delay_seconds=config.request_delay_seconds,
-        )
+        try:
+            catalog_service = ModelCatalogService(openrouter_client=openrouter_client)
+            models = catalog_service.get_free_models(
+                timeout_seconds=config.timeout_seconds
+            )
+            if config.max_models is not None:
+                models = models[: config.max_models]
+
+            healthcheck_service = HealthcheckService(
+                openrouter_client=openrouter_client
+            )
+            results = healthcheck_service.check_models(
+                models,
+                prompt=config.prompt,
+                timeout_seconds=config.timeout_seconds,
+                max_retries=config.max_retries,
+                concurrency=config.concurrency,
+                rate_limiter=build_rate_limiter(config),
+                max_retry_after_seconds=config.max_retry_after_seconds,
+                probe_mode=config.probe_mode,
+                expected_text=config.expected_text,
+            )
+        finally:
+            http_client.close()
 
         repo = SqliteTimelineRepository()
         repo.append_run(config.db_path, run_datetime=datetime.now(), results=results)
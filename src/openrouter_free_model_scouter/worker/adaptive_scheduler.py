@@ -0,0 +1,226 @@
+"""Per-model probe scheduling driven by each model's recent stability.
+
+Instead of re-probing the whole catalog every ``interval_hours``, the
+adaptive scheduler is ticked every few minutes and picks the models whose
+probe is due:
+
+* models without any check yet are due right away;
+* failing models are re-probed after ``min_interval``, backing off towards
+  the base interval while the failure streak grows;
+* a model that just recovered, or whose last 24 hours mix passes and
+  failures (flapping), stays on the base interval at most;
+* a steady success streak doubles the interval every ``STREAK_STEP``
+  passes, up to ``max_interval``.
+
+Every tick also respects a per-model and a global request budget for the
+last hour, counted from the stored checks, so restarts don't reset it.
+Models whose circuit breaker is open wait for their cool-down instead.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..circuit_breaker import CIRCUIT_OPEN, CIRCUIT_OPEN_CATEGORY
+from ..config import AppConfig
+from ..domain_models import ModelInfo
+from ..models import CircuitBreakerState, HealthCheck, HourlyRollup, ModelStatus, Run
+from ..rollups import DAY_SECONDS, HOUR_SECONDS, bucket_start
+
+# Passes after a failure before a model counts as stable again.
+RECOVERY_CHECKS = 3
+# Further passes that double a stable model's interval.
+STREAK_STEP = 6
+# Streaks can run into the thousands (skipped circuits, backfilled history);
+# past this many doublings every interval is capped anyway, and a float
+# raised any further overflows.
+MAX_DOUBLINGS = 32
+# The dashboard lists models checked within the last day, so no model may
+# wait longer than that between probes.
+MAX_INTERVAL_CAP_SECONDS = DAY_SECONDS
+
+
+@dataclass(frozen=True)
+class SchedulePolicy:
+    base_interval_seconds: float
+    min_interval_seconds: float
+    max_interval_seconds: float
+    # 0 means no limit.
+    model_probes_per_hour: int = 0
+    request_budget_per_hour: int = 0
+
+    @classmethod
+    def from_config(cls, config: AppConfig) -> "SchedulePolicy":
+        base = config.interval_hours * HOUR_SECONDS
+        maximum = min(
+            max(config.max_probe_interval_hours * HOUR_SECONDS, base),
+            MAX_INTERVAL_CAP_SECONDS,
+        )
+        return cls(
+            base_interval_seconds=min(base, maximum),
+            min_interval_seconds=min(config.min_probe_interval_minutes * 60, base),
+            max_interval_seconds=maximum,
+            model_probes_per_hour=config.model_probes_per_hour,
+            request_budget_per_hour=config.request_budget_per_hour,
+        )
+
+
+@dataclass(frozen=True)
+class ModelHealth:
+    last_probe_ts: int
+    last_ok: bool
+    consecutive_failures: int
+    consecutive_successes: int
+    flapping: bool = False
+
+
+def probe_interval(health: Optional[ModelHealth], policy: SchedulePolicy) -> float:
+    """Seconds to wait after a model's last probe before probing it again."""
+    if health is None:
+        return 0.0
+
+    if not health.last_ok:
+        doublings = min(max(health.consecutive_failures - 1, 0), MAX_DOUBLINGS)
+        backoff = policy.min_interval_seconds * 2**doublings
+        return min(backoff, policy.base_interval_seconds)
+
+    if health.consecutive_successes < RECOVERY_CHECKS:
+        return policy.min_interval_seconds
+    if health.flapping:
+        return policy.base_interval_seconds
+
+    doublings = min(
+        (health.consecutive_successes - RECOVERY_CHECKS) // STREAK_STEP, MAX_DOUBLINGS
+    )
+    return min(policy.base_interval_seconds * 2**doublings, policy.max_interval_seconds)
+
+
+def plan_probes(
+    model_ids: List[str],
+    health: Dict[str, ModelHealth],
+    usage: Dict[str, int],
+    policy: SchedulePolicy,
+    now_ts: float,
+) -> List[str]:
+    """Due models, most urgent first, cut down to the hourly budgets.
+
+    ``usage`` is the number of probes per model in the last hour. New models
+    come first, then the ones furthest past their due time relative to
+    their interval, so a tight budget still reaches the unstable ones.
+    """
+    due = []
+    for model_id in model_ids:
+        model_health = health.get(model_id)
+        if model_health is None:
+            due.append((float("inf"), model_id))
+            continue
+
+        interval = probe_interval(model_health, policy)
+        overdue = now_ts - (model_health.last_probe_ts + interval)
+        if overdue < 0:
+            continue
+        if (
+            policy.model_probes_per_hour
+            and usage.get(model_id, 0) >= policy.model_probes_per_hour
+        ):
+            continue
+        due.append((overdue / max(interval, 1.0), model_id))
+
+    due.sort(key=lambda item: item[0], reverse=True)
+    planned = [model_id for _, model_id in due]
+
+    if policy.request_budget_per_hour:
+        remaining = max(policy.request_budget_per_hour - sum(usage.values()), 0)
+        planned = planned[:remaining]
+    return planned
+
+
+class AdaptiveScheduler:
+    def __init__(self, db: Session, policy: SchedulePolicy):
+        self.db = db
+        self.policy = policy
+
+    def select(
+        self, models: List[ModelInfo], now_ts: Optional[float] = None
+    ) -> List[ModelInfo]:
+        """The catalog models to probe on this tick, most urgent first."""
+        now_ts = time.time() if now_ts is None else now_ts
+        cooling = self.load_open_circuits(now_ts)
+        by_id = {
+            model.model_id: model for model in models if model.model_id not in cooling
+        }
+        planned = plan_probes(
+            list(by_id),
+            self.load_health(list(by_id), now_ts),
+            self.load_usage(now_ts),
+            self.policy,
+            now_ts,
+        )
+        return [by_id[model_id] for model_id in planned]
+
+    def load_health(self, model_ids: List[str], now_ts: float) -> Dict[str, ModelHealth]:
+        if not model_ids:
+            return {}
+
+        # Flapping: both passes and failures in the hourly rollups of the
+        # last 24 hours.
+        since = bucket_start(int(now_ts), HOUR_SECONDS) - DAY_SECONDS
+        flapping = {
+            model_id
+            for model_id, check_count, ok_count in self.db.query(
+                HourlyRollup.model_id,
+                func.sum(HourlyRollup.check_count),
+                func.sum(HourlyRollup.ok_count),
+            )
+            .filter(HourlyRollup.bucket_ts >= since)
+            .filter(HourlyRollup.model_id.in_(model_ids))
+            .group_by(HourlyRollup.model_id)
+            if 0 < ok_count < check_count
+        }
+
+        health = {}
+        for status in self.db.query(ModelStatus).filter(ModelStatus.model_id.in_(model_ids)):
+            health[status.model_id] = ModelHealth(
+                last_probe_ts=status.last_run_ts or 0,
+                last_ok=status.last_ok,
+                consecutive_failures=status.consecutive_failures,
+                consecutive_successes=status.consecutive_successes or 0,
+                flapping=status.model_id in flapping,
+            )
+        return health
+
+    def load_open_circuits(self, now_ts: float) -> Set[str]:
+        # Models whose circuit is still cooling down; a scan would only skip them.
+        return {
+            model_id
+            for (model_id,) in self.db.query(CircuitBreakerState.model_id)
+            .filter(CircuitBreakerState.state == CIRCUIT_OPEN)
+            .filter(CircuitBreakerState.next_probe_ts > now_ts)
+        }
+
+    def load_usage(self, now_ts: float) -> Dict[str, int]:
+        # Runs are created in time order, so the last hour is a run id range
+        # and the count stays on ix_healthchecks_run_id.
+        first_run_id = (
+            self.db.query(func.min(Run.id))
+            .filter(Run.run_ts >= int(now_ts) - HOUR_SECONDS)
+            .scalar()
+        )
+        if first_run_id is None:
+            return {}
+        return dict(
+            self.db.query(HealthCheck.model_id, func.count(HealthCheck.id))
+            .filter(HealthCheck.run_id >= first_run_id)
+            # Checks skipped by an open circuit sent no request.
+            .filter(
+                (HealthCheck.error_category.is_(None))
+                | (HealthCheck.error_category != CIRCUIT_OPEN_CATEGORY)
+            )
+            .group_by(HealthCheck.model_id)
+            .all()
+        )
@@ -0,0 +1,211 @@
+"""Database-backed queue of per-model probe jobs.
+
+A coordinator records a run and one ``probe_jobs`` row per model instead of
+probing the models itself. Any number of worker processes, on this host or
+any other that reaches the same database, lease a few jobs at a time, probe
+them and write each result back. A lease expires after ``lease_seconds``;
+a job whose worker died is simply leased again by the next worker that asks,
+up to ``MAX_LEASES`` times. The last completed job finishes its run.
+
+Every state change is a single conditional UPDATE, so leases stay exclusive
+with SQLite's one-writer-at-a-time locking and no extra coordination.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, List, Optional, Set
+from uuid import uuid4
+
+from sqlalchemy import exists, insert, or_
+from sqlalchemy.orm import Session
+
+from ..domain_models import HealthcheckResult
+from ..models import (
+    JOB_ABANDONED,
+    JOB_DONE,
+    JOB_LEASED,
+    JOB_PENDING,
+    RUN_DATETIME_FORMAT,
+    RUN_FINISHED,
+    RUN_STARTED,
+    HealthCheck,
+    ProbeJob,
+    Run,
+)
+from ..rollups import apply_checks
+from .result_writer import result_to_row
+
+DEFAULT_LEASE_SECONDS = 300.0
+# A job whose lease expired this many times is given up on, so a model that
+# crashes every worker cannot hold its run open forever.
+MAX_LEASES = 3
+
+OPEN_JOB_STATUSES = (JOB_PENDING, JOB_LEASED)
+
+
+@dataclass(frozen=True)
+class LeasedJob:
+    job_id: int
+    run_id: int
+    run_ts: Optional[int]
+    model_id: str
+    lease_token: str
+
+
+class ProbeJobQueue:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(self, run_id: int, model_ids: Iterable[str]) -> int:
+        rows = [
+            {"run_id": run_id, "model_id": model_id, "status": JOB_PENDING, "leases": 0}
+            for model_id in model_ids
+        ]
+        if rows:
+            self.db.execute(insert(ProbeJob.__table__), rows)
+        self.db.commit()
+        return len(rows)
+
+    def open_model_ids(self) -> Set[str]:
+        """Models with a job still waiting for, or held by, a worker."""
+        return {
+            model_id
+            for (model_id,) in self.db.query(ProbeJob.model_id)
+            .filter(ProbeJob.status.in_(OPEN_JOB_STATUSES))
+            .distinct()
+        }
+
+    def has_open_jobs(self) -> bool:
+        return self.db.query(
+            exists().where(ProbeJob.status.in_(OPEN_JOB_STATUSES))
+        ).scalar()
+
+    def lease(
+        self,
+        worker_id: str,
+        *,
+        limit: int,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        now_ts: Optional[float] = None,
+    ) -> List[LeasedJob]:
+        """Hand up to ``limit`` pending or expired jobs to ``worker_id``."""
+        now_ts = time.time() if now_ts is None else now_ts
+        self._abandon_exhausted(now_ts)
+
+        token = uuid4().hex
+        leasable = (
+            self.db.query(ProbeJob.id)
+            .filter(
+                or_(
+                    ProbeJob.status == JOB_PENDING,
+                    (ProbeJob.status == JOB_LEASED)
+                    & (ProbeJob.lease_expires_ts < now_ts),
+                )
+            )
+            .order_by(ProbeJob.id)
+            .limit(max(1, limit))
+            .scalar_subquery()
+        )
+        self.db.query(ProbeJob).filter(ProbeJob.id.in_(leasable)).update(
+            {
+                ProbeJob.status: JOB_LEASED,
+                ProbeJob.worker_id: worker_id,
+                ProbeJob.lease_token: token,
+                ProbeJob.lease_expires_ts: now_ts + lease_seconds,
+                ProbeJob.leases: ProbeJob.leases + 1,
+            },
+            synchronize_session=False,
+        )
+        self.db.commit()
+
+        return [
+            LeasedJob(
+                job_id=job_id,
+                run_id=run_id,
+                run_ts=run_ts,
+                model_id=model_id,
+                lease_token=token,
+            )
+            for job_id, run_id, run_ts, model_id in self.db.query(
+                ProbeJob.id, ProbeJob.run_id, Run.run_ts, ProbeJob.model_id
+            )
+            .join(Run, Run.id == ProbeJob.run_id)
+            .filter(ProbeJob.lease_token == token)
+            .order_by(ProbeJob.id)
+        ]
+
+    def complete(
+        self,
+        job: LeasedJob,
+        result: HealthcheckResult,
+        now_ts: Optional[float] = None,
+    ) -> bool:
+        """Record ``result`` for a job; False when its lease was taken over."""
+        now_ts = time.time() if now_ts is None else now_ts
+        updated = (
+            self.db.query(ProbeJob)
+            .filter(ProbeJob.id == job.job_id)
+            .filter(ProbeJob.lease_token == job.lease_token)
+            .filter(ProbeJob.status == JOB_LEASED)
+            .update(
+                {ProbeJob.status: JOB_DONE, ProbeJob.finished_ts: now_ts},
+                synchronize_session=False,
+            )
+        )
+        if not updated:
+            self.db.rollback()
+            return False
+
+        # The result, its rollups and the job's state commit together.
+        self.db.execute(insert(HealthCheck.__table__), [result_to_row(job.run_id, result)])
+        if job.run_ts is not None:
+            cursor = self.db.connection().connection.cursor()
+            try:
+                apply_checks(
+                    cursor,
+                    job.run_id,
+                    job.run_ts,
+                    [(result.model_id, result.ok, result.http_status, result.latency_ms)],
+                )
+            finally:
+                cursor.close()
+        self._finish_runs([job.run_id])
+        self.db.commit()
+        return True
+
+    def _abandon_exhausted(self, now_ts: float) -> None:
+        exhausted = (
+            (ProbeJob.status == JOB_LEASED)
+            & (ProbeJob.lease_expires_ts < now_ts)
+            & (ProbeJob.leases >= MAX_LEASES)
+        )
+        run_ids = [
+            run_id
+            for (run_id,) in self.db.query(ProbeJob.run_id).filter(exhausted).distinct()
+        ]
+        if not run_ids:
+            return
+        self.db.query(ProbeJob).filter(exhausted).update(
+            {ProbeJob.status: JOB_ABANDONED, ProbeJob.finished_ts: now_ts},
+            synchronize_session=False,
+        )
+        self._finish_runs(run_ids)
+        self.db.commit()
+
+    def _finish_runs(self, run_ids: List[int]) -> None:
+        # A queued run is finished once none of its jobs is open any more.
+        open_jobs = exists().where(
+            (ProbeJob.run_id == Run.id) & ProbeJob.status.in_(OPEN_JOB_STATUSES)
+        )
+        self.db.query(Run).filter(Run.id.in_(run_ids)).filter(
+            Run.status == RUN_STARTED
+        ).filter(~open_jobs).update(
+            {
+                Run.status: RUN_FINISHED,
+                Run.finished_at: datetime.now().strftime(RUN_DATETIME_FORMAT),
+            },
+            synchronize_session=False,
+        )
@@ -0,0 +1,106 @@
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from ..domain_models import HealthcheckResult
+from ..models import HealthCheck, Run
+from ..rollups import apply_checks
+
+
+class BatchedResultWriter:
+    """Persists healthcheck results for one run while the scan is still going.
+
+    Results are buffered and written in small transactions, either every
+    ``batch_size`` results or once ``flush_interval_seconds`` has passed since
+    the last write, so a killed scan keeps everything flushed so far and the
+    dashboard can show the run as it progresses.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        run_id: int,
+        *,
+        run_ts: Optional[int] = None,
+        batch_size: int = 20,
+        flush_interval_seconds: float = 1.0,
+    ) -> None:
+        self.db = db
+        self.run_id = run_id
+        if run_ts is None:
+            run_ts = db.query(Run.run_ts).filter(Run.id == run_id).scalar()
+        self.run_ts = run_ts
+        self._batch_size = max(1, batch_size)
+        self._flush_interval_seconds = flush_interval_seconds
+        self._pending: List[HealthcheckResult] = []
+        self._written: Set[str] = set()
+        self._last_flush_at = time.monotonic()
+
+    @property
+    def written_count(self) -> int:
+        return len(self._written)
+
+    def add(self, result: HealthcheckResult) -> None:
+        if not self._accept(result):
+            return
+
+        due = time.monotonic() - self._last_flush_at >= self._flush_interval_seconds
+        if len(self._pending) >= self._batch_size or due:
+            self.flush()
+
+    def add_all(self, results: Iterable[HealthcheckResult]) -> None:
+        """Write every result not streamed in yet, in a single transaction."""
+        for result in results:
+            self._accept(result)
+        self.flush()
+
+    def _accept(self, result: HealthcheckResult) -> bool:
+        # Models already handed over are skipped, so the final result list
+        # can be passed as a catch-all without duplicating rows.
+        if result.model_id in self._written:
+            return False
+        self._written.add(result.model_id)
+        self._pending.append(result)
+        return True
+
+    def flush(self) -> None:
+        self._last_flush_at = time.monotonic()
+        if not self._pending:
+            return
+
+        # One Core executemany per batch; building ORM objects per row costs
+        # more than the insert itself on long scans.
+        self.db.execute(
+            insert(HealthCheck.__table__),
+            [result_to_row(self.run_id, r) for r in self._pending],
+        )
+        if self.run_ts is not None:
+            cursor = self.db.connection().connection.cursor()
+            try:
+                apply_checks(
+                    cursor,
+                    self.run_id,
+                    self.run_ts,
+                    [(r.model_id, r.ok, r.http_status, r.latency_ms) for r in self._pending],
+                )
+            finally:
+                cursor.close()
+        self.db.commit()
+        self._pending = []
+
+
+def result_to_row(run_id: int, result: HealthcheckResult) -> Dict[str, Any]:
+    return {
+        "run_id": run_id,
+        "model_id": result.model_id,
+        "ok": result.ok,
+        "http_status": result.http_status,
+        "error_category": result.error_category,
+        "latency_ms": result.latency_ms,
+        "ttfb_ms": result.ttfb_ms,
+        "ttft_ms": result.ttft_ms,
+        "total_ms": result.total_ms,
+        "tokens_per_second": result.tokens_per_second,
+    }
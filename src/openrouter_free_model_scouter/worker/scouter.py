@@ -1,54 +1,354 @@
+import asyncio
+import os
+import socket
+import time
 from sqlalchemy.orm import Session
 from datetime import datetime
-from typing import List, Tuple
-from ..models import Run, HealthCheck
-from ..healthcheck_service import HealthcheckService
+from typing import Callable, Dict, List, Optional, Tuple
+from ..models import (
+    CircuitBreakerState,
+    HealthCheck,
+    ModelStatus,
+    ProbeJob,
+    Run,
+    RUN_DATETIME_FORMAT,
+    RUN_FINISHED,
+    RUN_PARTIAL,
+    RUN_STARTED,
+    run_timestamp,
+)
+from ..healthcheck_service import (
+    AsyncHealthcheckService,
+    HealthcheckService,
+    ResultCallback,
+)
+from ..catalog_cache import CatalogCache
+from ..circuit_breaker import (
+    CIRCUIT_OPEN_CATEGORY,
+    NEUTRAL_FAILURE_CATEGORIES,
+    BreakerPolicy,
+    BreakerState,
+    CircuitBreakers,
+)
+from ..http_client import AsyncHttpClient
+from ..key_pool import KeyUsage
 from ..model_catalog_service import ModelCatalogService
-from ..openrouter_client import OpenRouterClient
+from ..openrouter_client import AsyncOpenRouterClient, OpenRouterClient
 from ..config import AppConfig
-from ..domain_models import HealthcheckResult
+from ..rate_limiter import build_rate_limiter
+from ..domain_models import HealthcheckResult, ModelInfo
+from ..services.live_feed import live_feed
+from ..services.response_cache import response_cache
+from .job_queue import OPEN_JOB_STATUSES, LeasedJob, ProbeJobQueue
+from .result_writer import BatchedResultWriter
+
+SCAN_ENGINES = ("thread", "async")
+
+ModelSelector = Callable[[List[ModelInfo]], List[ModelInfo]]
+
 
 class ScouterWorker:
     def __init__(self, db: Session, client: OpenRouterClient):
         self.db = db
         self.client = client
-        self.catalog_service = ModelCatalogService(openrouter_client=client)
+        self.catalog_service = ModelCatalogService(
+            openrouter_client=client, cache=CatalogCache(db)
+        )
         self.healthcheck_service = HealthcheckService(openrouter_client=client)
+        # Per-API-key usage of the last scan, in key pool order.
+        self.last_key_usage: List[KeyUsage] = []
 
-    def run_scan(self, config: AppConfig) -> Tuple[int, List[HealthcheckResult]]:
-        run_datetime = datetime.now()
+    def run_scan(
+        self, config: AppConfig, select_models: Optional[ModelSelector] = None
+    ) -> Tuple[Optional[int], List[HealthcheckResult]]:
+        """Probe the free catalog, or the part of it ``select_models`` keeps.
+
+        Returns (None, []) without recording a run when nothing was selected.
+        """
+        # Start a fresh per-key usage report for this scan.
+        self.client.key_pool.take_usage()
+
+        models = self._select_models(config, select_models)
+        if select_models is not None and not models:
+            return None, []
+
+        # The run is recorded before probing so results can be streamed into
+        # it and the dashboard can follow the scan while it is running.
+        run_record = self._start_run(models)
+        live_feed.run_started(run_record.id, run_record.run_datetime, len(models))
+
+        writer = BatchedResultWriter(
+            self.db, run_record.id, run_ts=run_record.run_ts
+        )
+
+        def on_result(result: HealthcheckResult) -> None:
+            writer.add(result)
+            live_feed.result(run_record.id, result)
+
+        breakers = self._load_breakers(models, BreakerPolicy.from_config(config))
+        try:
+            results = self.check_models(
+                models, config, on_result=on_result, breakers=breakers
+            )
+            writer.add_all(results)
+        except BaseException:
+            self.db.rollback()
+            writer.flush()
+            self._save_breakers(breakers)
+            self._finish_run(run_record, RUN_PARTIAL)
+            raise
+
+        self._save_breakers(breakers)
+        self._finish_run(run_record, RUN_FINISHED)
+        return run_record.id, results
+
+    def run_new_models_scan(
+        self, config: AppConfig
+    ) -> Tuple[Optional[int], List[HealthcheckResult]]:
+        """Probe only the models that joined the catalog since its last fetch."""
+        return self.run_scan(config, select_models=self.select_added_models)
+
+    def select_added_models(self, models: List[ModelInfo]) -> List[ModelInfo]:
+        """The models the last catalog fetch found new; a ModelSelector."""
+        diff = self.catalog_service.last_diff
+        if not diff:
+            return []
+        added = set(diff.added)
+        return [model for model in models if model.model_id in added]
+
+    def enqueue_scan(
+        self, config: AppConfig, select_models: Optional[ModelSelector] = None
+    ) -> Optional[int]:
+        """Record a run and queue one probe job per model for ``work`` to pick up.
+
+        Models still waiting in the queue from an earlier run are left out.
+        Returns None without recording a run when nothing is left to queue.
+        """
+        queue = ProbeJobQueue(self.db)
+        queued = queue.open_model_ids()
+        models = [
+            model
+            for model in self._select_models(config, select_models)
+            if model.model_id not in queued
+        ]
+        if not models:
+            return None
+
+        run_record = self._start_run(models)
+        queue.enqueue(run_record.id, [model.model_id for model in models])
+        return run_record.id
+
+    def work(
+        self,
+        config: AppConfig,
+        *,
+        worker_id: Optional[str] = None,
+        exit_when_idle: bool = False,
+        poll_seconds: float = 5.0,
+    ) -> int:
+        """Lease queued probe jobs, probe them and record the results.
 
+        Up to ``concurrency`` jobs are leased at a time. With
+        ``exit_when_idle`` this returns once no job is pending or leased by
+        anyone; otherwise it polls forever. Returns the jobs completed.
+        """
+        worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        queue = ProbeJobQueue(self.db)
+        policy = BreakerPolicy.from_config(config)
+        completed = 0
+
+        while True:
+            jobs = queue.lease(
+                worker_id,
+                limit=max(1, config.concurrency),
+                lease_seconds=config.lease_seconds,
+            )
+            if not jobs:
+                if exit_when_idle and not queue.has_open_jobs():
+                    return completed
+                time.sleep(poll_seconds)
+                continue
+
+            # One probe answers every queued run that wants the same model.
+            by_model: Dict[str, List[LeasedJob]] = {}
+            for job in jobs:
+                by_model.setdefault(job.model_id, []).append(job)
+            models = [
+                ModelInfo(model_id=model_id, name=model_id, raw={}) for model_id in by_model
+            ]
+
+            def on_result(result: HealthcheckResult) -> None:
+                nonlocal completed
+                for job in by_model.get(result.model_id, []):
+                    if queue.complete(job, result):
+                        completed += 1
+
+            breakers = self._load_breakers(models, policy)
+            try:
+                self.check_models(models, config, on_result=on_result, breakers=breakers)
+            finally:
+                self._save_breakers(breakers)
+
+    def _select_models(
+        self, config: AppConfig, select_models: Optional[ModelSelector]
+    ) -> List[ModelInfo]:
         models = self.catalog_service.get_free_models(
             timeout_seconds=config.timeout_seconds,
             model_id_contains=config.model_id_contains
         )
         if config.max_models is not None:
             models = models[:config.max_models]
+        if select_models is not None:
+            models = select_models(models)
+        return models
 
-        results = self.healthcheck_service.check_models(
+    def _start_run(self, models: List[ModelInfo]) -> Run:
+        run_datetime = datetime.now()
+        self._mark_interrupted_runs()
+        run_record = Run(
+            run_datetime=run_datetime.strftime(RUN_DATETIME_FORMAT),
+            run_ts=run_timestamp(run_datetime),
+            status=RUN_STARTED,
+            total_models=len(models),
+        )
+        self.db.add(run_record)
+        self.db.commit()
+        return run_record
+
+    def _load_breakers(
+        self, models: List[ModelInfo], policy: BreakerPolicy
+    ) -> CircuitBreakers:
+        model_ids = [model.model_id for model in models]
+        states = {
+            row.model_id: BreakerState(
+                model_id=row.model_id,
+                state=row.state,
+                failures=row.failures,
+                cooldown_seconds=row.cooldown_seconds,
+                next_probe_ts=row.next_probe_ts,
+            )
+            for row in self.db.query(CircuitBreakerState).filter(
+                CircuitBreakerState.model_id.in_(model_ids)
+            )
+        }
+        # Models without a breaker yet start from their recorded failure
+        # streak, so a long-dead model is skipped from the first scan on.
+        for model_id, streak in self.db.query(
+            ModelStatus.model_id, ModelStatus.consecutive_failures
+        ).filter(ModelStatus.model_id.in_(model_ids)):
+            if model_id in states or not streak:
+                continue
+            failures = self._breaker_failures(model_id, streak)
+            if failures:
+                states[model_id] = BreakerState(model_id=model_id, failures=failures)
+        return CircuitBreakers(policy, states.values())
+
+    def _breaker_failures(self, model_id: str, streak: int) -> int:
+        # The streak also counts throttling, network trouble and skips, which
+        # the breaker itself ignores; only the model's own failures count.
+        categories = (
+            self.db.query(HealthCheck.error_category)
+            .filter(HealthCheck.model_id == model_id)
+            .order_by(HealthCheck.run_id.desc())
+            .limit(streak)
+        )
+        return sum(
+            1
+            for (category,) in categories
+            if category not in NEUTRAL_FAILURE_CATEGORIES
+            and category != CIRCUIT_OPEN_CATEGORY
+        )
+
+    def _save_breakers(self, breakers: CircuitBreakers) -> None:
+        for state in breakers.changed():
+            self.db.merge(
+                CircuitBreakerState(
+                    model_id=state.model_id,
+                    state=state.state,
+                    failures=state.failures,
+                    cooldown_seconds=state.cooldown_seconds,
+                    next_probe_ts=state.next_probe_ts,
+                )
+            )
+        self.db.commit()
+
+    def _finish_run(self, run_record: Run, status: str) -> None:
+        self.last_key_usage = list(self.client.key_pool.take_usage())
+        run_record.status = status
+        run_record.finished_at = datetime.now().strftime(RUN_DATETIME_FORMAT)
+        self.db.commit()
+        response_cache.invalidate()
+        live_feed.run_finished(run_record.id, status, run_record.finished_at)
+
+    def _mark_interrupted_runs(self) -> None:
+        # A run still "started" here belongs to a scan whose process was
+        # killed; whatever it flushed is all it will ever have. Queued runs
+        # are finished by their workers instead.
+        queued = self.db.query(ProbeJob.run_id).filter(
+            ProbeJob.status.in_(OPEN_JOB_STATUSES)
+        )
+        self.db.query(Run).filter(Run.status == RUN_STARTED).filter(
+            ~Run.id.in_(queued)
+        ).update({Run.status: RUN_PARTIAL}, synchronize_session=False)
+        self.db.commit()
+
+    def check_models(
+        self,
+        models: List[ModelInfo],
+        config: AppConfig,
+        on_result: Optional[ResultCallback] = None,
+        breakers: Optional[CircuitBreakers] = None,
+    ) -> List[HealthcheckResult]:
+        if config.engine == "async":
+            return asyncio.run(
+                self._check_models_async(models, config, on_result, breakers)
+            )
+        if config.engine != "thread":
+            raise ValueError(f"Unknown scan engine: {config.engine}")
+
+        return self.healthcheck_service.check_models(
             models,
             prompt=config.prompt,
             timeout_seconds=config.timeout_seconds,
             max_retries=config.max_retries,
             concurrency=config.concurrency,
-            request_delay_seconds=config.request_delay_seconds,
+            rate_limiter=build_rate_limiter(config),
+            max_retry_after_seconds=config.max_retry_after_seconds,
+            probe_mode=config.probe_mode,
+            expected_text=config.expected_text,
+            on_result=on_result,
+            breakers=breakers,
         )
 
-        # Save to DB
-        run_record = Run(run_datetime=run_datetime.strftime("%Y-%m-%d %H:%M:%S"))
-        self.db.add(run_record)
-        self.db.commit()
-
-        for r in results:
-            check = HealthCheck(
-                run_id=run_record.id,
-                model_id=r.model_id,
-                ok=r.ok,
-                http_status=r.http_status,
-                error_category=r.error_category,
-                latency_ms=r.latency_ms
+    async def _check_models_async(
+        self,
+        models: List[ModelInfo],
+        config: AppConfig,
+        on_result: Optional[ResultCallback] = None,
+        breakers: Optional[CircuitBreakers] = None,
+    ) -> List[HealthcheckResult]:
+        # The async client is bound to the loop created by asyncio.run, so it
+        # lives only for the duration of a single scan.
+        async with AsyncHttpClient(
+            max_connections=config.effective_pool_size, http2=config.http2
+        ) as http_client:
+            service = AsyncHealthcheckService(
+                openrouter_client=AsyncOpenRouterClient(
+                    http_client=http_client,
+                    config=self.client.config,
+                    key_pool=self.client.key_pool,
+                )
+            )
+            return await service.check_models(
+                models,
+                prompt=config.prompt,
+                timeout_seconds=config.timeout_seconds,
+                max_retries=config.max_retries,
+                concurrency=config.concurrency,
+                rate_limiter=build_rate_limiter(config),
+                max_retry_after_seconds=config.max_retry_after_seconds,
+                probe_mode=config.probe_mode,
+                expected_text=config.expected_text,
+                on_result=on_result,
+                breakers=breakers,
             )
-            self.db.add(check)
-        self.db.commit()
-
-        return run_record.id, results
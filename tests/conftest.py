@@ -2,10 +2,12 @@ import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
-from openrouter_free_model_scouter.database import Base, get_db
+from openrouter_free_model_scouter.database import Base, get_db, get_read_db
+from openrouter_free_model_scouter.domain_models import HealthcheckResult, ModelInfo
 # Import models to register them
 from openrouter_free_model_scouter.models import Run, HealthCheck
 from openrouter_free_model_scouter.main import app
+from openrouter_free_model_scouter.services.response_cache import response_cache
 from fastapi.testclient import TestClient
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -35,5 +37,37 @@ def client(db):
         finally:
             pass
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    # Every test starts from an empty database whose ids restart at 1.
+    response_cache.invalidate()
     yield TestClient(app)
     app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def make_result():
+    """Build a HealthcheckResult; failures default to an HTTP 500."""
+    def build(model_id, ok=True, **fields):
+        values = dict(
+            run_id="1",
+            timestamp_iso="2023",
+            model_id=model_id,
+            ok=ok,
+            http_status=200 if ok else 500,
+            latency_ms=10 if ok else None,
+            attempts=1,
+            error_category=None if ok else "server_error",
+            error_message=None,
+            response_preview="OK" if ok else None,
+        )
+        values.update(fields)
+        return HealthcheckResult(**values)
+    return build
+
+
+@pytest.fixture
+def make_models():
+    """Build a list of ModelInfo, one per model id."""
+    def build(*model_ids):
+        return [ModelInfo(model_id=mid, name=mid, raw={"id": mid}) for mid in model_ids]
+    return build
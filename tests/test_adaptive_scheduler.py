@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from openrouter_free_model_scouter.config import AppConfig
+from openrouter_free_model_scouter.models import HealthCheck, ModelStatus, Run
+from openrouter_free_model_scouter.services.stats_service import StatsService
+from openrouter_free_model_scouter.worker.adaptive_scheduler import (
+    AdaptiveScheduler,
+    ModelHealth,
+    SchedulePolicy,
+    plan_probes,
+    probe_interval,
+)
+from openrouter_free_model_scouter.worker.scouter import ScouterWorker
+
+HOUR = 3600
+POLICY = SchedulePolicy(
+    base_interval_seconds=HOUR,
+    min_interval_seconds=15 * 60,
+    max_interval_seconds=6 * HOUR,
+)
+
+
+def _health(ok=True, failures=0, successes=0, last_probe_ts=0, flapping=False):
+    return ModelHealth(
+        last_probe_ts=last_probe_ts,
+        last_ok=ok,
+        consecutive_failures=failures,
+        consecutive_successes=successes,
+        flapping=flapping,
+    )
+
+
+def test_probe_interval_follows_stability():
+    assert probe_interval(None, POLICY) == 0
+
+    # Failing: quick re-probes, backing off to the base interval.
+    assert probe_interval(_health(ok=False, failures=1), POLICY) == 15 * 60
+    assert probe_interval(_health(ok=False, failures=2), POLICY) == 30 * 60
+    assert probe_interval(_health(ok=False, failures=10), POLICY) == HOUR
+
+    # Just recovered, then stable, then long stable.
+    assert probe_interval(_health(successes=1), POLICY) == 15 * 60
+    assert probe_interval(_health(successes=3), POLICY) == HOUR
+    assert probe_interval(_health(successes=9), POLICY) == 2 * HOUR
+    assert probe_interval(_health(successes=500), POLICY) == 6 * HOUR
+    # Flapping models never back off past the base interval.
+    assert probe_interval(_health(successes=500, flapping=True), POLICY) == HOUR
+
+
+def test_probe_interval_survives_very_long_streaks():
+    # The default config has float minutes; 2.0 ** 1030 would overflow.
+    config = AppConfig.from_sources(cli_overrides={"api_key": "test"}, env={})
+    policy = SchedulePolicy.from_config(config)
+    assert probe_interval(_health(ok=False, failures=1030), policy) == policy.base_interval_seconds
+    assert probe_interval(_health(successes=10**6), policy) == policy.max_interval_seconds
+
+
+def test_plan_probes_orders_by_urgency_and_applies_budgets():
+    now = 100 * HOUR
+    health = {
+        "stable": _health(successes=50, last_probe_ts=now - HOUR),
+        "failing": _health(ok=False, failures=1, last_probe_ts=now - HOUR),
+        "recovering": _health(successes=1, last_probe_ts=now - 20 * 60),
+    }
+    model_ids = ["stable", "failing", "recovering", "new"]
+
+    assert plan_probes(model_ids, health, {}, POLICY, now) == [
+        "new",
+        "failing",
+        "recovering",
+    ]
+
+    budgeted = SchedulePolicy(
+        base_interval_seconds=HOUR,
+        min_interval_seconds=15 * 60,
+        max_interval_seconds=6 * HOUR,
+        model_probes_per_hour=2,
+        request_budget_per_hour=5,
+    )
+    usage = {"failing": 2, "stable": 2}
+    # "failing" used up its own budget; one request is left globally.
+    assert plan_probes(model_ids, health, usage, budgeted, now) == ["new"]
+
+
+def _record_run(db, when, results):
+    run = Run(run_datetime=when.strftime("%Y-%m-%d %H:%M:%S"), status="finished")
+    db.add(run)
+    db.commit()
+    db.add_all(
+        HealthCheck(run_id=run.id, model_id=model_id, ok=ok, latency_ms=100 if ok else None)
+        for model_id, ok in results
+    )
+    db.commit()
+    return run
+
+
+def test_scheduler_selects_due_models_from_history(db, make_models):
+    now = datetime.now().replace(microsecond=0)
+    # Twelve hourly passes for "stable", the last one 30 minutes ago; the
+    # same for "broken" except that its latest check failed.
+    for hours_ago in range(12, 0, -1):
+        when = now - timedelta(hours=hours_ago) + timedelta(minutes=30)
+        _record_run(db, when, [("stable", True), ("broken", hours_ago != 1)])
+
+    status = db.get(ModelStatus, "stable")
+    assert status.consecutive_successes == 12
+    assert db.get(ModelStatus, "broken").consecutive_failures == 1
+
+    scheduler = AdaptiveScheduler(db, POLICY)
+    models = make_models("stable", "broken", "fresh")
+    selected = scheduler.select(models, now_ts=now.timestamp())
+    assert [m.model_id for m in selected] == ["fresh", "broken"]
+
+    # Both checked within the last hour count against the budgets.
+    assert scheduler.load_usage(now.timestamp()) == {"stable": 1, "broken": 1}
+    limited = AdaptiveScheduler(
+        db,
+        SchedulePolicy(
+            base_interval_seconds=HOUR,
+            min_interval_seconds=15 * 60,
+            max_interval_seconds=6 * HOUR,
+            request_budget_per_hour=3,
+        ),
+    )
+    assert [m.model_id for m in limited.select(models, now_ts=now.timestamp())] == ["fresh"]
+
+
+def test_policy_from_config_caps_intervals():
+    config = AppConfig.from_sources(
+        cli_overrides={
+            "api_key": "test",
+            "interval_hours": 2,
+            "min_probe_interval_minutes": 300,
+            "max_probe_interval_hours": 72,
+        },
+        env={},
+    )
+    policy = SchedulePolicy.from_config(config)
+    assert policy.base_interval_seconds == 2 * HOUR
+    # Never above the base interval, and never beyond a day.
+    assert policy.min_interval_seconds == 2 * HOUR
+    assert policy.max_interval_seconds == 24 * HOUR
+    assert config.schedule == "fixed"
+
+
+def test_worker_skips_run_when_no_model_is_due(db, make_models):
+    worker = ScouterWorker(db, MagicMock())
+    worker.catalog_service.get_free_models = MagicMock(return_value=make_models("model-a"))
+    worker.healthcheck_service.check_models = MagicMock()
+    config = AppConfig.from_sources(cli_overrides={"api_key": "test"}, env={})
+
+    assert worker.run_scan(config, select_models=lambda models: []) == (None, [])
+    assert db.query(Run).count() == 0
+    worker.healthcheck_service.check_models.assert_not_called()
+
+
+def test_partial_runs_keep_unprobed_models_listed(db):
+    now = datetime.now().replace(microsecond=0)
+    _record_run(db, now - timedelta(hours=2), [("model-a", True), ("model-b", False)])
+    # An adaptive tick that only re-probed the failing model.
+    _record_run(db, now - timedelta(minutes=5), [("model-b", True)])
+
+    service = StatsService(db)
+    summary = service.get_summary()
+    assert summary["total_models"] == 2
+    assert summary["healthy_count"] == 2
+    assert {m["model_id"] for m in service.get_models_stats()} == {"model-a", "model-b"}
+
+
+def test_worker_records_only_selected_models(db, make_models, make_result):
+    worker = ScouterWorker(db, MagicMock())
+    worker.catalog_service.get_free_models = MagicMock(
+        return_value=make_models("model-a", "model-b")
+    )
+    worker.healthcheck_service.check_models = MagicMock(
+        side_effect=lambda models, **kwargs: [make_result(m.model_id) for m in models]
+    )
+    config = AppConfig.from_sources(cli_overrides={"api_key": "test"}, env={})
+
+    run_id, results = worker.run_scan(config, select_models=lambda models: models[1:])
+    assert [r.model_id for r in results] == ["model-b"]
+    assert db.get(Run, run_id).total_models == 1
@@ -1,4 +1,8 @@
-from openrouter_free_model_scouter.models import Run, HealthCheck
+import pytest
+
+from openrouter_free_model_scouter.catalog_cache import CHANGE_REMOVED
+from openrouter_free_model_scouter.models import CatalogChange, Run, HealthCheck
+from openrouter_free_model_scouter.retention import apply_retention
 
 def test_get_summary_empty(client):
     response = client.get("/api/summary")
@@ -48,3 +52,131 @@ def test_get_model_history(client, db):
     data = response.json()
     assert len(data) == 1
     assert data[0]["ok"] is True
+
+def test_get_scan_progress(client, db):
+    assert client.get("/api/scan/progress").json() is None
+
+    run1 = Run(run_datetime="2023-01-01 10:00:00", status="started", total_models=3)
+    db.add(run1)
+    db.commit()
+    db.add(HealthCheck(run_id=run1.id, model_id="model-a", ok=True, latency_ms=100))
+    db.commit()
+
+    response = client.get("/api/scan/progress")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "started"
+    assert data["checked_count"] == 1
+    assert data["total_models"] == 3
+
+def test_get_models_window(client, db):
+    run1 = Run(run_datetime="2023-01-01 10:00:00")
+    db.add(run1)
+    db.commit()
+    db.add(HealthCheck(run_id=run1.id, model_id="model-a", ok=True, latency_ms=100))
+    db.commit()
+
+    response = client.get("/api/models", params={"window": "7d"})
+    assert response.status_code == 200
+    assert response.json()[0]["window"] == "7d"
+    assert response.json()[0]["p50_latency"] == pytest.approx(100, rel=0.01)
+
+    assert client.get("/api/models", params={"window": "1y"}).status_code == 400
+
+def test_models_etag_and_cache_follow_new_results(client, db):
+    run1 = Run(run_datetime="2023-01-01 10:00:00", status="started")
+    db.add(run1)
+    db.commit()
+    db.add(HealthCheck(run_id=run1.id, model_id="model-a", ok=True, latency_ms=100))
+    db.commit()
+
+    first = client.get("/api/models")
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+
+    again = client.get("/api/models", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+    # Each window has its own tag.
+    assert client.get("/api/models", params={"window": "7d"}).headers["etag"] != etag
+
+    # A result streamed into the live run changes the version.
+    db.add(HealthCheck(run_id=run1.id, model_id="model-b", ok=False, http_status=429))
+    db.commit()
+    changed = client.get("/api/models", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert {m["model_id"] for m in changed.json()} == {"model-a", "model-b"}
+
+    # So does finishing the run, even without new rows.
+    summary_etag = client.get("/api/summary").headers["etag"]
+    run1.status = "finished"
+    db.commit()
+    assert client.get("/api/summary", headers={"If-None-Match": summary_etag}).status_code == 200
+
+
+def test_models_etag_changes_when_a_model_leaves_the_catalog(client, db):
+    run1 = Run(run_datetime="2023-01-01 10:00:00", status="finished")
+    db.add(run1)
+    db.commit()
+    db.add_all([
+        HealthCheck(run_id=run1.id, model_id="model-a", ok=True, latency_ms=100),
+        HealthCheck(run_id=run1.id, model_id="model-b", ok=True, latency_ms=100),
+    ])
+    db.commit()
+    etag = client.get("/api/models").headers["etag"]
+
+    # No new check is written: only the catalog diff records the removal.
+    db.add(CatalogChange(detected_ts=0, model_id="model-b", change=CHANGE_REMOVED))
+    db.commit()
+    response = client.get("/api/models", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [m["model_id"] for m in response.json()] == ["model-a"]
+
+
+def test_models_etag_changes_when_retention_prunes_checks(client, db):
+    runs = [Run(run_datetime=f"2023-01-{day:02d} 10:00:00", status="finished") for day in (1, 20)]
+    db.add_all(runs)
+    db.commit()
+    db.add_all([HealthCheck(run_id=run.id, model_id="model-a", ok=True, latency_ms=100) for run in runs])
+    db.commit()
+    etag = client.get("/api/models").headers["etag"]
+
+    # Keep ten days back from the newest run: the first run and its check go,
+    # while the newest run and the newest check id stay the same.
+    apply_retention(
+        db.connection().connection,
+        raw_retention_days=10,
+        hourly_retention_days=0,
+        now_ts=runs[1].run_ts,
+    )
+    db.commit()
+    assert db.query(HealthCheck).count() == 1
+    response = client.get("/api/models", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_model_history_paging_and_validation(client, db):
+    for hour in range(5):
+        run = Run(run_datetime=f"2023-01-01 1{hour}:00:00")
+        db.add(run)
+        db.commit()
+        db.add(HealthCheck(run_id=run.id, model_id="google/gemma", ok=True, latency_ms=100 + hour))
+    db.commit()
+
+    response = client.get("/api/models/google/gemma/history", params={"limit": 3})
+    assert [p["latency_ms"] for p in response.json()] == [102, 103, 104]
+    cursor = response.headers["x-next-cursor"]
+
+    older = client.get("/api/models/google/gemma/history", params={"limit": 3, "before": cursor})
+    assert [p["latency_ms"] for p in older.json()] == [100, 101]
+    assert "x-next-cursor" not in older.headers
+
+    ranged = client.get(
+        "/api/models/google/gemma/history",
+        params={"since": "2023-01-01T11:00:00", "until": "2023-01-01T12:00:00"},
+    )
+    assert [p["latency_ms"] for p in ranged.json()] == [101, 102]
+
+    assert client.get("/api/models/google/gemma/history", params={"method": "x"}).status_code == 400
+    assert client.get("/api/models/google/gemma/history", params={"points": 1}).status_code == 422
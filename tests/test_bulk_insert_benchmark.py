@@ -0,0 +1,90 @@
+"""Rows/sec for persisting one large run; run with ``pytest -s`` to see the numbers.
+
+OPENROUTER_SCOUT_BENCH_ROWS changes the run size (default: 10000).
+"""
+
+import os
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from openrouter_free_model_scouter.database import Base
+from openrouter_free_model_scouter.models import HealthCheck, Run
+from openrouter_free_model_scouter.worker.result_writer import BatchedResultWriter
+
+BENCH_ROWS = int(os.environ.get("OPENROUTER_SCOUT_BENCH_ROWS", "10000"))
+
+
+def _results(make_result, count):
+    return [
+        make_result(
+            f"vendor/model-{i}:free",
+            i % 5 != 0,
+            run_id="bench",
+            timestamp_iso="2023-01-01T00:00:00+00:00",
+            http_status=200 if i % 5 else 429,
+            latency_ms=100 + i % 900,
+            error_category=None if i % 5 else "rate_limited",
+            response_preview="OK",
+        )
+        for i in range(count)
+    ]
+
+
+def _session(tmp_path, name):
+    engine = create_engine(f"sqlite:///{tmp_path / name}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def _new_run(db):
+    run = Run(run_datetime="2023-01-01 00:00:00")
+    db.add(run)
+    db.commit()
+    return run.id
+
+
+def _orm_insert(db, run_id, results):
+    # The per-object path ScouterWorker used before.
+    for r in results:
+        db.add(
+            HealthCheck(
+                run_id=run_id,
+                model_id=r.model_id,
+                ok=r.ok,
+                http_status=r.http_status,
+                error_category=r.error_category,
+                latency_ms=r.latency_ms,
+            )
+        )
+    db.commit()
+
+
+def test_bulk_insert_rows_per_second(tmp_path, make_result):
+    results = _results(make_result, BENCH_ROWS)
+
+    orm_db = _session(tmp_path, "orm.db")
+    run_id = _new_run(orm_db)
+    started = time.perf_counter()
+    _orm_insert(orm_db, run_id, results)
+    orm_seconds = time.perf_counter() - started
+
+    core_db = _session(tmp_path, "core.db")
+    run_id = _new_run(core_db)
+    started = time.perf_counter()
+    BatchedResultWriter(core_db, run_id).add_all(results)
+    core_seconds = time.perf_counter() - started
+
+    assert core_db.query(HealthCheck).filter(HealthCheck.run_id == run_id).count() == BENCH_ROWS
+
+    orm_rate = BENCH_ROWS / orm_seconds
+    core_rate = BENCH_ROWS / core_seconds
+    print(
+        f"\n{BENCH_ROWS} rows: ORM add() {orm_rate:,.0f} rows/s, "
+        f"Core insert() {core_rate:,.0f} rows/s ({core_rate / orm_rate:.1f}x)"
+    )
+    assert core_rate > orm_rate
+
+    orm_db.close()
+    core_db.close()
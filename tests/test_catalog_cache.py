@@ -0,0 +1,144 @@
+import json
+from unittest.mock import MagicMock
+
+import httpx
+
+from openrouter_free_model_scouter.catalog_cache import (
+    CHANGE_ADDED,
+    CHANGE_CHANGED,
+    CHANGE_REMOVED,
+    CatalogCache,
+)
+from openrouter_free_model_scouter.config import AppConfig
+from openrouter_free_model_scouter.http_client import HttpClient
+from openrouter_free_model_scouter.model_catalog_service import ModelCatalogService
+from openrouter_free_model_scouter.models import CatalogChange, Run
+from openrouter_free_model_scouter.openrouter_client import (
+    OpenRouterClient,
+    OpenRouterClientConfig,
+)
+from openrouter_free_model_scouter.services.stats_service import StatsService
+from openrouter_free_model_scouter.worker.scouter import ScouterWorker
+
+CONFIG = OpenRouterClientConfig(
+    api_key="test", base_url="https://openrouter.test/api/v1", http_referer=None, x_title=None
+)
+
+
+def _item(model_id, context_length=8192, prompt="0"):
+    return {
+        "id": model_id,
+        "name": model_id.upper(),
+        "context_length": context_length,
+        "pricing": {"prompt": prompt, "completion": "0", "image": "0"},
+        "description": "x" * 500,
+        "architecture": {"modality": "text->text"},
+    }
+
+
+class _CatalogServer:
+    """Serves a /models payload with an ETag and honours If-None-Match."""
+
+    def __init__(self, items):
+        self.set_items(items)
+        self.requests = []
+
+    def set_items(self, items):
+        self.body = json.dumps({"data": items})
+        self.etag = f'"v{abs(hash(self.body))}"'
+
+    def __call__(self, request):
+        self.requests.append(request)
+        if request.headers.get("If-None-Match") == self.etag:
+            return httpx.Response(304, headers={"ETag": self.etag})
+        return httpx.Response(
+            200,
+            content=self.body,
+            headers={
+                "ETag": self.etag,
+                "Last-Modified": "Sat, 17 Oct 2026 00:00:00 GMT",
+                "Content-Type": "application/json",
+            },
+        )
+
+
+def test_conditional_requests_reuse_the_stored_catalog(db):
+    server = _CatalogServer([_item("a:free"), _item("b:free"), _item("paid/model")])
+    with HttpClient(transport=httpx.MockTransport(server)) as http_client:
+        service = ModelCatalogService(
+            OpenRouterClient(http_client, CONFIG), cache=CatalogCache(db)
+        )
+
+        first = service.get_free_models(timeout_seconds=5)
+        assert [m.model_id for m in first] == ["a:free", "b:free"]
+        # Nothing to compare the first catalog with.
+        assert service.last_diff is None
+        assert "If-None-Match" not in server.requests[0].headers
+        # Only the fields the scouter uses are kept.
+        assert first[0].raw == {
+            "id": "a:free",
+            "name": "A:FREE",
+            "context_length": 8192,
+            "pricing": {"prompt": "0", "completion": "0"},
+        }
+
+        second = service.get_free_models(timeout_seconds=5)
+        assert server.requests[1].headers["If-None-Match"] == server.etag
+        assert server.requests[1].headers["If-Modified-Since"] == "Sat, 17 Oct 2026 00:00:00 GMT"
+        assert second == first
+        assert not service.last_diff
+
+    assert db.query(CatalogChange).count() == 0
+
+
+def test_catalog_changes_are_diffed_and_recorded(db):
+    server = _CatalogServer([_item("a:free"), _item("b:free"), _item("c:free")])
+    with HttpClient(transport=httpx.MockTransport(server)) as http_client:
+        service = ModelCatalogService(
+            OpenRouterClient(http_client, CONFIG), cache=CatalogCache(db)
+        )
+        service.get_free_models(timeout_seconds=5)
+
+        server.set_items([_item("a:free"), _item("c:free", context_length=32768), _item("d:free")])
+        models = service.get_free_models(timeout_seconds=5)
+
+    assert [m.model_id for m in models] == ["a:free", "c:free", "d:free"]
+    diff = service.last_diff
+    assert diff.added == ["d:free"]
+    assert diff.removed == ["b:free"]
+    assert diff.changed == {"c:free": {"context_length": [8192, 32768]}}
+
+    changes = {(c.model_id, c.change): c for c in db.query(CatalogChange)}
+    assert set(changes) == {
+        ("d:free", CHANGE_ADDED),
+        ("b:free", CHANGE_REMOVED),
+        ("c:free", CHANGE_CHANGED),
+    }
+    assert json.loads(changes[("c:free", CHANGE_CHANGED)].details) == {
+        "context_length": [8192, 32768]
+    }
+
+
+def test_new_models_scan_probes_only_added_models(db, make_result):
+    server = _CatalogServer([_item("a:free"), _item("b:free")])
+    config = AppConfig.from_sources(cli_overrides={"api_key": "test"}, env={})
+    with HttpClient(transport=httpx.MockTransport(server)) as http_client:
+        worker = ScouterWorker(db, OpenRouterClient(http_client, CONFIG))
+        worker.healthcheck_service.check_models = MagicMock(
+            side_effect=lambda models, **kwargs: [make_result(m.model_id) for m in models]
+        )
+
+        worker.run_scan(config)
+        # Unchanged catalog: a 304 and no run at all.
+        assert worker.run_new_models_scan(config) == (None, [])
+
+        server.set_items([_item("b:free"), _item("c:free")])
+        run_id, results = worker.run_new_models_scan(config)
+
+    assert [r.model_id for r in results] == ["c:free"]
+    assert db.query(Run).count() == 2
+
+    # The removed model leaves the dashboard without a rescan.
+    service = StatsService(db)
+    assert {m["model_id"] for m in service.get_models_stats()} == {"b:free", "c:free"}
+    assert service.get_summary()["total_models"] == 2
@@ -0,0 +1,277 @@
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+import httpx
+
+from openrouter_free_model_scouter.circuit_breaker import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    CIRCUIT_OPEN_CATEGORY,
+    PROBE_FULL,
+    PROBE_HALF_OPEN,
+    PROBE_SKIP,
+    BreakerPolicy,
+    BreakerState,
+    CircuitBreakers,
+    skipped_result,
+)
+from openrouter_free_model_scouter.config import AppConfig
+from openrouter_free_model_scouter.healthcheck_service import (
+    AsyncHealthcheckService,
+    HealthcheckService,
+)
+from openrouter_free_model_scouter.http_client import AsyncHttpClient, HttpClient
+from openrouter_free_model_scouter.models import (
+    CircuitBreakerState,
+    HealthCheck,
+    ModelStatus,
+    Run,
+)
+from openrouter_free_model_scouter.openrouter_client import (
+    AsyncOpenRouterClient,
+    OpenRouterClient,
+    OpenRouterClientConfig,
+)
+from openrouter_free_model_scouter.services.stats_service import StatsService
+from openrouter_free_model_scouter.worker.adaptive_scheduler import (
+    AdaptiveScheduler,
+    SchedulePolicy,
+)
+from openrouter_free_model_scouter.worker.scouter import ScouterWorker
+
+CONFIG = OpenRouterClientConfig(
+    api_key="test", base_url="https://openrouter.test/api/v1", http_referer=None, x_title=None
+)
+POLICY = BreakerPolicy(
+    failure_threshold=3, base_cooldown_seconds=60, max_cooldown_seconds=200
+)
+NO_BACKOFF = {"retry_base_seconds": 0.0, "retry_max_seconds": 0.0}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _skipped(model_id):
+    return skipped_result("1", BreakerState(model_id=model_id, failures=40), "2023")
+
+
+def test_breaker_opens_cools_down_and_closes(make_result):
+    clock = _Clock()
+    breakers = CircuitBreakers(POLICY, clock=clock)
+
+    for _ in range(3):
+        assert breakers.decide("m") == PROBE_FULL
+        breakers.record(make_result("m", False))
+    state = breakers.state_of("m")
+    assert (state.state, state.cooldown_seconds, state.next_probe_ts) == (CIRCUIT_OPEN, 60, 1060)
+    assert breakers.decide("m") == PROBE_SKIP
+
+    # After the cool-down: one half-open probe; failing it doubles the cool-down.
+    clock.now = 1060
+    assert breakers.decide("m") == PROBE_HALF_OPEN
+    assert breakers.state_of("m").state == CIRCUIT_HALF_OPEN
+    breakers.record(make_result("m", False))
+    assert breakers.state_of("m").cooldown_seconds == 120
+    clock.now = 1180
+    assert breakers.decide("m") == PROBE_HALF_OPEN
+    breakers.record(make_result("m", False))
+    # Capped at the maximum.
+    assert breakers.state_of("m").cooldown_seconds == 200
+
+    clock.now = 1380
+    assert breakers.decide("m") == PROBE_HALF_OPEN
+    breakers.record(make_result("m", True))
+    assert breakers.state_of("m") == BreakerState(model_id="m")
+    assert breakers.decide("m") == PROBE_FULL
+    assert [s.state for s in breakers.changed()] == [CIRCUIT_CLOSED]
+
+
+def test_throttling_and_network_errors_leave_the_breaker_closed(make_result):
+    clock = _Clock()
+    breakers = CircuitBreakers(POLICY, clock=clock)
+
+    breakers.record(make_result("m", False))
+    for _ in range(10):
+        breakers.record(make_result("m", False, http_status=429, error_category="rate_limited"))
+        breakers.record(make_result("m", False, http_status=None, error_category="network"))
+    # Neither opens the circuit nor resets the model's own failure count.
+    assert breakers.state_of("m") == BreakerState(model_id="m", failures=1)
+    assert breakers.decide("m") == PROBE_FULL
+
+    # A half-open probe that is throttled is simply tried again.
+    for _ in range(2):
+        breakers.record(make_result("m", False))
+    clock.now += 60
+    assert breakers.decide("m") == PROBE_HALF_OPEN
+    breakers.record(make_result("m", False, http_status=429, error_category="rate_limited"))
+    assert breakers.state_of("m").state == CIRCUIT_HALF_OPEN
+    assert breakers.decide("m") == PROBE_HALF_OPEN
+
+
+def test_breaker_seeded_from_failure_streak_and_disabled_by_zero_threshold():
+    seeded = [BreakerState(model_id="dead", failures=40)]
+    assert CircuitBreakers(POLICY, seeded).decide("dead") == PROBE_SKIP
+
+    disabled = BreakerPolicy(failure_threshold=0, base_cooldown_seconds=60, max_cooldown_seconds=60)
+    assert CircuitBreakers(disabled, seeded).decide("dead") == PROBE_FULL
+
+
+def _counting_handler(calls):
+    def handler(request):
+        model_id = json.loads(request.content)["model"]
+        calls[model_id] = calls.get(model_id, 0) + 1
+        if model_id == "ok:free":
+            return httpx.Response(200, json={"choices": [{"message": {"content": "OK"}}]})
+        return httpx.Response(503, json={"error": {"message": "down"}})
+
+    return handler
+
+
+def _open_breakers(clock):
+    # "cooling:free" is mid cool-down, "due:free" is past it.
+    return CircuitBreakers(
+        POLICY,
+        [
+            BreakerState("cooling:free", CIRCUIT_OPEN, 5, 60, next_probe_ts=clock.now + 30),
+            BreakerState("due:free", CIRCUIT_OPEN, 5, 60, next_probe_ts=clock.now - 1),
+        ],
+        clock=clock,
+    )
+
+
+def _assert_breaker_scan(results, calls, breakers):
+    by_model = {r.model_id: r for r in results}
+    # Skipped without a request, and recorded as such.
+    assert "cooling:free" not in calls
+    assert by_model["cooling:free"].error_category == CIRCUIT_OPEN_CATEGORY
+    assert by_model["cooling:free"].attempts == 0
+    # A single half-open attempt despite max_retries, then open again.
+    assert calls["due:free"] == 1
+    assert breakers.state_of("due:free").state == CIRCUIT_OPEN
+    assert breakers.state_of("due:free").cooldown_seconds == 120
+    # Closed circuits keep their retries.
+    assert calls["flaky:free"] == 3
+    assert by_model["ok:free"].ok
+
+
+def test_thread_engine_skips_open_circuits_and_half_opens_once(make_models):
+    calls = {}
+    clock = _Clock()
+    breakers = _open_breakers(clock)
+    with HttpClient(transport=httpx.MockTransport(_counting_handler(calls))) as http_client:
+        service = HealthcheckService(OpenRouterClient(http_client, CONFIG), **NO_BACKOFF)
+        results = service.check_models(
+            make_models("cooling:free", "due:free", "flaky:free", "ok:free"),
+            prompt="ping",
+            timeout_seconds=5,
+            max_retries=2,
+            concurrency=2,
+            breakers=breakers,
+        )
+    assert [r.model_id for r in results] == ["cooling:free", "due:free", "flaky:free", "ok:free"]
+    _assert_breaker_scan(results, calls, breakers)
+
+
+def test_async_engine_skips_open_circuits_and_half_opens_once(make_models):
+    calls = {}
+    clock = _Clock()
+    breakers = _open_breakers(clock)
+
+    async def run():
+        async with AsyncHttpClient(
+            transport=httpx.MockTransport(_counting_handler(calls))
+        ) as http_client:
+            service = AsyncHealthcheckService(
+                AsyncOpenRouterClient(http_client, CONFIG), **NO_BACKOFF
+            )
+            return await service.check_models(
+                make_models("cooling:free", "due:free", "flaky:free", "ok:free"),
+                prompt="ping",
+                timeout_seconds=5,
+                max_retries=2,
+                concurrency=4,
+                breakers=breakers,
+            )
+
+    _assert_breaker_scan(asyncio.run(run()), calls, breakers)
+
+
+def test_worker_persists_breakers_and_dashboard_shows_skips(db, make_models, make_result):
+    # Failure streaks recorded before the breaker existed: "dead:free" failed
+    # on its own six times among two throttled checks, while "throttled:free"
+    # was only ever rate limited or unreachable.
+    for hour in range(8):
+        run = Run(run_datetime=f"2023-01-01 {10 + hour}:00:00", status="finished")
+        db.add(run)
+        db.commit()
+        db.add_all(
+            [
+                HealthCheck(
+                    run_id=run.id,
+                    model_id="dead:free",
+                    ok=False,
+                    http_status=429 if hour % 4 == 1 else 503,
+                    error_category="rate_limited" if hour % 4 == 1 else "server_error",
+                ),
+                HealthCheck(
+                    run_id=run.id,
+                    model_id="throttled:free",
+                    ok=False,
+                    error_category="network" if hour % 2 else "rate_limited",
+                ),
+            ]
+        )
+        db.commit()
+    assert db.get(ModelStatus, "dead:free").consecutive_failures == 8
+    assert db.get(ModelStatus, "throttled:free").consecutive_failures == 8
+
+    worker = ScouterWorker(db, MagicMock())
+    worker.catalog_service.get_free_models = MagicMock(
+        return_value=make_models("dead:free", "throttled:free", "ok:free")
+    )
+    probe = MagicMock(side_effect=lambda model_id: make_result(model_id))
+
+    def check_models(models, **kwargs):
+        # What HealthcheckService does with the breakers, minus the HTTP.
+        breakers = kwargs["breakers"]
+        results = []
+        for model in models:
+            if breakers.decide(model.model_id) == PROBE_SKIP:
+                results.append(_skipped(model.model_id))
+            else:
+                results.append(probe(model.model_id))
+        return results
+
+    worker.healthcheck_service.check_models = check_models
+    config = AppConfig.from_sources(cli_overrides={"api_key": "test"}, env={})
+    run_id, _ = worker.run_scan(config)
+
+    assert [call.args for call in probe.call_args_list] == [("throttled:free",), ("ok:free",)]
+    stored = db.get(CircuitBreakerState, "dead:free")
+    assert stored.state == CIRCUIT_OPEN
+    assert stored.failures == 6
+    assert db.get(CircuitBreakerState, "throttled:free") is None
+
+    skipped = db.query(HealthCheck).filter_by(run_id=run_id, model_id="dead:free").one()
+    assert skipped.error_category == CIRCUIT_OPEN_CATEGORY
+
+    stats = {m["model_id"]: m for m in StatsService(db).get_models_stats()}
+    assert stats["dead:free"]["latest_status"] == "SKIPPED"
+    assert stats["dead:free"]["circuit_state"] == CIRCUIT_OPEN
+    assert stats["ok:free"]["circuit_state"] == CIRCUIT_CLOSED
+    history = StatsService(db).get_model_history("dead:free")
+    assert history[-1]["status_label"] == "SKIPPED"
+
+    # The adaptive scheduler leaves it alone until the cool-down is over.
+    scheduler = AdaptiveScheduler(
+        db,
+        SchedulePolicy(base_interval_seconds=3600, min_interval_seconds=60, max_interval_seconds=7200),
+    )
+    assert [m.model_id for m in scheduler.select(make_models("dead:free"))] == []
@@ -0,0 +1,35 @@
+import pytest
+
+from openrouter_free_model_scouter.services.downsampling import bucket_aggregate, lttb
+
+
+def test_lttb_keeps_spikes_and_endpoints():
+    points = [(x, 100) for x in range(100)]
+    points[37] = (37, 5000)
+    points[81] = (81, 1)
+    sampled = lttb(points, 10, x=lambda p: p[0], y=lambda p: p[1])
+
+    assert len(sampled) == 10
+    assert sampled[0] == (0, 100) and sampled[-1] == (99, 100)
+    assert (37, 5000) in sampled and (81, 1) in sampled
+    assert [p[0] for p in sampled] == sorted(p[0] for p in sampled)
+
+    assert lttb(points[:5], 10, x=lambda p: p[0], y=lambda p: p[1]) == points[:5]
+    with pytest.raises(ValueError):
+        lttb(points, 2, x=lambda p: p[0], y=lambda p: p[1])
+
+
+def test_bucket_aggregate_min_avg_max():
+    points = [
+        {"run_datetime": f"t{i}", "run_ts": i * 60, "ok": i != 3, "latency_ms": None if i == 3 else 100 * (i + 1), "status_label": "OK"}
+        for i in range(8)
+    ]
+    buckets = bucket_aggregate(points, 2, x=lambda p: p["run_ts"])
+
+    assert [b["check_count"] for b in buckets] == [4, 4]
+    first, second = buckets
+    assert first["run_datetime"] == "t0"
+    assert (first["latency_min_ms"], first["latency_ms"], first["latency_max_ms"]) == (100, 200, 300)
+    assert first["uptime"] == 75.0 and first["ok"] is False
+    assert (second["latency_min_ms"], second["latency_max_ms"]) == (500, 800)
+    assert second["uptime"] == 100.0
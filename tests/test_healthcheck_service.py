@@ -0,0 +1,358 @@
+import asyncio
+import json
+import random
+import threading
+import time
+
+import httpx
+import pytest
+
+from openrouter_free_model_scouter.domain_models import HttpResponse
+from openrouter_free_model_scouter.healthcheck_service import (
+    AsyncHealthcheckService,
+    HealthcheckService,
+)
+from openrouter_free_model_scouter.http_client import (
+    AsyncHttpClient,
+    HttpClient,
+    decorrelated_jitter_delay,
+    server_retry_delay,
+)
+from openrouter_free_model_scouter.openrouter_client import (
+    AsyncOpenRouterClient,
+    OpenRouterClient,
+    OpenRouterClientConfig,
+)
+from openrouter_free_model_scouter.rate_limiter import TokenBucketRateLimiter
+
+CONFIG = OpenRouterClientConfig(
+    api_key="test", base_url="https://openrouter.test/api/v1", http_referer=None, x_title=None
+)
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    model_id = json.loads(request.content)["model"]
+    if model_id == "bad:free":
+        return httpx.Response(400, json={"error": {"message": "bad model"}})
+    if model_id == "flaky:free":
+        _handler.flaky_calls += 1
+        if _handler.flaky_calls == 1:
+            return httpx.Response(429, json={"error": {"message": "slow down"}})
+    return httpx.Response(200, json={"choices": [{"message": {"content": " OK "}}]})
+
+
+class _StubSyncClient:
+    """Replays the same responses as _handler without any network I/O."""
+
+    def __init__(self):
+        self.flaky_calls = 0
+
+    def chat_completion(self, model_id, prompt, timeout_seconds):
+        if model_id == "bad:free":
+            return HttpResponse(400, {}, "", {"error": {"message": "bad model"}}), None
+        if model_id == "flaky:free":
+            self.flaky_calls += 1
+            if self.flaky_calls == 1:
+                return HttpResponse(429, {}, "", {"error": {"message": "slow down"}}), None
+        return HttpResponse(200, {}, "", {"choices": [{"message": {"content": " OK "}}]}), None
+
+
+NO_BACKOFF = {"retry_base_seconds": 0.0, "retry_max_seconds": 0.0}
+
+
+@pytest.fixture(autouse=True)
+def _reset_handler():
+    _handler.flaky_calls = 0
+
+
+def _check_async(models, concurrency=10):
+    async def run():
+        async with AsyncHttpClient(transport=httpx.MockTransport(_handler)) as http_client:
+            service = AsyncHealthcheckService(AsyncOpenRouterClient(http_client, CONFIG), **NO_BACKOFF)
+            return await service.check_models(
+                models,
+                prompt="ping",
+                timeout_seconds=5,
+                max_retries=2,
+                concurrency=concurrency,
+            )
+
+    return asyncio.run(run())
+
+
+def test_async_engine_matches_thread_engine_contract(make_models):
+    models = make_models("ok:free", "flaky:free", "bad:free")
+
+    async_results = _check_async(models)
+    sync_results = HealthcheckService(_StubSyncClient(), **NO_BACKOFF).check_models(
+        models,
+        prompt="ping",
+        timeout_seconds=5,
+        max_retries=2,
+        concurrency=2,
+    )
+
+    def comparable(result):
+        return (
+            result.model_id,
+            result.ok,
+            result.http_status,
+            result.attempts,
+            result.error_category,
+            result.error_message,
+            result.response_preview,
+        )
+
+    assert [comparable(r) for r in async_results] == [comparable(r) for r in sync_results]
+    assert [r.model_id for r in async_results] == ["bad:free", "flaky:free", "ok:free"]
+
+    flaky = next(r for r in async_results if r.model_id == "flaky:free")
+    assert flaky.ok is True
+    assert flaky.attempts == 2
+    assert flaky.response_preview == "OK"
+
+
+def test_async_engine_reports_network_failures(make_models):
+    def failing_handler(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    async def run():
+        async with AsyncHttpClient(transport=httpx.MockTransport(failing_handler)) as http_client:
+            service = AsyncHealthcheckService(AsyncOpenRouterClient(http_client, CONFIG), **NO_BACKOFF)
+            return await service.check_models(
+                make_models("down:free"),
+                prompt="ping",
+                timeout_seconds=5,
+                max_retries=1,
+                concurrency=1,
+            )
+
+    (result,) = asyncio.run(run())
+    assert result.ok is False
+    assert result.error_category == "network"
+    assert result.attempts == 2
+    assert result.http_status is None
+
+
+def test_async_engine_runs_probes_concurrently(make_models):
+    async def slow_handler(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"choices": [{"message": {"content": "OK"}}]})
+
+    async def run():
+        async with AsyncHttpClient(transport=httpx.MockTransport(slow_handler)) as http_client:
+            service = AsyncHealthcheckService(AsyncOpenRouterClient(http_client, CONFIG), **NO_BACKOFF)
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            results = await service.check_models(
+                make_models(*(f"m{i}:free" for i in range(200))),
+                prompt="ping",
+                timeout_seconds=5,
+                max_retries=0,
+                concurrency=200,
+            )
+            return results, loop.time() - started
+
+    results, elapsed = asyncio.run(run())
+    assert len(results) == 200
+    assert all(r.ok for r in results)
+    # 200 sequential probes would take 10s; one event loop overlaps them all.
+    assert elapsed < 2.0
+
+
+class _ScriptedSyncClient:
+    """Answers each model from a list of scripted responses and logs call times."""
+
+    def __init__(self, script):
+        self._script = {model_id: list(responses) for model_id, responses in script.items()}
+        self.calls = []
+
+    def chat_completion(self, model_id, prompt, timeout_seconds):
+        self.calls.append((model_id, time.monotonic()))
+        responses = self._script.get(model_id)
+        if responses:
+            return responses.pop(0), None
+        return HttpResponse(200, {}, "", {"choices": [{"message": {"content": "OK"}}]}), None
+
+
+def _throttled(headers):
+    return HttpResponse(429, headers, "", {"error": {"message": "slow down"}})
+
+
+def test_retry_waits_for_retry_after_header(make_models):
+    client = _ScriptedSyncClient({"a:free": [_throttled({"Retry-After": "0.3"})]})
+
+    (result,) = HealthcheckService(client, **NO_BACKOFF).check_models(
+        make_models("a:free"), prompt="ping", timeout_seconds=5, max_retries=2, concurrency=1
+    )
+
+    assert result.ok is True
+    assert result.attempts == 2
+    (_, first), (_, second) = client.calls
+    assert second - first >= 0.3
+
+
+def test_retry_after_longer_than_limit_fails_immediately(make_models):
+    client = _ScriptedSyncClient({"a:free": [_throttled({"Retry-After": "3600"})]})
+
+    (result,) = HealthcheckService(client, **NO_BACKOFF).check_models(
+        make_models("a:free"),
+        prompt="ping",
+        timeout_seconds=5,
+        max_retries=2,
+        concurrency=1,
+        max_retry_after_seconds=60,
+    )
+
+    assert result.ok is False
+    assert result.attempts == 1
+    assert result.error_category == "rate_limited"
+
+
+def test_parked_retry_releases_worker_slot(make_models):
+    client = _ScriptedSyncClient({"a:free": [_throttled({"Retry-After": "0.3"})]})
+    models = make_models("a:free", "b:free", "c:free", "d:free")
+
+    results = HealthcheckService(client, **NO_BACKOFF).check_models(
+        models, prompt="ping", timeout_seconds=5, max_retries=1, concurrency=1
+    )
+
+    assert all(r.ok for r in results)
+    # With a single worker, the other models are probed while "a" is parked.
+    assert [model_id for model_id, _ in client.calls] == [
+        "a:free",
+        "b:free",
+        "c:free",
+        "d:free",
+        "a:free",
+    ]
+
+
+@pytest.mark.parametrize("concurrency", [1, 2, 8])
+def test_throttled_scan_with_fewer_slots_than_models_finishes(make_models, concurrency):
+    # Every slot can end up holding a rate-limit token; the scan must still drain.
+    client = _ScriptedSyncClient({})
+    limiter = TokenBucketRateLimiter(rate_per_second=50, burst=1)
+    models = make_models(*(f"m{i}:free" for i in range(10)))
+    scan = {}
+
+    def run():
+        scan["results"] = HealthcheckService(client, **NO_BACKOFF).check_models(
+            models,
+            prompt="ping",
+            timeout_seconds=5,
+            max_retries=0,
+            concurrency=concurrency,
+            rate_limiter=limiter,
+        )
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive(), "scan never finished"
+    assert len(scan["results"]) == 10 and all(r.ok for r in scan["results"])
+
+
+def test_server_retry_delay_prefers_retry_after_and_parses_dates():
+    now = 1_700_000_000.0
+    assert server_retry_delay(503, {"Retry-After": "2"}, now=now) == 2.0
+    assert server_retry_delay(
+        429, {"retry-after": "Tue, 14 Nov 2023 22:13:25 GMT"}, now=now
+    ) == pytest.approx(5.0)
+    assert server_retry_delay(
+        429, {"X-RateLimit-Reset": str(int((now + 4) * 1000))}, now=now
+    ) == pytest.approx(4.0)
+    # The rate-limit window only matters when the request was throttled.
+    assert server_retry_delay(500, {"X-RateLimit-Reset": "4"}, now=now) is None
+
+
+def test_decorrelated_jitter_stays_within_bounds():
+    rng = random.Random(7)
+    delay = 0.0
+    for _ in range(50):
+        delay = decorrelated_jitter_delay(delay, 0.5, 8.0, rng=rng)
+        assert 0.5 <= delay <= 8.0
+
+
+def _sse(*events):
+    return [f"data: {json.dumps(event)}\n\n".encode() for event in events]
+
+
+def _delta(content):
+    return {"choices": [{"delta": {"content": content}}]}
+
+
+def test_stream_probe_records_ttft_and_closes_after_expected_text(make_models):
+    sent = []
+
+    def chunks():
+        yield b": OPENROUTER PROCESSING\n\n"
+        for chunk in _sse(_delta("O"), _delta("K"), _delta(" and more"), _delta("!")):
+            sent.append(chunk)
+            yield chunk
+        yield b"data: [DONE]\n\n"
+
+    def handler(request):
+        assert json.loads(request.content)["stream"] is True
+        assert request.headers["Accept"] == "text/event-stream"
+        return httpx.Response(200, content=chunks())
+
+    with HttpClient(transport=httpx.MockTransport(handler)) as http_client:
+        service = HealthcheckService(OpenRouterClient(http_client, CONFIG), **NO_BACKOFF)
+        (result,) = service.check_models(
+            make_models("a:free"),
+            prompt="ping",
+            timeout_seconds=5,
+            max_retries=0,
+            concurrency=1,
+            probe_mode="stream",
+        )
+
+    assert result.ok is True
+    assert result.response_preview == "OK"
+    # The stream is closed as soon as "OK" is assembled.
+    assert len(sent) == 2
+    assert result.ttfb_ms is not None
+    assert result.ttft_ms is not None
+    assert result.ttfb_ms <= result.ttft_ms <= result.total_ms
+
+
+def test_stream_probe_reports_mid_stream_error_as_http_status(make_models):
+    async def handler(request):
+        return httpx.Response(
+            200,
+            content=b"".join(
+                _sse({"error": {"code": 429, "message": "upstream rate limited"}})
+            ),
+        )
+
+    async def run():
+        async with AsyncHttpClient(transport=httpx.MockTransport(handler)) as http_client:
+            service = AsyncHealthcheckService(AsyncOpenRouterClient(http_client, CONFIG), **NO_BACKOFF)
+            return await service.check_models(
+                make_models("a:free"),
+                prompt="ping",
+                timeout_seconds=5,
+                max_retries=0,
+                concurrency=1,
+                probe_mode="stream",
+            )
+
+    (result,) = asyncio.run(run())
+    assert result.ok is False
+    assert result.http_status == 429
+    assert result.error_category == "rate_limited"
+    assert result.error_message == "upstream rate limited"
+    assert result.ttft_ms is None
+
+
+def test_unknown_probe_mode_is_rejected(make_models):
+    with pytest.raises(ValueError):
+        HealthcheckService(_StubSyncClient()).check_models(
+            make_models("a:free"),
+            prompt="ping",
+            timeout_seconds=5,
+            max_retries=0,
+            concurrency=1,
+            probe_mode="bogus",
+        )
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import unittest
+
+from openrouter_free_model_scouter.http_client import HttpClient
+
+
+class _RecordingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    client_ports: list = []
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length", "0"))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        self.client_ports.append(self.client_address[1])
+
+        status = 429 if payload.get("model") == "limited" else 200
+        body = json.dumps({"echo": payload.get("model")}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Retry-After", "3")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:  # noqa: A002
+        return
+
+
+class TestHttpClient(unittest.TestCase):
+    def setUp(self) -> None:
+        _RecordingHandler.client_ports = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _RecordingHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/chat"
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_requests_reuse_keep_alive_connection(self) -> None:
+        with HttpClient(pool_size=4) as client:
+            for index in range(5):
+                response, failure = client.request_json(
+                    "POST", self.url, {}, {"model": f"m{index}"}, timeout_seconds=5
+                )
+                self.assertIsNone(failure)
+                self.assertEqual(response.json_body, {"echo": f"m{index}"})
+
+        self.assertEqual(len(_RecordingHandler.client_ports), 5)
+        self.assertEqual(len(set(_RecordingHandler.client_ports)), 1)
+
+    def test_error_status_is_returned_as_response_with_headers(self) -> None:
+        with HttpClient() as client:
+            response, failure = client.request_json(
+                "POST", self.url, {}, {"model": "limited"}, timeout_seconds=5
+            )
+
+        self.assertIsNone(failure)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers["retry-after"], "3")
+
+    def test_connection_error_is_reported_as_network_failure(self) -> None:
+        closed_url = "http://127.0.0.1:9/chat"
+        with HttpClient() as client:
+            response, failure = client.request_json(
+                "POST", closed_url, {}, {"model": "m"}, timeout_seconds=2
+            )
+
+        self.assertIsNone(response)
+        self.assertEqual(failure.error_category, "network")
+
+
+if __name__ == "__main__":
+    unittest.main()
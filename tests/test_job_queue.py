@@ -0,0 +1,191 @@
+import json
+import multiprocessing
+import time
+from unittest.mock import MagicMock
+
+import httpx
+from sqlalchemy.orm import sessionmaker
+
+from openrouter_free_model_scouter.config import AppConfig
+from openrouter_free_model_scouter.database import create_sqlite_engine, init_db
+from openrouter_free_model_scouter.http_client import HttpClient
+from openrouter_free_model_scouter.models import (
+    JOB_ABANDONED,
+    JOB_DONE,
+    HealthCheck,
+    ProbeJob,
+    Run,
+)
+from openrouter_free_model_scouter.openrouter_client import (
+    OpenRouterClient,
+    OpenRouterClientConfig,
+)
+from openrouter_free_model_scouter.worker.job_queue import MAX_LEASES, ProbeJobQueue
+from openrouter_free_model_scouter.worker.scouter import ScouterWorker
+
+CLIENT_CONFIG = OpenRouterClientConfig(
+    api_key="test", base_url="https://openrouter.test/api/v1", http_referer=None, x_title=None
+)
+PROBE_SECONDS = 0.2
+
+
+def _config(**overrides):
+    return AppConfig.from_sources(
+        cli_overrides={
+            "api_key": "test",
+            "max_retries": 0,
+            "rate_limit_per_second": 0,
+            **overrides,
+        },
+        env={},
+    )
+
+
+def _coordinator(db, models):
+    worker = ScouterWorker(db, MagicMock())
+    worker.catalog_service.get_free_models = MagicMock(return_value=models)
+    return worker
+
+
+def test_expired_leases_are_reclaimed_and_finish_the_run(db, make_models, make_result):
+    run_id = _coordinator(db, make_models("a:free", "b:free", "c:free")).enqueue_scan(_config())
+    queue = ProbeJobQueue(db)
+    now = 1000.0
+
+    first = queue.lease("w1", limit=2, lease_seconds=60, now_ts=now)
+    assert [job.model_id for job in first] == ["a:free", "b:free"]
+    second = queue.lease("w2", limit=2, lease_seconds=60, now_ts=now)
+    assert [job.model_id for job in second] == ["c:free"]
+    assert queue.complete(first[0], make_result("a:free"), now_ts=now + 1)
+    assert queue.complete(second[0], make_result("c:free"), now_ts=now + 2)
+
+    # w1 stalls: once its lease expires, "b:free" goes to the next worker...
+    assert queue.lease("w2", limit=2, lease_seconds=60, now_ts=now + 30) == []
+    reclaimed = queue.lease("w2", limit=2, lease_seconds=60, now_ts=now + 61)
+    assert [job.model_id for job in reclaimed] == ["b:free"]
+    # ...and w1 can no longer complete it.
+    assert not queue.complete(first[1], make_result("b:free"), now_ts=now + 62)
+    assert db.get(Run, run_id).status == "started"
+
+    assert queue.complete(reclaimed[0], make_result("b:free"), now_ts=now + 63)
+
+    db.expire_all()
+    assert db.get(Run, run_id).status == "finished"
+    assert not queue.has_open_jobs()
+    checks = db.query(HealthCheck).filter_by(run_id=run_id).all()
+    assert sorted(check.model_id for check in checks) == ["a:free", "b:free", "c:free"]
+
+
+def test_job_that_keeps_losing_its_lease_is_abandoned(db, make_models):
+    run_id = _coordinator(db, make_models("crash:free")).enqueue_scan(_config())
+    queue = ProbeJobQueue(db)
+
+    for attempt in range(MAX_LEASES):
+        assert queue.lease("w", limit=1, lease_seconds=10, now_ts=attempt * 100)
+    assert queue.lease("w", limit=1, lease_seconds=10, now_ts=MAX_LEASES * 100) == []
+
+    db.expire_all()
+    assert db.query(ProbeJob).one().status == JOB_ABANDONED
+    assert db.get(Run, run_id).status == "finished"
+
+
+def test_worker_drains_the_queue_and_skips_already_queued_models(db, make_models, make_result):
+    coordinator = _coordinator(db, make_models("a:free", "b:free"))
+    first_run = coordinator.enqueue_scan(_config())
+    # A second scan before the workers ran only queues what is not queued yet.
+    coordinator.catalog_service.get_free_models.return_value = make_models("b:free", "c:free")
+    second_run = coordinator.enqueue_scan(_config())
+    assert db.get(Run, second_run).total_models == 1
+    assert coordinator.enqueue_scan(_config()) is None
+
+    # A local scan in between leaves the queued runs alone.
+    coordinator.healthcheck_service.check_models = MagicMock(return_value=[])
+    coordinator.run_scan(_config())
+    assert db.get(Run, first_run).status == "started"
+
+    worker = ScouterWorker(db, MagicMock())
+    probed = []
+
+    def check_models(models, **kwargs):
+        results = [make_result(model.model_id) for model in models]
+        probed.extend(model.model_id for model in models)
+        for result in results:
+            kwargs["on_result"](result)
+        return results
+
+    worker.healthcheck_service.check_models = check_models
+    assert worker.work(_config(concurrency=2), worker_id="w", exit_when_idle=True) == 3
+
+    assert sorted(probed) == ["a:free", "b:free", "c:free"]
+    db.expire_all()
+    assert {db.get(Run, first_run).status, db.get(Run, second_run).status} == {"finished"}
+    assert {job.status for job in db.query(ProbeJob)} == {JOB_DONE}
+
+
+def _slow_handler(request):
+    time.sleep(PROBE_SECONDS)
+    model_id = json.loads(request.content)["model"]
+    return httpx.Response(200, json={"choices": [{"message": {"content": model_id}}]})
+
+
+def _run_worker(url, worker_id, barrier):
+    engine = create_sqlite_engine(url)
+    try:
+        with HttpClient(transport=httpx.MockTransport(_slow_handler)) as http_client:
+            with sessionmaker(bind=engine)() as db:
+                worker = ScouterWorker(db, OpenRouterClient(http_client, CLIENT_CONFIG))
+                barrier.wait()
+                worker.work(
+                    _config(concurrency=1),
+                    worker_id=worker_id,
+                    exit_when_idle=True,
+                    poll_seconds=0.01,
+                )
+    finally:
+        engine.dispose()
+
+
+def _drain(tmp_path, worker_count, job_count, make_models):
+    url = f"sqlite:///{tmp_path / f'queue-{worker_count}.db'}"
+    engine = create_sqlite_engine(url)
+    init_db(engine)
+    with sessionmaker(bind=engine)() as db:
+        model_ids = [f"m{i:02d}:free" for i in range(job_count)]
+        run_id = _coordinator(db, make_models(*model_ids)).enqueue_scan(_config())
+
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(worker_count + 1)
+    processes = [
+        context.Process(target=_run_worker, args=(url, f"w{i}", barrier))
+        for i in range(worker_count)
+    ]
+    for process in processes:
+        process.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for process in processes:
+        process.join(timeout=60)
+    elapsed = time.perf_counter() - started
+
+    assert all(process.exitcode == 0 for process in processes)
+    with sessionmaker(bind=engine)() as db:
+        assert db.get(Run, run_id).status == "finished"
+        jobs = db.query(ProbeJob).filter_by(run_id=run_id).all()
+        # Every worker took part...
+        assert {job.worker_id for job in jobs} == {f"w{i}" for i in range(worker_count)}
+        # ...and no job was leased or probed twice.
+        assert all((job.status, job.leases) == (JOB_DONE, 1) for job in jobs)
+        checks = db.query(HealthCheck.model_id).filter_by(run_id=run_id).all()
+        assert sorted(model_id for (model_id,) in checks) == model_ids
+    engine.dispose()
+    return elapsed
+
+
+def test_worker_processes_share_a_scan(tmp_path, make_models):
+    job_count = 16
+    single = _drain(tmp_path, 1, job_count, make_models)
+    pooled = _drain(tmp_path, 4, job_count, make_models)
+
+    # Ideal is 4x; leave room for process scheduling and SQLite locking.
+    assert single >= job_count * PROBE_SECONDS
+    assert single / pooled > 2.5
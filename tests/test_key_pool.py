@@ -0,0 +1,130 @@
+import json
+
+import httpx
+
+from openrouter_free_model_scouter.config import AppConfig
+from openrouter_free_model_scouter.http_client import HttpClient
+from openrouter_free_model_scouter.key_pool import ApiKeyPool, format_key_usage, mask_key
+from openrouter_free_model_scouter.openrouter_client import (
+    OpenRouterClient,
+    build_client_config,
+)
+from openrouter_free_model_scouter.rate_limiter import build_rate_limiter
+from openrouter_free_model_scouter.worker.scouter import ScouterWorker
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_pool_rotates_keys_and_benches_throttled_ones():
+    clock = _Clock()
+    pool = ApiKeyPool(["key-a", "key-b", "key-c"], cooldown_seconds=30, clock=clock)
+
+    assert [pool.acquire() for _ in range(6)] == ["key-a", "key-b", "key-c"] * 2
+
+    # A 429 benches the key for as long as the server asks.
+    pool.release("key-b", 429, {"Retry-After": "10"})
+    # An exhausted window benches the key until it resets.
+    pool.release(
+        "key-c",
+        200,
+        {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int((clock.now + 20) * 1000))},
+    )
+    assert [pool.acquire() for _ in range(2)] == ["key-a", "key-a"]
+    assert not pool.has_available(exclude=["key-a"])
+
+    clock.now += 10
+    assert pool.acquire(exclude=["key-a"]) == "key-b"
+    # Without a Retry-After the configured cool-down applies.
+    pool.release("key-b", 429, {})
+    clock.now += 10
+    assert pool.acquire(exclude=["key-a"]) == "key-c"
+
+    usage = {u.label: u for u in pool.take_usage()}
+    assert usage[mask_key("key-b")].requests == 3
+    assert usage[mask_key("key-b")].rate_limited == 2
+    assert usage[mask_key("key-b")].cooling_until == clock.now + 20
+    assert usage[mask_key("key-c")].ok == 1
+    assert usage[mask_key("key-c")].remaining == 0
+    assert "429 2" in format_key_usage(usage[mask_key("key-b")], now=clock.now)
+
+    # Each report starts from zero.
+    assert all(u.requests == 0 for u in pool.take_usage())
+
+
+class _KeyServer:
+    """Throttles requests made with any key in ``throttled``."""
+
+    def __init__(self, throttled):
+        self.throttled = set(throttled)
+        self.keys = []
+
+    def __call__(self, request):
+        key = request.headers["Authorization"].removeprefix("Bearer ")
+        self.keys.append(key)
+        if request.url.path.endswith("/models"):
+            return httpx.Response(
+                200,
+                json={
+                    "data": [
+                        {"id": f"m{i}:free", "name": f"m{i}", "pricing": {"prompt": "0"}}
+                        for i in range(4)
+                    ]
+                },
+            )
+        if key in self.throttled:
+            return httpx.Response(
+                429, json={"error": {"message": "slow down"}}, headers={"Retry-After": "300"}
+            )
+        model_id = json.loads(request.content)["model"]
+        return httpx.Response(200, json={"choices": [{"message": {"content": model_id}}]})
+
+
+def _config(**overrides):
+    return AppConfig.from_sources(
+        cli_overrides={"api_key": "key-a, key-b,key-c", **overrides}, env={}
+    )
+
+
+def test_config_reads_a_key_pool_and_scales_the_rate_limit():
+    config = _config(rate_limit_per_second=2.0)
+    assert config.api_keys == ["key-a", "key-b", "key-c"]
+    assert config.api_key == "key-a"
+    assert build_client_config(config).keys == ["key-a", "key-b", "key-c"]
+    assert build_rate_limiter(config).rate_per_second == 6.0
+
+
+def test_throttled_key_is_routed_around_within_one_request():
+    server = _KeyServer(throttled={"key-a"})
+    with HttpClient(transport=httpx.MockTransport(server)) as http_client:
+        client = OpenRouterClient(http_client, build_client_config(_config()))
+        response, failure = client.chat_completion("m:free", "ping", timeout_seconds=5)
+        assert failure is None and response.status_code == 200
+        assert server.keys == ["key-a", "key-b"]
+
+        # key-a stays benched, so later requests skip it altogether.
+        for _ in range(4):
+            client.chat_completion("m:free", "ping", timeout_seconds=5)
+    assert "key-a" not in server.keys[2:]
+    assert {server.keys[2:].count("key-b"), server.keys[2:].count("key-c")} == {2}
+
+
+def test_scan_spreads_probes_and_reports_usage_per_key(db):
+    server = _KeyServer(throttled={"key-c"})
+    config = _config(max_retries=0, concurrency=1, rate_limit_per_second=0)
+    with HttpClient(transport=httpx.MockTransport(server)) as http_client:
+        worker = ScouterWorker(db, OpenRouterClient(http_client, build_client_config(config)))
+        _, results = worker.run_scan(config)
+
+    assert all(result.ok for result in results)
+    usage = {u.label: u for u in worker.last_key_usage}
+    # The catalog request plus four probes, one of them rerouted off key-c.
+    assert sum(u.requests for u in usage.values()) == 6
+    assert usage[mask_key("key-c")].rate_limited == 1
+    assert usage[mask_key("key-c")].cooling_until is not None
+    assert usage[mask_key("key-a")].ok + usage[mask_key("key-b")].ok == 5
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+
+from openrouter_free_model_scouter.api.endpoints import _event_stream
+from openrouter_free_model_scouter.services.live_feed import LiveFeed
+
+
+def test_events_published_from_another_thread_reach_subscribers():
+    feed = LiveFeed()
+
+    async def scenario():
+        subscription = feed.subscribe()
+        thread = threading.Thread(
+            target=lambda: [feed.publish("result", {"n": n}) for n in range(3)]
+        )
+        thread.start()
+        received = [await asyncio.wait_for(subscription.queue.get(), 1) for _ in range(3)]
+        thread.join()
+        feed.unsubscribe(subscription)
+        return received
+
+    received = asyncio.run(scenario())
+    assert [e.data["n"] for e in received] == [0, 1, 2]
+    assert [e.id for e in received] == [1, 2, 3]
+
+
+def test_reconnect_replays_missed_events_or_asks_for_resync():
+    feed = LiveFeed(history_size=3)
+    for n in range(5):
+        feed.publish("result", {"n": n})
+
+    async def backlog(last_event_id):
+        subscription = feed.subscribe(last_event_id)
+        events = []
+        while not subscription.queue.empty():
+            events.append(subscription.queue.get_nowait())
+        feed.unsubscribe(subscription)
+        return events
+
+    # Events 3..5 are still buffered.
+    assert [e.id for e in asyncio.run(backlog(2))] == [3, 4, 5]
+    assert asyncio.run(backlog(5)) == []
+    # Event 2 is gone, and id 9 predates a restart: reload everything.
+    assert [e.type for e in asyncio.run(backlog(1))] == ["resync"]
+    assert [e.type for e in asyncio.run(backlog(9))] == ["resync"]
+    # A fresh connection starts from now.
+    assert asyncio.run(backlog(None)) == []
+
+
+def test_slow_subscriber_overflow_becomes_resync():
+    feed = LiveFeed(queue_size=2)
+
+    async def scenario():
+        subscription = feed.subscribe()
+        for n in range(3):
+            feed.publish("result", {"n": n})
+        await asyncio.sleep(0)
+        events = []
+        while not subscription.queue.empty():
+            events.append(subscription.queue.get_nowait())
+        return events
+
+    assert [e.type for e in asyncio.run(scenario())] == ["resync"]
+
+
+class _ConnectedRequest:
+    async def is_disconnected(self):
+        return False
+
+
+def test_event_stream_encodes_server_sent_events(monkeypatch):
+    from openrouter_free_model_scouter.api import endpoints
+
+    feed = LiveFeed()
+    monkeypatch.setattr(endpoints, "live_feed", feed)
+
+    async def scenario():
+        stream = _event_stream(_ConnectedRequest(), None)
+        chunks = [await stream.__anext__()]
+        feed.run_started(7, "2023-01-01 10:00:00", 3)
+        chunks.append(await stream.__anext__())
+        await stream.aclose()
+        return chunks
+
+    retry, event = asyncio.run(scenario())
+    assert retry == "retry: 5000\n\n"
+    assert event == (
+        "id: 1\nevent: run_started\n"
+        'data: {"run_id":7,"run_datetime":"2023-01-01 10:00:00","total_models":3}\n\n'
+    )
+    # Closing the stream unsubscribes the client.
+    assert not feed._subscribers
@@ -0,0 +1,191 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+from openrouter_free_model_scouter.database import init_db
+from openrouter_free_model_scouter.migrations import SCHEMA_VERSION, get_schema_version
+from openrouter_free_model_scouter.models import HealthCheck, Run
+from openrouter_free_model_scouter.rollups import rebuild_rollups
+from openrouter_free_model_scouter.services.stats_service import StatsService
+from openrouter_free_model_scouter.sqlite_repository import SqliteTimelineRepository
+
+LEGACY_SCHEMA = """
+    CREATE TABLE runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_datetime TEXT NOT NULL
+    );
+    CREATE TABLE healthchecks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id INTEGER NOT NULL,
+        model_id TEXT NOT NULL,
+        ok BOOLEAN NOT NULL,
+        http_status INTEGER,
+        error_category TEXT,
+        latency_ms INTEGER,
+        FOREIGN KEY(run_id) REFERENCES runs(id)
+    );
+    INSERT INTO runs (run_datetime) VALUES ('2023-01-01 10:00:00');
+    INSERT INTO healthchecks (run_id, model_id, ok, latency_ms) VALUES (1, 'model-a', 1, 100);
+"""
+
+
+@pytest.fixture
+def legacy_db_path(tmp_path):
+    path = tmp_path / "legacy.db"
+    with sqlite3.connect(path) as conn:
+        conn.executescript(LEGACY_SCHEMA)
+    return path
+
+
+def _indexes(conn):
+    return {
+        row[0]
+        for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        if not row[0].startswith("sqlite_")
+    }
+
+
+def _assert_upgraded(path):
+    with sqlite3.connect(path) as conn:
+        assert get_schema_version(conn) == SCHEMA_VERSION
+        assert _indexes(conn) == {
+            "ix_healthchecks_model_id_run_id",
+            "ix_healthchecks_run_id",
+            "ix_runs_run_datetime",
+            "ix_runs_run_ts",
+            "ix_model_rollups_hourly_bucket_ts",
+            "ix_model_rollups_daily_bucket_ts",
+            "ix_catalog_changes_model_id",
+            "ix_probe_jobs_run_id",
+            "ix_probe_jobs_status_lease_expires_ts",
+        }
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(healthchecks)")}
+        assert {"ttft_ms", "tokens_per_second"} <= columns
+        # Existing history survives the upgrade.
+        assert conn.execute("SELECT COUNT(*) FROM healthchecks").fetchone()[0] == 1
+        # Timestamps are backfilled from the local-time run_datetime strings.
+        (run_ts,) = conn.execute("SELECT run_ts FROM runs").fetchone()
+        assert run_ts == int(datetime(2023, 1, 1, 10, 0, 0).timestamp())
+        # Rollups are built from the existing history.
+        assert conn.execute(
+            "SELECT model_id, check_count, ok_count, latency_sum FROM model_rollups_hourly"
+        ).fetchall() == [("model-a", 1, 1, 100)]
+        assert conn.execute(
+            "SELECT model_id, last_ok, consecutive_failures FROM model_status"
+        ).fetchall() == [("model-a", 1, 0)]
+
+
+def test_init_db_upgrades_legacy_database(legacy_db_path):
+    engine = create_engine(f"sqlite:///{legacy_db_path}")
+    init_db(engine)
+    # Running again is a no-op.
+    init_db(engine)
+    engine.dispose()
+
+    _assert_upgraded(legacy_db_path)
+
+
+def test_sqlite_repository_upgrades_legacy_database(legacy_db_path):
+    repo = SqliteTimelineRepository()
+    run_labels, model_statuses = repo.read_timeline(legacy_db_path)
+
+    assert run_labels == ["2023-01-01 10:00:00"]
+    assert model_statuses["model-a"] == ["OK (100ms)"]
+    _assert_upgraded(legacy_db_path)
+
+
+def test_rollup_backfill_matches_a_rebuild(legacy_db_path):
+    with sqlite3.connect(legacy_db_path) as conn:
+        for hour, results in enumerate(
+            [[("model-a", 0, 120), ("model-b", 1, 300)],
+             [("model-a", 1, 90), ("model-b", 0, None)],
+             [("model-a", 1, 110), ("model-b", 0, None)],
+             [("model-a", 1, 95)]],
+            start=11,
+        ):
+            run_id = conn.execute(
+                "INSERT INTO runs (run_datetime) VALUES (?)", (f"2023-01-01 {hour}:30:00",)
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO healthchecks (run_id, model_id, ok, http_status, latency_ms) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(run_id, model_id, ok, None if ok else 503, latency if ok else None)
+                 for model_id, ok, latency in results],
+            )
+
+    init_db(create_engine(f"sqlite:///{legacy_db_path}"))
+
+    def snapshot(conn):
+        return [
+            conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2").fetchall()
+            for table in ("model_rollups_hourly", "model_rollups_daily", "model_status")
+        ]
+
+    with sqlite3.connect(legacy_db_path) as conn:
+        migrated = snapshot(conn)
+        rebuild_rollups(conn.cursor())
+        assert snapshot(conn) == migrated
+    status = {row[0]: row for row in migrated[2]}
+    # (consecutive_failures, consecutive_successes)
+    assert status["model-a"][-2:] == (0, 3)
+    assert status["model-b"][-2:] == (2, 0)
+
+
+def test_fresh_database_matches_orm_schema(tmp_path):
+    path = tmp_path / "fresh.db"
+    SqliteTimelineRepository().append_run(path, run_datetime=datetime.now(), results=[])
+
+    engine = create_engine(f"sqlite:///{path}")
+    init_db(engine)
+    with engine.connect() as conn:
+        for table in (Run.__table__, HealthCheck.__table__):
+            columns = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table.name})"))}
+            assert columns == {column.name for column in table.columns}
+    engine.dispose()
+
+
+def test_stats_queries_use_indexes(db):
+    for hour in range(3):
+        run = Run(run_datetime=f"2023-01-01 1{hour}:00:00", status="finished")
+        db.add(run)
+        db.commit()
+        db.add_all(
+            [
+                HealthCheck(run_id=run.id, model_id=f"model-{i}", ok=True, latency_ms=100)
+                for i in range(5)
+            ]
+        )
+        db.commit()
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    bind = db.get_bind()
+    event.listen(bind, "before_cursor_execute", record)
+    try:
+        service = StatsService(db)
+        service.get_summary()
+        service.get_models_stats()
+        service.get_model_history("model-1")
+        service.get_scan_progress()
+    finally:
+        event.remove(bind, "before_cursor_execute", record)
+
+    raw = bind.raw_connection()
+    try:
+        cursor = raw.cursor()
+        for statement, parameters in statements:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plan = [row[3] for row in cursor.fetchall()]
+            full_scans = [step for step in plan if step.startswith("SCAN healthchecks")]
+            assert not full_scans, (statement, plan)
+            if "healthchecks.model_id = ?" in statement:
+                # History is read straight off the (model_id, run_id) index.
+                assert not any("ORDER BY" in step for step in plan), plan
+    finally:
+        raw.close()
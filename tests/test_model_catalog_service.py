@@ -10,7 +10,7 @@ class _StubOpenRouterClient:
     def __init__(self, response: HttpResponse) -> None:
         self._response = response
 
-    def list_models(self, timeout_seconds: int):
+    def list_models(self, timeout_seconds: int, headers=None):
         return self._response, None
 
 
@@ -0,0 +1,81 @@
+"""Dashboard query timings over synthetic history; run with ``pytest -s`` to see the numbers.
+
+OPENROUTER_SCOUT_BENCH_QUERY_SIZES sets the models x runs sizes to time
+(default: 30x200; the figures quoted in reviews use 300x1000,300x50000).
+"""
+
+import json
+import os
+import sqlite3
+
+from openrouter_free_model_scouter.query_bench import (
+    QUERY_CASES,
+    format_query_report,
+    parse_sizes,
+    run_query_bench,
+)
+from openrouter_free_model_scouter.rollups import DAILY_TABLE, HOURLY_TABLE, rebuild_rollups
+from openrouter_free_model_scouter.synthetic_history import generate_history
+
+QUERY_SIZES = parse_sizes(os.environ.get("OPENROUTER_SCOUT_BENCH_QUERY_SIZES", "30x200"))
+
+
+def _rollups(path):
+    conn = sqlite3.connect(path)
+    try:
+        return [
+            conn.execute(f"SELECT * FROM {table} ORDER BY model_id, bucket_ts").fetchall()
+            for table in (HOURLY_TABLE, DAILY_TABLE)
+        ] + [conn.execute("SELECT * FROM model_status ORDER BY model_id").fetchall()]
+    finally:
+        conn.close()
+
+
+def test_synthetic_history_flaps_and_keeps_rollups_consistent(tmp_path):
+    path = tmp_path / "history.db"
+    history = generate_history(path, models=40, runs=600, end_ts=1_700_000_000, seed=1)
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM healthchecks").fetchone()[0] == history.rows
+    assert conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 600
+    assert conn.execute("SELECT MAX(run_ts) FROM runs").fetchone()[0] == 1_700_000_000
+
+    # Some model keeps switching between up and down.
+    flips = {}
+    previous = {}
+    for model_id, ok in conn.execute(
+        "SELECT model_id, ok FROM healthchecks ORDER BY run_id"
+    ):
+        if model_id in previous and previous[model_id] != ok:
+            flips[model_id] = flips.get(model_id, 0) + 1
+        previous[model_id] = ok
+    assert max(flips.values()) >= 20
+    # ...and the catalog changes over time.
+    per_run = [count for (count,) in conn.execute("SELECT total_models FROM runs")]
+    assert min(per_run) < max(per_run)
+    conn.close()
+
+    # Rollups written in batches match a run-by-run rebuild.
+    batched = _rollups(path)
+    conn = sqlite3.connect(path)
+    rebuild_rollups(conn.cursor())
+    conn.commit()
+    conn.close()
+    assert _rollups(path) == batched
+
+
+def test_query_benchmark_report(tmp_path):
+    report = run_query_bench(QUERY_SIZES, tmp_path, repeat=2)
+    # The report is plain JSON.
+    report = json.loads(json.dumps(report))
+
+    assert [(size["models"], size["runs"]) for size in report["sizes"]] == QUERY_SIZES
+    for size in report["sizes"]:
+        assert [q["name"] for q in size["queries"]] == [name for name, _ in QUERY_CASES]
+        for timing in size["queries"]:
+            assert timing["repeat"] == 2
+            assert 0 < timing["min_ms"] <= timing["median_ms"] <= timing["max_ms"]
+            assert timing["peak_kib"] > 0
+            assert timing["result_size"] > 0, timing["name"]
+
+    print("\n" + "\n".join(format_query_report(report)))
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import unittest
+
+from openrouter_free_model_scouter.config import AppConfig
+from openrouter_free_model_scouter.http_client import parse_rate_limit_reset
+from openrouter_free_model_scouter.rate_limiter import (
+    TokenBucketRateLimiter,
+    build_rate_limiter,
+)
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenBucketRateLimiter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = _FakeClock()
+
+    def _limiter(self, **kwargs) -> TokenBucketRateLimiter:
+        kwargs.setdefault("rate_per_second", 10.0)
+        kwargs.setdefault("burst", 2)
+        return TokenBucketRateLimiter(
+            clock=self.clock, wall_clock=lambda: 1_700_000_000.0, **kwargs
+        )
+
+    def test_burst_is_free_then_requests_are_paced(self) -> None:
+        limiter = self._limiter()
+
+        waits = [limiter.reserve() for _ in range(5)]
+
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertAlmostEqual(waits[2], 0.1)
+        self.assertAlmostEqual(waits[3], 0.2)
+        self.assertAlmostEqual(waits[4], 0.3)
+
+    def test_tokens_refill_over_time(self) -> None:
+        limiter = self._limiter()
+        limiter.reserve()
+        limiter.reserve()
+
+        self.clock.now += 0.1
+
+        self.assertAlmostEqual(limiter.reserve(), 0.0)
+
+    def test_429_halves_rate_once_per_interval(self) -> None:
+        limiter = self._limiter()
+
+        limiter.on_response(429, {})
+        limiter.on_response(429, {})
+
+        self.assertAlmostEqual(limiter.rate_per_second, 5.0)
+
+        self.clock.now += 1.0
+        limiter.on_response(429, {})
+        self.assertAlmostEqual(limiter.rate_per_second, 2.5)
+
+    def test_success_recovers_rate_up_to_ceiling(self) -> None:
+        limiter = self._limiter(max_rate_per_second=20.0)
+        limiter.on_response(429, {})
+
+        for _ in range(100):
+            limiter.on_response(200, {})
+
+        self.assertAlmostEqual(limiter.rate_per_second, 20.0)
+
+    def test_exhausted_window_pauses_until_reset(self) -> None:
+        limiter = self._limiter()
+
+        limiter.on_response(
+            200,
+            {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(1_700_000_004_000)},
+        )
+
+        self.assertAlmostEqual(limiter.reserve(), 4.0)
+
+    def test_remaining_budget_caps_rate(self) -> None:
+        limiter = self._limiter()
+
+        limiter.on_response(
+            200, {"x-ratelimit-remaining": "10", "x-ratelimit-reset": "5"}
+        )
+
+        self.assertAlmostEqual(limiter.rate_per_second, 2.0)
+
+    def test_key_pool_windows_scale_headroom_and_never_pause(self) -> None:
+        limiter = self._limiter(windows=3)
+
+        limiter.on_response(
+            200, {"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": "5"}
+        )
+        self.assertAlmostEqual(limiter.rate_per_second, 6.0)
+
+        # One key's window running out is the key pool's business.
+        limiter.on_response(
+            200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "5"}
+        )
+        self.assertAlmostEqual(limiter.reserve(), 0.0)
+
+
+class TestRateLimitConfig(unittest.TestCase):
+    def test_legacy_request_delay_maps_to_rate(self) -> None:
+        config = AppConfig.from_sources(
+            cli_overrides={},
+            env={"OPENROUTER_SCOUT_REQUEST_DELAY_SECONDS": "0.5"},
+        )
+
+        limiter = build_rate_limiter(config)
+
+        self.assertIsNotNone(limiter)
+        self.assertAlmostEqual(limiter.rate_per_second, 2.0)
+
+    def test_explicit_rate_wins_and_zero_disables(self) -> None:
+        config = AppConfig.from_sources(
+            cli_overrides={"rate_limit_per_second": 7.5}, env={}
+        )
+        self.assertAlmostEqual(build_rate_limiter(config).rate_per_second, 7.5)
+
+        config = AppConfig.from_sources(
+            cli_overrides={"rate_limit_per_second": 0}, env={}
+        )
+        self.assertIsNone(build_rate_limiter(config))
+
+    def test_parse_reset_accepts_epoch_ms_epoch_s_and_delta(self) -> None:
+        now = 1_700_000_000.0
+        self.assertAlmostEqual(
+            parse_rate_limit_reset({"X-RateLimit-Reset": "1700000002500"}, now=now), 2.5
+        )
+        self.assertAlmostEqual(
+            parse_rate_limit_reset({"X-RateLimit-Reset": "1700000003"}, now=now), 3.0
+        )
+        self.assertAlmostEqual(
+            parse_rate_limit_reset({"X-RateLimit-Reset": "7"}, now=now), 7.0
+        )
+        self.assertIsNone(parse_rate_limit_reset({}, now=now))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""Requests/sec for /api/summary and /api/models with and without the response cache.
+
+Run with ``pytest -s`` to see the numbers. OPENROUTER_SCOUT_BENCH_HISTORY_ROWS
+sets how many healthcheck rows the database holds (default: 50000; the
+figures quoted in reviews use 1000000).
+"""
+
+import os
+import sqlite3
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from openrouter_free_model_scouter.api import endpoints
+from openrouter_free_model_scouter.database import create_sqlite_engine, get_read_db, init_db
+from openrouter_free_model_scouter.main import app
+from openrouter_free_model_scouter.rollups import rebuild_rollups
+from openrouter_free_model_scouter.services.response_cache import ResponseCache
+
+HISTORY_ROWS = int(os.environ.get("OPENROUTER_SCOUT_BENCH_HISTORY_ROWS", "50000"))
+MODELS = 200
+REQUESTS = 50
+RUN_SPACING_SECONDS = 15 * 60
+
+
+def _fill_history(path, rows):
+    runs = max(1, rows // MODELS)
+    started = 1_700_000_000 - runs * RUN_SPACING_SECONDS
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO runs (id, run_datetime, run_ts, status) VALUES (?, ?, ?, 'finished')",
+        [
+            (run_id, time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(ts)), ts)
+            for run_id, ts in (
+                (i + 1, started + i * RUN_SPACING_SECONDS) for i in range(runs)
+            )
+        ],
+    )
+    cursor.executemany(
+        "INSERT INTO healthchecks (run_id, model_id, ok, http_status, latency_ms) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (
+            (
+                run_id,
+                f"vendor/model-{m}:free",
+                (run_id + m) % 7 != 0,
+                200 if (run_id + m) % 7 else 429,
+                100 + (run_id * 31 + m * 17) % 2000,
+            )
+            for run_id in range(1, runs + 1)
+            for m in range(MODELS)
+        ),
+    )
+    rebuild_rollups(cursor)
+    conn.commit()
+    conn.close()
+    return runs * MODELS
+
+
+def _requests_per_second(client, path, headers=None):
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        response = client.get(path, headers=headers)
+        assert response.status_code in (200, 304)
+    return REQUESTS / (time.perf_counter() - started)
+
+
+@pytest.fixture
+def bench_client(tmp_path):
+    path = tmp_path / "history.db"
+    url = f"sqlite:///{path}"
+    writer = create_sqlite_engine(url)
+    init_db(writer)
+    writer.dispose()
+    rows = _fill_history(str(path), HISTORY_ROWS)
+
+    reader = create_sqlite_engine(url, read_only=True)
+    ReadSession = sessionmaker(bind=reader)
+
+    def read_db():
+        db = ReadSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_read_db] = read_db
+    yield TestClient(app), rows
+    app.dependency_overrides.clear()
+    reader.dispose()
+
+
+def test_response_cache_requests_per_second(bench_client, monkeypatch):
+    client, rows = bench_client
+    rates = {}
+    for path in ("/api/summary", "/api/models"):
+        monkeypatch.setattr(endpoints, "response_cache", ResponseCache(max_entries=0))
+        uncached = _requests_per_second(client, path)
+
+        monkeypatch.setattr(endpoints, "response_cache", ResponseCache())
+        cached = _requests_per_second(client, path)
+
+        etag = client.get(path).headers["etag"]
+        not_modified = _requests_per_second(client, path, headers={"If-None-Match": etag})
+        rates[path] = (uncached, cached, not_modified)
+
+    print(f"\n{rows} healthcheck rows, {REQUESTS} requests per case:")
+    for path, (uncached, cached, not_modified) in rates.items():
+        print(
+            f"  {path}: uncached {uncached:,.0f} req/s, cached {cached:,.0f} req/s "
+            f"({cached / uncached:.1f}x), 304 {not_modified:,.0f} req/s"
+        )
+
+    uncached, cached, _ = rates["/api/models"]
+    assert cached > uncached
@@ -0,0 +1,130 @@
+import sqlite3
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from openrouter_free_model_scouter.config import AppConfig
+from openrouter_free_model_scouter.database import create_sqlite_engine, init_db
+from openrouter_free_model_scouter.migrations import upgrade_schema
+from openrouter_free_model_scouter.retention import apply_retention
+from openrouter_free_model_scouter.rollups import DAY_SECONDS, HOUR_SECONDS, rebuild_rollups
+from openrouter_free_model_scouter.services.stats_service import StatsService
+
+DAYS = 60
+MODELS = 20
+NOW = 1_700_006_400  # 2023-11-15 00:00:00 UTC, a day boundary
+
+
+def _fill(connection):
+    # One run every 6 hours for DAYS days, the newest just before NOW.
+    cursor = connection.cursor()
+    run_ts = [NOW - DAYS * DAY_SECONDS + i * 6 * HOUR_SECONDS for i in range(DAYS * 4)]
+    for run_id, ts in enumerate(run_ts, start=1):
+        cursor.execute(
+            "INSERT INTO runs (id, run_datetime, run_ts, status) VALUES (?, ?, ?, 'finished')",
+            (run_id, f"run-{run_id}", ts),
+        )
+        cursor.executemany(
+            "INSERT INTO healthchecks (run_id, model_id, ok, latency_ms) VALUES (?, ?, ?, ?)",
+            [(run_id, f"model-{m}", 1, 100 + m) for m in range(MODELS)],
+        )
+    rebuild_rollups(cursor)
+    connection.commit()
+    cursor.close()
+    return run_ts
+
+
+def _count(connection, sql, *params):
+    return connection.execute(sql, params).fetchone()[0]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_sqlite_engine(f"sqlite:///{tmp_path / 'scouter.db'}")
+    init_db(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_retention_prunes_raw_and_hourly_and_keeps_daily(engine):
+    raw = engine.raw_connection()
+    try:
+        run_ts = _fill(raw)
+        daily_before = _count(raw, "SELECT COUNT(*) FROM model_rollups_daily")
+        assert _count(raw, "PRAGMA auto_vacuum") == 2  # incremental on new files
+
+        report = apply_retention(
+            raw, raw_retention_days=30, hourly_retention_days=14, now_ts=NOW, chunk_size=7
+        )
+
+        raw_cutoff = NOW - 30 * DAY_SECONDS
+        expired_runs = sum(1 for ts in run_ts if ts < raw_cutoff)
+        assert report.deleted_runs == expired_runs
+        assert report.deleted_checks == expired_runs * MODELS
+        assert _count(raw, "SELECT MIN(run_ts) FROM runs") >= raw_cutoff
+        assert _count(raw, "SELECT COUNT(*) FROM healthchecks WHERE run_id NOT IN (SELECT id FROM runs)") == 0
+
+        hourly_cutoff = NOW - 14 * DAY_SECONDS
+        assert _count(raw, "SELECT MIN(bucket_ts) FROM model_rollups_hourly") >= hourly_cutoff
+        assert report.deleted_hourly_rollups > 0
+        assert _count(raw, "SELECT COUNT(*) FROM model_rollups_daily") == daily_before
+
+        # Freed pages went back to the filesystem.
+        assert report.vacuumed_pages > 0
+        assert _count(raw, "PRAGMA freelist_count") == 0
+    finally:
+        raw.close()
+
+    # The 30 day window still covers every check, from the daily rollups.
+    with sessionmaker(bind=engine)() as db:
+        stats = StatsService(db).get_models_stats(window="30d")
+    assert len(stats) == MODELS
+    assert all(s["uptime_24h"] == 100.0 for s in stats)
+
+
+def test_retention_keeps_everything_when_disabled(engine):
+    raw = engine.raw_connection()
+    try:
+        _fill(raw)
+        report = apply_retention(raw, raw_retention_days=0, hourly_retention_days=0, now_ts=NOW)
+        assert (report.deleted_checks, report.deleted_runs, report.deleted_hourly_rollups) == (0, 0, 0)
+        assert _count(raw, "SELECT COUNT(*) FROM healthchecks") == DAYS * 4 * MODELS
+    finally:
+        raw.close()
+
+
+def test_hourly_retention_never_drops_below_the_7d_window(engine):
+    raw = engine.raw_connection()
+    try:
+        _fill(raw)
+        apply_retention(raw, raw_retention_days=0, hourly_retention_days=1, now_ts=NOW)
+        assert _count(raw, "SELECT MIN(bucket_ts) FROM model_rollups_hourly") >= NOW - 7 * DAY_SECONDS
+        assert _count(raw, "SELECT MIN(bucket_ts) FROM model_rollups_hourly") < NOW - 6 * DAY_SECONDS
+    finally:
+        raw.close()
+
+
+def test_legacy_file_is_vacuumed_once_into_incremental_mode(tmp_path):
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    upgrade_schema(conn)
+    assert _count(conn, "PRAGMA auto_vacuum") == 0
+    _fill(conn)
+    size_before = path.stat().st_size
+
+    report = apply_retention(conn, raw_retention_days=10, hourly_retention_days=10, now_ts=NOW)
+    assert report.full_vacuum
+    assert _count(conn, "PRAGMA auto_vacuum") == 2
+    assert path.stat().st_size < size_before
+    conn.close()
+
+
+def test_retention_config_defaults():
+    config = AppConfig.from_sources(cli_overrides={}, env={})
+    assert (config.raw_retention_days, config.hourly_retention_days) == (90.0, 180.0)
+    assert config.retention_interval_hours == 24.0
+
+    config = AppConfig.from_sources(
+        cli_overrides={}, env={"OPENROUTER_SCOUT_RAW_RETENTION_DAYS": "0"}
+    )
+    assert config.raw_retention_days == 0
@@ -0,0 +1,98 @@
+from openrouter_free_model_scouter.latency_sketch import LatencySketch
+from openrouter_free_model_scouter.models import DailyRollup, HourlyRollup, ModelStatus, Run
+from openrouter_free_model_scouter.rollups import rebuild_rollups
+from openrouter_free_model_scouter.worker.result_writer import BatchedResultWriter
+
+
+def _snapshot(db):
+    def rows(model):
+        return sorted(
+            (
+                r.model_id,
+                r.bucket_ts,
+                r.check_count,
+                r.ok_count,
+                r.latency_count,
+                r.latency_sum,
+                r.latency_min,
+                r.latency_max,
+                LatencySketch.from_json(r.latency_sketch).bins,
+            )
+            for r in db.query(model)
+        )
+
+    statuses = sorted(
+        (s.model_id, s.last_run_id, s.last_ok, s.consecutive_failures)
+        for s in db.query(ModelStatus)
+    )
+    return rows(HourlyRollup), rows(DailyRollup), statuses
+
+
+def test_writer_rollups_match_full_rebuild(db, make_result):
+    scans = [
+        ("2023-01-01 10:00:00", [("a", True, 100), ("b", False, None)]),
+        ("2023-01-01 10:30:00", [("a", True, 300), ("b", False, None)]),
+        ("2023-01-01 11:00:00", [("a", False, None), ("b", True, 50)]),
+        ("2023-01-02 09:00:00", [("a", True, 120), ("b", True, 70)]),
+    ]
+    for run_datetime, checks in scans:
+        run = Run(run_datetime=run_datetime)
+        db.add(run)
+        db.commit()
+        # A batch size of 1 exercises merging into existing buckets.
+        writer = BatchedResultWriter(db, run.id, batch_size=1)
+        for model_id, ok, latency in checks:
+            writer.add(make_result(model_id, ok, latency_ms=latency))
+        writer.flush()
+
+    incremental = _snapshot(db)
+
+    hourly = {(r.model_id, r.bucket_ts): r for r in db.query(HourlyRollup)}
+    first_hour = min(bucket for _, bucket in hourly)
+    a_first_hour = hourly[("a", first_hour)]
+    assert (a_first_hour.check_count, a_first_hour.ok_count) == (2, 2)
+    assert (a_first_hour.latency_min, a_first_hour.latency_max) == (100, 300)
+    assert a_first_hour.latency_sum == 400
+
+    status = {s.model_id: s for s in db.query(ModelStatus)}
+    assert status["a"].consecutive_failures == 0
+    assert status["b"].last_ok is True
+
+    cursor = db.connection().connection.cursor()
+    rebuild_rollups(cursor)
+    cursor.close()
+    db.commit()
+
+    assert _snapshot(db) == incremental
+
+
+def test_latency_sketch_merge_matches_single_sketch():
+    values = [35, 80, 120, 120, 450, 900, 2500, 0]
+    whole = LatencySketch()
+    whole.add_all(values)
+
+    left, right = LatencySketch(), LatencySketch()
+    left.add_all(values[:3])
+    right.add_all(values[3:])
+    left.merge(right)
+
+    assert left.bins == whole.bins
+    assert left.zero_count == whole.zero_count == 1
+    assert left.count == len(values)
+
+    restored = LatencySketch.from_json(whole.to_json())
+    assert restored.bins == whole.bins
+    assert restored.count == whole.count
+
+
+def test_latency_sketch_quantiles_within_relative_accuracy():
+    values = [(i * 37) % 5000 + 1 for i in range(2000)]
+    sketch = LatencySketch()
+    sketch.add_all(values)
+
+    exact = sorted(values)
+    for q in (0.0, 0.5, 0.9, 0.99, 1.0):
+        expected = exact[int(q * (len(exact) - 1))]
+        assert abs(sketch.quantile(q) - expected) <= expected * 0.01
+
+    assert LatencySketch().quantile(0.5) is None
@@ -2,6 +2,8 @@ from openrouter_free_model_scouter.services.stats_service import StatsService
 from openrouter_free_model_scouter.models import Run, HealthCheck
 from datetime import datetime
 
+import pytest
+
 def test_stats_service_empty(db):
     service = StatsService(db)
     summary = service.get_summary()
@@ -60,3 +62,191 @@ def test_history(db):
     assert history[1]["run_datetime"] == "2023-01-01 11:00:00"
     assert history[1]["ok"] is False
     assert history[1]["status_label"] == "HTTP 500"
+
+
+def test_scan_progress_and_live_run(db):
+    run1 = Run(run_datetime="2023-01-01 10:00:00", status="finished")
+    run2 = Run(run_datetime="2023-01-01 11:00:00", status="started", total_models=2)
+    db.add_all([run1, run2])
+    db.commit()
+
+    db.add_all([
+        HealthCheck(run_id=run1.id, model_id="model-a", ok=True, latency_ms=100),
+        HealthCheck(run_id=run1.id, model_id="model-b", ok=True, latency_ms=100),
+        HealthCheck(run_id=run2.id, model_id="model-a", ok=False, http_status=500),
+    ])
+    db.commit()
+
+    service = StatsService(db)
+    progress = service.get_scan_progress()
+    assert progress["run_id"] == run2.id
+    assert progress["status"] == "started"
+    assert progress["checked_count"] == 1
+    assert progress["ok_count"] == 0
+    assert progress["total_models"] == 2
+
+    # The summary sticks to the last complete run until the scan finishes...
+    assert service.get_summary()["total_models"] == 2
+    # ...while model stats already reflect the live results.
+    stats = {m["model_id"]: m for m in service.get_models_stats()}
+    assert set(stats) == {"model-a", "model-b"}
+    assert stats["model-a"]["latest_status"] == "HTTP 500"
+    assert stats["model-b"]["latest_status"] == "OK"
+
+
+def test_models_stats_use_time_windows(db):
+    # Newest run last; 1h is the trailing hour, longer windows are whole
+    # hourly/daily buckets back from it.
+    times = [
+        "2023-01-01 00:00:00",  # 8 days before the newest run
+        "2023-01-08 12:00:00",  # 12 hours before
+        "2023-01-09 00:00:00",
+        "2023-01-09 00:30:00",
+    ]
+    oks = [True, True, False, False]
+    for run_datetime, ok in zip(times, oks):
+        run = Run(run_datetime=run_datetime, status="finished")
+        db.add(run)
+        db.commit()
+        db.add(HealthCheck(run_id=run.id, model_id="model-a", ok=ok, latency_ms=200 if ok else None, http_status=None if ok else 503))
+        db.commit()
+
+    service = StatsService(db)
+
+    hour = service.get_models_stats(window="1h")[0]
+    assert hour["window"] == "1h"
+    assert hour["uptime_24h"] == 0.0
+    assert hour["avg_latency_24h"] is None
+    # One point per check in the trailing hour.
+    assert hour["sparkline_data"] == [None, None]
+
+    day = service.get_models_stats(window="24h")[0]
+    assert day["uptime_24h"] == pytest.approx(100 / 3)
+    assert day["avg_latency_24h"] == 200
+    assert day["consecutive_failures"] == 2
+    assert day["latest_status"] == "HTTP 503"
+    assert day["sparkline_data"] == [200, None]
+
+    month = service.get_models_stats(window="30d")[0]
+    assert month["uptime_24h"] == 50.0
+    assert month["consecutive_failures"] == 2
+
+    with pytest.raises(ValueError):
+        service.get_models_stats(window="2h")
+
+
+def test_models_stats_hour_window_spans_clock_hours(db):
+    # The 1h window trails the newest run, not the clock hour it falls in.
+    for run_datetime, ok, latency in [
+        ("2023-01-09 09:00:00", True, 900),  # 65 minutes before: outside
+        ("2023-01-09 09:50:00", True, 100),
+        ("2023-01-09 10:05:00", False, None),
+    ]:
+        run = Run(run_datetime=run_datetime, status="finished")
+        db.add(run)
+        db.commit()
+        db.add(HealthCheck(run_id=run.id, model_id="model-a", ok=ok, latency_ms=latency, http_status=None if ok else 503))
+        db.commit()
+
+    hour = StatsService(db).get_models_stats(window="1h")[0]
+    assert hour["uptime_24h"] == 50.0
+    assert hour["avg_latency_24h"] == 100
+    assert hour["p50_latency"] == pytest.approx(100, rel=0.01)
+    assert hour["sparkline_data"] == [100, None]
+    assert hour["consecutive_failures"] == 1
+
+
+def test_models_stats_latency_percentiles(db):
+    # 100 runs spread over 4 hourly buckets: the percentiles come from the
+    # merged per-bucket sketches and stay within 1% of the exact values.
+    latencies = [(i * 37) % 1000 + 10 for i in range(100)]
+    for i, latency in enumerate(latencies):
+        run = Run(run_datetime=f"2023-01-01 {10 + i // 25:02d}:{i % 25:02d}:00", status="finished")
+        db.add(run)
+        db.commit()
+        db.add(HealthCheck(run_id=run.id, model_id="model-a", ok=True, latency_ms=latency))
+        db.add(HealthCheck(run_id=run.id, model_id="model-down", ok=False, http_status=503))
+        db.commit()
+
+    by_model = {s["model_id"]: s for s in StatsService(db).get_models_stats()}
+    assert by_model["model-down"]["p50_latency"] is None
+    assert by_model["model-down"]["p99_latency"] is None
+
+    stats = by_model["model-a"]
+    exact = sorted(latencies)
+    for name, q in (("p50_latency", 0.5), ("p90_latency", 0.9), ("p99_latency", 0.99)):
+        expected = exact[int(q * (len(exact) - 1))]
+        assert stats[name] == pytest.approx(expected, rel=0.01)
+
+
+def _hourly_history(db, hours, model_id="model-a"):
+    for hour in range(hours):
+        run = Run(run_datetime=f"2023-01-{1 + hour // 24:02d} {hour % 24:02d}:00:00", status="finished")
+        db.add(run)
+        db.commit()
+        ok = hour % 10 != 9
+        db.add(
+            HealthCheck(
+                run_id=run.id,
+                model_id=model_id,
+                ok=ok,
+                latency_ms=100 + (hour * 37) % 400 if ok else None,
+                http_status=None if ok else 503,
+            )
+        )
+    db.commit()
+
+
+def test_history_keyset_pagination(db):
+    _hourly_history(db, 30)
+    service = StatsService(db)
+
+    page, cursor = service.get_model_history_page("model-a", limit=12)
+    assert [p["run_id"] for p in page] == list(range(19, 31))
+    assert cursor == 19
+
+    seen = [p["run_id"] for p in page]
+    while cursor is not None:
+        page, cursor = service.get_model_history_page("model-a", limit=12, before=cursor)
+        seen = [p["run_id"] for p in page] + seen
+    assert seen == list(range(1, 31))
+
+
+def test_history_time_range_and_downsampling(db):
+    _hourly_history(db, 72)
+    service = StatsService(db)
+    since = int(datetime(2023, 1, 2, 0, 0).timestamp())
+    until = int(datetime(2023, 1, 2, 23, 0).timestamp())
+
+    day, cursor = service.get_model_history_page(
+        "model-a", limit=1000, since_ts=since, until_ts=until
+    )
+    assert cursor is None
+    assert [p["run_datetime"] for p in (day[0], day[-1])] == [
+        "2023-01-02 00:00:00",
+        "2023-01-02 23:00:00",
+    ]
+    assert len(day) == 24
+
+    sampled, _ = service.get_model_history_page("model-a", points=10, method="lttb")
+    assert len(sampled) == 10
+    # LTTB keeps real checks, including both ends.
+    assert sampled[0]["run_id"] == 1 and sampled[-1]["run_id"] == 72
+    assert all(p.get("check_count") is None for p in sampled)
+
+    buckets, _ = service.get_model_history_page("model-a", points=6, method="buckets")
+    assert len(buckets) == 6
+    assert sum(b["check_count"] for b in buckets) == 72
+    first = buckets[0]
+    assert first["latency_min_ms"] <= first["latency_ms"] <= first["latency_max_ms"]
+    assert first["uptime"] == pytest.approx(100 * 11 / 12)
+
+    with pytest.raises(ValueError):
+        service.get_model_history_page("model-a", points=10, method="m4")
+
+
+def test_run_timestamp_follows_run_datetime(db):
+    run = Run(run_datetime="2023-01-01 10:00:00")
+    db.add(run)
+    db.commit()
+    assert run.run_ts == int(datetime(2023, 1, 1, 10, 0, 0).timestamp())
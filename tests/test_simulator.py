@@ -0,0 +1,90 @@
+import json
+import sys
+
+from openrouter_free_model_scouter import cli
+from openrouter_free_model_scouter.bench import run_bench
+from openrouter_free_model_scouter.http_client import HttpClient, get_header
+from openrouter_free_model_scouter.model_catalog_service import ModelCatalogService
+from openrouter_free_model_scouter.openrouter_client import (
+    OpenRouterClient,
+    OpenRouterClientConfig,
+)
+from openrouter_free_model_scouter.simulator import (
+    ModelProfile,
+    OpenRouterSimulator,
+    build_profiles,
+)
+
+FAST = ModelProfile(model_id="", latency_ms=5.0)
+
+
+def _client(http_client, simulator):
+    config = OpenRouterClientConfig(
+        api_key="test", base_url=simulator.base_url, http_referer=None, x_title=None
+    )
+    return OpenRouterClient(http_client, config)
+
+
+def test_simulator_answers_like_openrouter_per_model_profile():
+    profiles = build_profiles(
+        2,
+        FAST,
+        [
+            {"model_id": "throttled:free", "rate_limit_rate": 1.0, "retry_after_seconds": 7},
+            {"model_id": "broken:free", "server_error_rate": 1.0},
+            {"model_id": "slow:free", "trickle_ms": 30},
+        ],
+    )
+    with OpenRouterSimulator(profiles, seed=0) as simulator, HttpClient() as http_client:
+        client = _client(http_client, simulator)
+        models = ModelCatalogService(client).get_free_models(timeout_seconds=5)
+        assert [m.model_id for m in models] == sorted(p.model_id for p in profiles)
+
+        response, _ = client.chat_completion("throttled:free", "ping", timeout_seconds=5)
+        assert response.status_code == 429
+        assert get_header(response.headers, "Retry-After") == "7"
+        response, _ = client.chat_completion("broken:free", "ping", timeout_seconds=5)
+        assert response.status_code == 503
+        assert get_header(response.headers, "Retry-After") is None
+
+        response, _ = client.chat_completion("slow:free", "ping", timeout_seconds=5)
+        assert response.json_body["choices"][0]["message"]["content"] == "OK"
+        # Served time covers the latency and the body trickling in.
+        assert simulator.take_served()["slow:free"][0] >= 3 * 0.03
+        assert simulator.status_counts() == {429: 1, 503: 1, 200: 1}
+
+        stream, failure = client.chat_completion_stream(
+            "slow:free", "ping", timeout_seconds=5, stop_text="OK"
+        )
+        assert failure is None and stream.content == "OK"
+        # The comment, then one event per token, each 30ms apart.
+        assert stream.ttft_ms >= 30 and stream.total_ms >= 60
+
+
+def test_bench_reports_throughput_retries_and_overhead():
+    profiles = build_profiles(
+        20, FAST, [{"model_id": "flaky:free", "rate_limit_rate": 1.0, "retry_after_seconds": 0}]
+    )
+    with OpenRouterSimulator(profiles, seed=0) as simulator:
+        for engine in ("thread", "async"):
+            report = run_bench(
+                simulator, engine=engine, concurrency=5, max_retries=1, timeout_seconds=5
+            )
+            assert (report.models, report.ok, report.failed) == (21, 20, 1)
+            # One retry for the always-throttled model.
+            assert (report.requests, report.rate_limited) == (22, 2)
+            assert report.models_per_second > 0
+            assert report.overhead_p50_ms is not None
+            assert report.overhead_p99_ms >= report.overhead_p50_ms
+
+
+def test_bench_cli_prints_a_json_report(monkeypatch, capsys):
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["scouter", "bench", "--models", "6", "--latency-ms", "1", "--seed", "1", "--json"],
+    )
+    cli.main()
+    report = json.loads(capsys.readouterr().out)
+    assert report["models"] == report["ok"] == 6
+    assert report["engine"] == "thread"
@@ -0,0 +1,113 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from openrouter_free_model_scouter.database import create_sqlite_engine, init_db
+from openrouter_free_model_scouter.models import HealthCheck, Run
+from openrouter_free_model_scouter.services.stats_service import StatsService
+
+SCAN_SECONDS = 2.0
+WRITE_LOCK_SECONDS = 0.5
+
+
+@pytest.fixture
+def engines(tmp_path):
+    url = f"sqlite:///{tmp_path / 'scouter.db'}"
+    writer = create_sqlite_engine(url)
+    init_db(writer)
+    reader = create_sqlite_engine(url, read_only=True)
+    yield writer, reader
+    writer.dispose()
+    reader.dispose()
+
+
+def test_engines_apply_pragmas(engines):
+    writer, reader = engines
+    with reader.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+        with pytest.raises(OperationalError):
+            conn.execute(text("DELETE FROM runs"))
+    with writer.connect() as conn:
+        assert conn.execute(text("PRAGMA query_only")).scalar() == 0
+
+
+def test_dashboard_reads_do_not_stall_during_scan(engines):
+    writer, reader = engines
+    WriteSession = sessionmaker(bind=writer)
+    ReadSession = sessionmaker(bind=reader)
+
+    with WriteSession() as db:
+        run = Run(run_datetime="2023-01-01 00:00:00", status="finished")
+        db.add(run)
+        db.flush()
+        db.add_all(
+            [HealthCheck(run_id=run.id, model_id=f"model-{i}", ok=True, latency_ms=100) for i in range(50)]
+        )
+        db.commit()
+
+    stop = threading.Event()
+    errors = []
+    read_latencies = []
+    writes = []
+
+    def scan():
+        # A pessimistic scan batch: its dirty pages outgrow the page cache, so
+        # the writer holds SQLite's exclusive lock until it commits.
+        raw = writer.raw_connection()
+        try:
+            cursor = raw.cursor()
+            while not stop.is_set():
+                cursor.execute("BEGIN EXCLUSIVE")
+                cursor.execute(
+                    "INSERT INTO runs (run_datetime, status) VALUES ('2023-01-01 01:00:00', 'started')"
+                )
+                run_id = cursor.lastrowid
+                cursor.executemany(
+                    "INSERT INTO healthchecks (run_id, model_id, ok) VALUES (?, ?, ?)",
+                    [(run_id, f"model-{i}", i % 3 != 0) for i in range(50)],
+                )
+                time.sleep(WRITE_LOCK_SECONDS)
+                raw.commit()
+                writes.append(run_id)
+        except Exception as error:  # noqa: BLE001
+            errors.append(error)
+        finally:
+            raw.close()
+
+    def dashboard():
+        try:
+            while not stop.is_set():
+                started = time.perf_counter()
+                with ReadSession() as db:
+                    service = StatsService(db)
+                    service.get_summary()
+                    service.get_models_stats()
+                    service.get_scan_progress()
+                read_latencies.append(time.perf_counter() - started)
+        except Exception as error:  # noqa: BLE001
+            errors.append(error)
+
+    threads = [threading.Thread(target=scan)] + [
+        threading.Thread(target=dashboard) for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(SCAN_SECONDS)
+    stop.set()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert not errors
+    assert len(writes) >= 3
+    assert len(read_latencies) > 20
+    # With a rollback journal every read issued during a batch waits for the
+    # commit (and the readers barely get a turn); under WAL none of them
+    # waits for the writer at all.
+    assert max(read_latencies) < WRITE_LOCK_SECONDS
@@ -0,0 +1,88 @@
+"""Peak RSS of reading the legacy timeline; run with ``pytest -s`` to see the numbers.
+
+OPENROUTER_SCOUT_BENCH_TIMELINE_ROWS sets how many healthcheck rows the
+database holds (default: 300000; the figures quoted in reviews use 5000000).
+Each read runs in a fresh interpreter so its peak RSS is its own.
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import textwrap
+
+from openrouter_free_model_scouter.migrations import upgrade_schema
+
+TIMELINE_ROWS = int(os.environ.get("OPENROUTER_SCOUT_BENCH_TIMELINE_ROWS", "300000"))
+MODELS = 250
+WINDOW_RUNS = 24
+
+_READER = textwrap.dedent(
+    """
+    import resource, sys
+    from pathlib import Path
+    from openrouter_free_model_scouter.sqlite_repository import SqliteTimelineRepository
+
+    mode, path = sys.argv[1], Path(sys.argv[2])
+    repo = SqliteTimelineRepository()
+    if mode == "window":
+        labels, statuses = repo.read_timeline(path, last_n_runs=int(sys.argv[3]))
+    elif mode == "full":
+        labels, statuses = repo.read_timeline(path)
+    # VmHWM belongs to this process image; ru_maxrss survives exec on
+    # Linux and would report the (larger) pytest parent instead.
+    try:
+        with open("/proc/self/status") as status:
+            print(next(int(line.split()[1]) for line in status if line.startswith("VmHWM:")))
+    except OSError:
+        print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    """
+)
+
+
+def _fill(path, rows):
+    runs = max(1, rows // MODELS)
+    conn = sqlite3.connect(path)
+    upgrade_schema(conn)
+    conn.executemany(
+        "INSERT INTO runs (id, run_datetime, run_ts) VALUES (?, ?, ?)",
+        [(i, f"run-{i:07d}", 1_600_000_000 + i * 900) for i in range(1, runs + 1)],
+    )
+    conn.executemany(
+        "INSERT INTO healthchecks (run_id, model_id, ok, http_status, latency_ms) VALUES (?, ?, ?, ?, ?)",
+        (
+            (run_id, f"vendor/model-{m}:free", (run_id + m) % 5 != 0, 200 if (run_id + m) % 5 else 429, 100 + m)
+            for run_id in range(1, runs + 1)
+            for m in range(MODELS)
+        ),
+    )
+    conn.commit()
+    conn.close()
+    return runs * MODELS
+
+
+def _peak_rss_kib(*args):
+    out = subprocess.run(
+        [sys.executable, "-c", _READER, *map(str, args)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return int(out.stdout.strip().splitlines()[-1])
+
+
+def test_windowed_timeline_peak_rss(tmp_path):
+    path = tmp_path / "timeline.db"
+    rows = _fill(str(path), TIMELINE_ROWS)
+
+    baseline = _peak_rss_kib("none", path)
+    window = _peak_rss_kib("window", path, WINDOW_RUNS) - baseline
+    full = _peak_rss_kib("full", path) - baseline
+
+    print(
+        f"\n{rows} healthcheck rows: peak RSS above interpreter baseline "
+        f"last {WINDOW_RUNS} runs {window / 1024:.1f} MiB, full history {full / 1024:.1f} MiB"
+    )
+    assert window < full
+    # The window is a few thousand rows; its footprint must not track history.
+    assert window < 32 * 1024
@@ -0,0 +1,156 @@
+import gzip
+import json
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from openrouter_free_model_scouter.sqlite_repository import SqliteTimelineRepository
+from openrouter_free_model_scouter.web import server
+
+
+@pytest.fixture
+def status_client(tmp_path, monkeypatch, make_result):
+    db_path = tmp_path / "scouter.db"
+    monkeypatch.setenv("OPENROUTER_SCOUT_DB_PATH", str(db_path))
+    repo = SqliteTimelineRepository()
+    runs = [
+        [
+            make_result("model-a", latency_ms=120),
+            make_result("model-b", False, http_status=429, error_category=None),
+        ],
+        [
+            make_result("model-a", False, http_status=503, error_category=None),
+            make_result("model-b", False, http_status=None, error_category="timeout"),
+        ],
+        [
+            make_result("model-a", latency_ms=95),
+            make_result("model-c", False, http_status=None, error_category=None),
+        ],
+    ]
+    for hour, results in enumerate(runs):
+        repo.append_run(db_path, run_datetime=datetime(2023, 1, 1, 10 + hour), results=results)
+    return TestClient(server.app)
+
+
+def test_rows_layout_is_unchanged(status_client):
+    data = status_client.get("/api/status").json()
+    assert data["run_labels"] == [
+        "2023-01-01 10:00:00",
+        "2023-01-01 11:00:00",
+        "2023-01-01 12:00:00",
+    ]
+    by_id = {m["model_id"]: m for m in data["models"]}
+    assert by_id["model-a"]["statuses"] == ["OK (120ms)", "HTTP 503", "OK (95ms)"]
+    assert by_id["model-b"]["statuses"] == ["429", "timeout", ""]
+    assert by_id["model-c"]["normalized"] == ["MISS", "MISS", "FAIL"]
+    assert data["models"][0]["model_id"] == "model-a"
+
+    last_two = status_client.get("/api/status", params={"last_n_runs": 2}).json()
+    assert len(last_two["run_labels"]) == 2
+    by_id = {m["model_id"]: m for m in last_two["models"]}
+    assert by_id["model-a"]["statuses"] == ["HTTP 503", "OK (95ms)"]
+
+
+def test_columnar_layout_round_trips_statuses(status_client):
+    rows = {m["model_id"]: m for m in status_client.get("/api/status").json()["models"]}
+    data = status_client.get("/api/status", params={"format": "columnar"}).json()
+
+    assert data["format"] == "columnar"
+    assert data["total_runs"] == 3
+    legend = data["status_legend"]
+    assert data["model_ids"][0] == "model-a"
+
+    def text(code, latency):
+        if code == legend["miss"]:
+            return ""
+        if code == legend["ok"]:
+            return f"OK ({latency}ms)" if latency >= 0 else "OK"
+        if code == 429:
+            return "429"
+        if code >= legend["http_status_from"]:
+            return f"HTTP {code}"
+        return data["error_categories"][code - legend["category_base"]]
+
+    for i, model_id in enumerate(data["model_ids"]):
+        decoded = [text(c, l) for c, l in zip(data["status_codes"][i], data["latency_ms"][i])]
+        assert decoded == rows[model_id]["statuses"]
+        assert data["ok_rate"][i] == rows[model_id]["ok_rate"]
+
+    limited = status_client.get(
+        "/api/status", params={"format": "columnar", "last_n_runs": 1}
+    ).json()
+    assert limited["run_labels"] == ["2023-01-01 12:00:00"]
+    assert limited["total_runs"] == 3
+    assert set(limited["model_ids"]) == {"model-a", "model-c"}
+
+
+def test_status_options_are_validated(status_client):
+    assert status_client.get("/api/status", params={"format": "csv"}).status_code == 400
+    assert status_client.get("/api/status", params={"encoding": "xml"}).status_code == 400
+    assert status_client.get("/api/status", params={"last_n_runs": 0}).status_code == 422
+    if not server.msgpack_available():
+        response = status_client.get("/api/status", params={"encoding": "msgpack"})
+        assert response.status_code == 400
+
+
+def test_columnar_payload_is_smaller_and_gzipped(tmp_path, monkeypatch, make_result):
+    db_path = tmp_path / "big.db"
+    monkeypatch.setenv("OPENROUTER_SCOUT_DB_PATH", str(db_path))
+    repo = SqliteTimelineRepository()
+    for hour in range(48):
+        repo.append_run(
+            db_path,
+            run_datetime=datetime(2023, 1, 1 + hour // 24, hour % 24),
+            results=[
+                make_result(
+                    f"vendor/model-{i}:free",
+                    (i + hour) % 4 != 0,
+                    http_status=200 if (i + hour) % 4 else 429,
+                    error_category=None,
+                    latency_ms=100 + i,
+                )
+                for i in range(40)
+            ],
+        )
+    client = TestClient(server.app)
+
+    rows = client.get("/api/status", headers={"Accept-Encoding": "identity"})
+    columnar = client.get(
+        "/api/status", params={"format": "columnar"}, headers={"Accept-Encoding": "identity"}
+    )
+    assert len(columnar.content) * 2 < len(rows.content)
+
+    raw = client.get(
+        "/api/status",
+        params={"format": "columnar"},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert raw.headers["content-encoding"] == "gzip"
+    assert json.loads(raw.content)["total_runs"] == 48
+
+
+def test_timeline_time_window_and_streaming(status_client, tmp_path):
+    ranged = status_client.get(
+        "/api/status",
+        params={"since": "2023-01-01T11:00:00", "until": "2023-01-01T11:30:00"},
+    ).json()
+    assert ranged["run_labels"] == ["2023-01-01 11:00:00"]
+    assert {m["model_id"] for m in ranged["models"]} == {"model-a", "model-b"}
+
+    repo = SqliteTimelineRepository()
+    db_path = tmp_path / "scouter.db"
+    # A batch smaller than one run still yields whole runs, in order,
+    # including runs that recorded no checks.
+    repo.append_run(db_path, run_datetime=datetime(2023, 1, 1, 13), results=[])
+    streamed = list(repo.iter_timeline(db_path, last_n_runs=3, batch_size=1))
+    assert [label for label, _ in streamed] == [
+        "2023-01-01 11:00:00",
+        "2023-01-01 12:00:00",
+        "2023-01-01 13:00:00",
+    ]
+    assert [sorted(c[0] for c in checks) for _, checks in streamed] == [
+        ["model-a", "model-b"],
+        ["model-a", "model-c"],
+        [],
+    ]
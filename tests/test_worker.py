@@ -1,11 +1,12 @@
 from unittest.mock import MagicMock
+
+import pytest
 from openrouter_free_model_scouter.worker.scouter import ScouterWorker
 from openrouter_free_model_scouter.config import AppConfig
-from openrouter_free_model_scouter.domain_models import HealthcheckResult
 from openrouter_free_model_scouter.models import Run, HealthCheck
 
 
-def test_worker_scan(db):
+def test_worker_scan(db, make_models, make_result):
     mock_client = MagicMock()
 
     # Instantiate worker
@@ -13,23 +14,10 @@ def test_worker_scan(db):
 
     # Mock services on the worker instance
     worker.catalog_service.get_free_models = MagicMock(
-        return_value=[{"id": "model-a", "pricing": {"prompt": "0", "completion": "0"}}]
+        return_value=make_models("model-a")
     )
     worker.healthcheck_service.check_models = MagicMock(
-        return_value=[
-            HealthcheckResult(
-                run_id="1",
-                timestamp_iso="2023",
-                model_id="model-a",
-                ok=True,
-                http_status=200,
-                latency_ms=123,
-                attempts=1,
-                error_category=None,
-                error_message=None,
-                response_preview="OK",
-            )
-        ]
+        return_value=[make_result("model-a", latency_ms=123)]
     )
 
     config = AppConfig.from_sources(cli_overrides={"api_key": "test"}, env={})
@@ -43,48 +31,31 @@ def test_worker_scan(db):
     # Verify DB
     run = db.query(Run).first()
     assert run is not None
+    assert run.status == "finished"
+    assert run.total_models == 1
     checks = db.query(HealthCheck).all()
     assert len(checks) == 1
     assert checks[0].model_id == "model-a"
     assert checks[0].latency_ms == 123
 
 
-def test_worker_scan_errors(db):
+def test_worker_scan_errors(db, make_models, make_result):
     mock_client = MagicMock()
     worker = ScouterWorker(db, mock_client)
 
     worker.catalog_service.get_free_models = MagicMock(
-        return_value=[
-            {"id": "model-429", "pricing": {"prompt": "0", "completion": "0"}},
-            {"id": "model-500", "pricing": {"prompt": "0", "completion": "0"}},
-        ]
+        return_value=make_models("model-429", "model-500")
     )
     worker.healthcheck_service.check_models = MagicMock(
         return_value=[
-            HealthcheckResult(
-                run_id="1",
-                timestamp_iso="2023",
-                model_id="model-429",
+            make_result(
+                "model-429",
                 ok=False,
                 http_status=429,
-                latency_ms=None,
-                attempts=1,
                 error_category="rate_limited",
                 error_message="Too Many Requests",
-                response_preview=None,
-            ),
-            HealthcheckResult(
-                run_id="1",
-                timestamp_iso="2023",
-                model_id="model-500",
-                ok=False,
-                http_status=500,
-                latency_ms=None,
-                attempts=1,
-                error_category="server_error",
-                error_message="Internal Server Error",
-                response_preview=None,
             ),
+            make_result("model-500", ok=False, error_message="Internal Server Error"),
         ]
     )
 
@@ -109,3 +80,98 @@ def test_worker_scan_errors(db):
     assert check_500.ok is False
     assert check_500.http_status == 500
     assert check_500.error_category == "server_error"
+
+
+def test_worker_streams_results_and_keeps_them_when_scan_dies(db, make_models, make_result):
+    worker = ScouterWorker(db, MagicMock())
+    worker.catalog_service.get_free_models = MagicMock(
+        return_value=make_models("model-a", "model-b", "model-c")
+    )
+
+    def check_models(models, *, on_result, **kwargs):
+        on_result(make_result("model-a"))
+        on_result(make_result("model-b", ok=False))
+        # The run is already visible as in progress while probing.
+        assert db.query(Run).one().status == "started"
+        raise RuntimeError("killed")
+
+    worker.healthcheck_service.check_models = check_models
+
+    config = AppConfig.from_sources(cli_overrides={"api_key": "test"}, env={})
+    with pytest.raises(RuntimeError):
+        worker.run_scan(config)
+
+    run = db.query(Run).one()
+    assert run.status == "partial"
+    assert run.total_models == 3
+    assert run.finished_at is not None
+    assert sorted(c.model_id for c in db.query(HealthCheck).all()) == ["model-a", "model-b"]
+
+
+def test_worker_does_not_duplicate_streamed_results(db, make_models, make_result):
+    worker = ScouterWorker(db, MagicMock())
+    worker.catalog_service.get_free_models = MagicMock(return_value=make_models("model-a"))
+
+    def check_models(models, *, on_result, **kwargs):
+        result = make_result("model-a")
+        on_result(result)
+        return [result]
+
+    worker.healthcheck_service.check_models = check_models
+
+    config = AppConfig.from_sources(cli_overrides={"api_key": "test"}, env={})
+    run_id, _ = worker.run_scan(config)
+
+    assert db.query(HealthCheck).filter(HealthCheck.run_id == run_id).count() == 1
+
+
+def test_worker_marks_abandoned_runs_partial(db):
+    db.add(Run(run_datetime="2023-01-01 10:00:00", status="started"))
+    db.commit()
+
+    worker = ScouterWorker(db, MagicMock())
+    worker.catalog_service.get_free_models = MagicMock(return_value=[])
+    worker.healthcheck_service.check_models = MagicMock(return_value=[])
+
+    config = AppConfig.from_sources(cli_overrides={"api_key": "test"}, env={})
+    worker.run_scan(config)
+
+    assert [r.status for r in db.query(Run).order_by(Run.id)] == ["partial", "finished"]
+
+
+def test_worker_publishes_live_feed_events(db, monkeypatch, make_models, make_result):
+    from openrouter_free_model_scouter.services.live_feed import LiveFeed
+    from openrouter_free_model_scouter.worker import scouter
+
+    feed = LiveFeed()
+    monkeypatch.setattr(scouter, "live_feed", feed)
+
+    worker = ScouterWorker(db, MagicMock())
+    worker.catalog_service.get_free_models = MagicMock(
+        return_value=make_models("model-a", "model-b")
+    )
+
+    def check_models(models, *, on_result, **kwargs):
+        results = [make_result("model-a"), make_result("model-b", ok=False)]
+        for result in results:
+            on_result(result)
+        return results
+
+    worker.healthcheck_service.check_models = check_models
+
+    config = AppConfig.from_sources(cli_overrides={"api_key": "test"}, env={})
+    run_id, _ = worker.run_scan(config)
+
+    events = feed._replay(0)
+    assert [e.type for e in events] == ["run_started", "result", "result", "run_finished"]
+    assert events[0].data["total_models"] == 2
+    assert events[2].data == {
+        "run_id": run_id,
+        "model_id": "model-b",
+        "ok": False,
+        "http_status": 500,
+        "error_category": "server_error",
+        "latency_ms": None,
+        "ttft_ms": None,
+    }
+    assert events[3].data["status"] == "finished"